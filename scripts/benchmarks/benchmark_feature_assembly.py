@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the dense and sparse feature matrix assembly.
+
+Scales up the CAPICE predict input file by repeating its variants, processes it up to the
+feature matrix and measures for both the dense (pandas) and sparse (CSR) feature matrix the
+assembly time, memory usage and prediction throughput.
+
+Note: a model trained without --sparse is used for the sparse matrix as well if the model
+does not contain sparse features, in which case only the timings (not the scores) are
+meaningful.
+
+Usage:
+python3 benchmark_feature_assembly.py [-i <input.tsv.gz>] [-m <model>] [-s <scale>] [-r <repeats>]
+"""
+
+import os
+import argparse
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from molgenis.capice.main_predict import CapicePredict
+from molgenis.capice.utilities.feature_assembler import FeatureAssembler
+
+_project_root_directory = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def main():
+    args = parse_args()
+    model = xgb.XGBClassifier()
+    model.load_model(args.model)
+    dataset = process(args.input, model, args.scale)
+    feature_names = model.get_booster().feature_names
+    sparse_features = getattr(model, 'sparse_features', None)
+    if sparse_features is None:
+        sparse_features = FeatureAssembler.get_sparse_features(dataset, feature_names)
+    print(f'Benchmarking {dataset.shape[0]} samples with {len(feature_names)} features '
+          f'({len(sparse_features)} sparse), best of {args.repeats}.')
+    print(f'{"matrix":<10}{"assembly (s)":>14}{"memory (MB)":>14}{"predict (s)":>14}'
+          f'{"samples/s":>14}')
+    for name, assembler in [
+        ('dense', FeatureAssembler(feature_names)),
+        ('sparse', FeatureAssembler(feature_names, sparse_features=sparse_features))
+    ]:
+        assembly_time, matrix = best_of(args.repeats, assembler.assemble, dataset)
+        predict_time, _ = best_of(args.repeats, model.predict_proba, matrix)
+        print(f'{name:<10}{assembly_time:>14.3f}{get_memory(matrix) / 1e6:>14.1f}'
+              f'{predict_time:>14.3f}{dataset.shape[0] / predict_time:>14.0f}')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark of the CAPICE feature assembly.')
+    parser.add_argument(
+        '-i',
+        '--input',
+        type=str,
+        default=os.path.join(_project_root_directory, 'resources', 'predict_input.tsv.gz'),
+        help='input file to scale up (default: resources/predict_input.tsv.gz)'
+    )
+    parser.add_argument(
+        '-m',
+        '--model',
+        type=str,
+        default=os.path.join(_project_root_directory, 'tests', 'resources',
+                             'xgb_booster_poc.json'),
+        help='model to assemble the features of (default: tests/resources/xgb_booster_poc.json)'
+    )
+    parser.add_argument('-s', '--scale', type=int, default=10000,
+                        help='amount of times the variants are repeated (default: 10000)')
+    parser.add_argument('-r', '--repeats', type=int, default=3,
+                        help='amount of times each step is run (default: 3)')
+    return parser.parse_args()
+
+
+def process(input_path, model, scale):
+    predict = CapicePredict(input_path, model, None, False, False)
+    dataset = predict._load_file()
+    dataset = pd.concat([dataset] * scale, ignore_index=True)
+    dataset = predict.process(dataset, list(model.vep_features.keys()))[0]
+    return predict.categorical_process(dataset, processing_features=model.processable_features)[0]
+
+
+def best_of(repeats, function, *args):
+    timings = []
+    result = None
+    for _ in range(repeats):
+        start = perf_counter()
+        result = function(*args)
+        timings.append(perf_counter() - start)
+    return min(timings), result
+
+
+def get_memory(matrix):
+    if isinstance(matrix, pd.DataFrame):
+        return matrix.memory_usage(deep=True).sum()
+    return np.sum([matrix.data.nbytes, matrix.indices.nbytes, matrix.indptr.nbytes])
+
+
+if __name__ == '__main__':
+    main()
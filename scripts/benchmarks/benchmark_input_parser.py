@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the InputParser readers.
+
+Scales up the CAPICE predict input file by repeating its variants, and measures the parse time
+and resulting memory usage of every reader, both with inferred and with registered dtypes.
+
+Usage:
+python3 benchmark_input_parser.py [-i <input.tsv.gz>] [-s <scale>] [-r <repeats>]
+"""
+
+import os
+import gzip
+import argparse
+import tempfile
+from time import perf_counter
+from importlib.util import find_spec
+
+from molgenis.capice.utilities.input_parser import InputParser
+from molgenis.capice.utilities.input_schema import InputSchema
+
+_project_root_directory = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scaled_input = os.path.join(tmp_dir, 'scaled_input.tsv.gz')
+        n_variants = scale_input(args.input, scaled_input, args.scale)
+        print(f'Benchmarking {n_variants} variants ({args.scale}x {args.input}), '
+              f'best of {args.repeats}.')
+        print(f'{"reader":<10}{"dtypes":<12}{"seconds":>10}{"memory (MB)":>14}')
+        for reader in InputParser.READERS:
+            if reader == 'pyarrow' and find_spec('pyarrow') is None:
+                print(f'{reader:<10}not installed, skipping.')
+                continue
+            for dtypes_name, dtypes in [('inferred', None), ('registered', InputSchema().dtypes)]:
+                seconds, memory = benchmark(scaled_input, reader, dtypes, args.repeats)
+                print(f'{reader:<10}{dtypes_name:<12}{seconds:>10.3f}{memory / 1e6:>14.1f}')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark of the CAPICE input readers.')
+    parser.add_argument(
+        '-i',
+        '--input',
+        type=str,
+        default=os.path.join(_project_root_directory, 'resources', 'predict_input.tsv.gz'),
+        help='input file to scale up (default: resources/predict_input.tsv.gz)'
+    )
+    parser.add_argument('-s', '--scale', type=int, default=1000,
+                        help='amount of times the variants are repeated (default: 1000)')
+    parser.add_argument('-r', '--repeats', type=int, default=3,
+                        help='amount of times each reader is run (default: 3)')
+    return parser.parse_args()
+
+
+def scale_input(input_path, output_path, scale):
+    with gzip.open(input_path, 'rt') as input_file:
+        header = input_file.readline()
+        variants = input_file.read()
+    if not variants.endswith('\n'):
+        variants += '\n'
+    with gzip.open(output_path, 'wt') as output_file:
+        output_file.write(header)
+        for _ in range(scale):
+            output_file.write(variants)
+    return variants.count('\n') * scale
+
+
+def benchmark(input_path, reader, dtypes, repeats):
+    timings = []
+    memory = 0
+    for _ in range(repeats):
+        parser = InputParser(reader=reader)
+        start = perf_counter()
+        parsed = parser.parse(input_path, dtype=dtypes)
+        timings.append(perf_counter() - start)
+        memory = parsed.memory_usage(deep=True).sum()
+    return min(timings), memory
+
+
+if __name__ == '__main__':
+    main()
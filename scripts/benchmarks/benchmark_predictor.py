@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the CAPICE Predictor against XGBClassifier.predict_proba().
+
+Scales up the CAPICE predict input file by repeating its variants, processes it up to the
+feature matrix and measures the prediction time and peak (Python allocated) memory of:
+- predict_proba: XGBClassifier.predict_proba() over the DataFrame of the model features.
+- predictor: the Predictor, predicting through Booster.inplace_predict() over a contiguous
+  float32 feature matrix, both at once and in batches of --batch-size. Since the input is
+  scaled up by repetition, the predictor only predicts its unique feature vectors, which is
+  also measured without deduplication.
+- compiled: the Predictor over the model compiled into NumPy arrays (predict --engine numpy).
+
+Also verifies that all approaches result in the same scores.
+
+Usage:
+python3 benchmark_predictor.py [-i <input.tsv.gz>] [-m <model>] [-s <scale>] [-r <repeats>]
+    [-b <batch size>] [-t <threads>]
+"""
+
+import os
+import argparse
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from molgenis.capice.main_predict import CapicePredict
+from molgenis.capice.utilities.predictor import Predictor
+from molgenis.capice.utilities.compiled_model import CompiledModel
+
+_project_root_directory = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def main():
+    args = parse_args()
+    model = xgb.XGBClassifier()
+    model.load_model(args.model)
+    if args.threads is not None:
+        model.get_booster().set_param('nthread', args.threads)
+    dataset = process(args.input, model, args.scale)
+    feature_names = model.get_booster().feature_names
+    compiled_model = CompiledModel.compile(model)
+    print(f'Benchmarking {dataset.shape[0]} samples with {len(feature_names)} features, '
+          f'best of {args.repeats}.')
+    print(f'{"method":<24}{"predict (s)":>14}{"peak memory (MB)":>18}{"samples/s":>14}')
+    expected = None
+    for name, function in [
+        ('predict_proba', lambda: model.predict_proba(dataset[feature_names])[:, 1]),
+        ('predictor', lambda: Predictor(model).predict(dataset)['score'].to_numpy()),
+        ('predictor (no dedup)',
+         lambda: Predictor(model, deduplicate=False).predict(dataset)['score'].to_numpy()),
+        (f'predictor (batch {args.batch_size})',
+         lambda: Predictor(model, batch_size=args.batch_size).predict(dataset)['score'].to_numpy()),
+        ('compiled', lambda: Predictor(compiled_model).predict(dataset)['score'].to_numpy())
+    ]:
+        predict_time, peak_memory, scores = best_of(args.repeats, function)
+        print(f'{name:<24}{predict_time:>14.3f}{peak_memory / 1e6:>18.1f}'
+              f'{dataset.shape[0] / predict_time:>14.0f}')
+        if expected is None:
+            expected = scores
+        elif not np.array_equal(expected, scores):
+            print(f'Scores of {name} differ from predict_proba, maximum difference: '
+                  f'{np.max(np.abs(expected - scores))}')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark of the CAPICE Predictor.')
+    parser.add_argument(
+        '-i',
+        '--input',
+        type=str,
+        default=os.path.join(_project_root_directory, 'resources', 'predict_input.tsv.gz'),
+        help='input file to scale up (default: resources/predict_input.tsv.gz)'
+    )
+    parser.add_argument(
+        '-m',
+        '--model',
+        type=str,
+        default=os.path.join(_project_root_directory, 'tests', 'resources',
+                             'xgb_booster_poc.json'),
+        help='model to predict with (default: tests/resources/xgb_booster_poc.json)'
+    )
+    parser.add_argument('-s', '--scale', type=int, default=10000,
+                        help='amount of times the variants are repeated (default: 10000)')
+    parser.add_argument('-r', '--repeats', type=int, default=3,
+                        help='amount of times each method is run (default: 3)')
+    parser.add_argument('-b', '--batch-size', type=int, default=10000,
+                        help='batch size of the batched predictor (default: 10000)')
+    parser.add_argument('-t', '--threads', type=int,
+                        help='amount of threads to predict with (default: of the model)')
+    return parser.parse_args()
+
+
+def process(input_path, model, scale):
+    predict = CapicePredict(input_path, model, None, False, False)
+    dataset = predict._load_file()
+    dataset = pd.concat([dataset] * scale, ignore_index=True)
+    dataset = predict.process(dataset, list(model.vep_features.keys()))[0]
+    return predict.categorical_process(dataset, processing_features=model.processable_features)[0]
+
+
+def best_of(repeats, function):
+    timings = []
+    result = None
+    for _ in range(repeats):
+        start = perf_counter()
+        result = function()
+        timings.append(perf_counter() - start)
+    # Traced separately, since tracing slows down the timed runs.
+    tracemalloc.start()
+    function()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak_memory, result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the CAPICE training configurations.
+
+Processes the CAPICE train input file up to the training features, scales up its train split by
+repeating its variants and measures the wall time of the hyperparameter search (including
+refitting the best model) and the AUC of the resulting model over the test split, for:
+- current: tree method exact with a single thread per fit (the configuration before
+  --tree-method and --threads-per-fit existed).
+- exact, hist and approx: each tree method, dividing --threads by the ThreadBudget (or using
+  --threads-per-fit).
+- hist halving: tree method hist using the successive halving search.
+All configurations search the same hyperparameters (--seed).
+
+Usage:
+python3 benchmark_train.py [-i <input.tsv.gz>] [-e <features.json>] [-s <scale>] [-t <threads>]
+    [--threads-per-fit <threads>] [-n <iterations>] [-c <cross validation folds>] [--seed <seed>]
+"""
+
+import os
+import argparse
+import tempfile
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+
+from molgenis.capice.main_train import CapiceTrain
+from molgenis.capice.core.capice_manager import CapiceManager
+from molgenis.capice.utilities.enums import InputColumn
+
+_project_root_directory = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def main():
+    args = parse_args()
+    CapiceManager().critical_logging_only = True
+    with tempfile.TemporaryDirectory() as output_directory:
+        train = CapiceTrain(args.input, args.features, 0.2, output_directory, True, False,
+                            args.threads)
+        train.n_iterations = args.iterations
+        train.cross_validate = args.cv
+        dataset = train.load_and_process()[0]
+        train_set, test_set = train.split_data(dataset, test_size=train.train_test_size)
+        # Only the train split is scaled up, so that no test variants are trained on.
+        train_set = pd.concat([train_set] * args.scale, ignore_index=True)
+        print(f'Benchmarking {train_set.shape[0]} training samples with '
+              f'{len(train.train_features)} features, {args.iterations} iterations of '
+              f'{args.cv} folds using {args.threads} threads.')
+        print(f'{"configuration":<16}{"train (s)":>14}{"test AUC":>12}')
+        for name, tree_method, threads_per_fit, search in [
+            ('current', 'exact', 1, 'random'),
+            ('exact', 'exact', args.threads_per_fit, 'random'),
+            ('hist', 'hist', args.threads_per_fit, 'random'),
+            ('approx', 'approx', args.threads_per_fit, 'random'),
+            ('hist halving', 'hist', args.threads_per_fit, 'halving')
+        ]:
+            train.tree_method = tree_method
+            train.threads_per_fit = threads_per_fit
+            train.search = search
+            # The search samples its parameters from the global random state, seeded so that
+            # every configuration searches the same parameters.
+            np.random.seed(args.seed)
+            start = perf_counter()
+            model = train.train(test_set=test_set, train_set=train_set)
+            train_time = perf_counter() - start
+            auc = roc_auc_score(
+                test_set[InputColumn.binarized_label.col_name],
+                model.predict_proba(train._assemble_features(test_set))[:, 1]
+            )
+            print(f'{name:<16}{train_time:>14.3f}{auc:>12.4f}')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark of the CAPICE training.')
+    parser.add_argument(
+        '-i',
+        '--input',
+        type=str,
+        default=os.path.join(_project_root_directory, 'resources', 'train_test.tsv.gz'),
+        help='input file to scale up (default: resources/train_test.tsv.gz)'
+    )
+    parser.add_argument(
+        '-e',
+        '--features',
+        type=str,
+        default=os.path.join(_project_root_directory, 'resources', 'train_features.json'),
+        help='features to train on (default: resources/train_features.json)'
+    )
+    parser.add_argument('-s', '--scale', type=int, default=10,
+                        help='amount of times the variants are repeated (default: 10)')
+    parser.add_argument('-t', '--threads', type=int, default=os.cpu_count() or 1,
+                        help='amount of threads to train with (default: all CPUs)')
+    parser.add_argument('--threads-per-fit', type=int,
+                        help='threads of each fit (default: determined by the ThreadBudget)')
+    parser.add_argument('-n', '--iterations', type=int, default=5,
+                        help='iterations of the hyperparameter search (default: 5)')
+    parser.add_argument('-c', '--cv', type=int, default=3,
+                        help='cross validation folds (default: 3)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the hyperparameter search (default: 0)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main()
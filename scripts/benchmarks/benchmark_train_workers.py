@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the memory usage and wall time of CAPICE training with concurrent fits.
+
+Processes the CAPICE train input file up to the training features (cached within a temporary
+directory), scales up its train split by repeating its variants and measures the hyperparameter
+search (including refitting the best model) for each amount of --workers (concurrent fits,
+each using a single thread), with and without sharing the training data through memory-mapped
+files. Every configuration runs within its own process, of which the proportional set size
+(PSS) of the process and its joblib worker processes is summed and sampled during training.
+PSS divides the pages shared between processes (such as those of a memory-mapped file) over
+these processes, so that shared memory is only counted once. Requires Linux (/proc).
+
+Usage:
+python3 benchmark_train_workers.py [-i <input.tsv.gz>] [-e <features.json>] [-s <scale>]
+    [-w <workers> ...] [-n <iterations>] [-c <cross validation folds>] [--tree-method <method>]
+    [--seed <seed>]
+"""
+
+import os
+import argparse
+import tempfile
+import threading
+import multiprocessing
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+_project_root_directory = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as output_directory:
+        # Processes the input file into the cache, from which every configuration loads it.
+        train = create_train(args, output_directory, 1)
+        train.load_and_process()
+        print(f'Benchmarking {args.scale} times the training samples with '
+              f'{len(train.train_features)} features, {args.iterations} iterations of {args.cv} '
+              f'folds using tree method {args.tree_method}.')
+        print(f'{"workers":>8}{"shared":>8}{"train (s)":>12}{"base PSS (MB)":>16}'
+              f'{"peak PSS (MB)":>16}')
+        context = multiprocessing.get_context('spawn')
+        for workers in args.workers:
+            for shared_memory in [False, True]:
+                queue = context.Queue()
+                process = context.Process(
+                    target=run_configuration,
+                    args=(args, output_directory, workers, shared_memory, queue)
+                )
+                process.start()
+                train_time, base_pss, peak_pss = queue.get()
+                process.join()
+                print(f'{workers:>8}{str(shared_memory):>8}{train_time:>12.3f}'
+                      f'{base_pss / 1024 ** 2:>16.1f}{peak_pss / 1024 ** 2:>16.1f}')
+
+
+def create_train(args, output_directory, workers):
+    from molgenis.capice.main_train import CapiceTrain
+    from molgenis.capice.core.capice_manager import CapiceManager
+
+    CapiceManager().critical_logging_only = True
+    CapiceManager().output_filename = 'benchmark.ubj'
+    train = CapiceTrain(args.input, args.features, 0.2, output_directory, True, True, workers,
+                        tree_method=args.tree_method, threads_per_fit=1,
+                        cache_dir=os.path.join(output_directory, 'cache'))
+    train.n_iterations = args.iterations
+    train.cross_validate = args.cv
+    return train
+
+
+def run_configuration(args, output_directory, workers, shared_memory, queue):
+    from molgenis.capice.utilities.enums import InputColumn
+
+    train = create_train(args, output_directory, workers)
+    train.shared_memory = shared_memory
+    dataset = train.load_and_process()[0]
+    train_set, test_set = train.split_data(dataset, test_size=train.train_test_size)
+    train_set = pd.concat([train_set] * args.scale, ignore_index=True)
+    del dataset
+    # Only the training data and the features of the training (the dataset of the test
+    # split is only used to create the eval set).
+    train_set = train_set[train.train_features + [InputColumn.binarized_label.col_name,
+                                                  InputColumn.sample_weight.col_name]]
+    sampler = PssSampler()
+    base_pss = sampler.get_pss()
+    sampler.start()
+    # The search samples its parameters from the global random state, seeded so that every
+    # configuration searches the same parameters.
+    np.random.seed(args.seed)
+    start = perf_counter()
+    train.train(test_set=test_set, train_set=train_set)
+    train_time = perf_counter() - start
+    sampler.stop()
+    queue.put((train_time, base_pss, sampler.peak_pss))
+
+
+class PssSampler(threading.Thread):
+    """
+    Samples the summed proportional set size of the process and its descendants.
+    """
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_pss = 0
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.peak_pss = max(self.peak_pss, self.get_pss())
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        self.peak_pss = max(self.peak_pss, self.get_pss())
+
+    @classmethod
+    def get_pss(cls):
+        return sum(cls._get_process_pss(pid) for pid in cls._get_process_tree(os.getpid()))
+
+    @staticmethod
+    def _get_process_tree(pid):
+        children = {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat', 'rt') as stat_file:
+                    # The parent pid follows the (parenthesized) command name.
+                    parent = int(stat_file.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(parent, []).append(int(entry))
+        tree = [pid]
+        for process in tree:
+            tree.extend(children.get(process, []))
+        return tree
+
+    @staticmethod
+    def _get_process_pss(pid):
+        try:
+            with open(f'/proc/{pid}/smaps_rollup', 'rt') as smaps_file:
+                for line in smaps_file:
+                    if line.startswith('Pss:'):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            # Exited in the meantime.
+            pass
+        return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark of the memory usage of CAPICE training with concurrent fits.'
+    )
+    parser.add_argument(
+        '-i',
+        '--input',
+        type=str,
+        default=os.path.join(_project_root_directory, 'resources', 'train_test.tsv.gz'),
+        help='input file to scale up (default: resources/train_test.tsv.gz)'
+    )
+    parser.add_argument(
+        '-e',
+        '--features',
+        type=str,
+        default=os.path.join(_project_root_directory, 'resources', 'train_features.json'),
+        help='features to train on (default: resources/train_features.json)'
+    )
+    parser.add_argument('-s', '--scale', type=int, default=50,
+                        help='amount of times the variants are repeated (default: 50)')
+    parser.add_argument('-w', '--workers', type=int, nargs='+', default=[1, 4, 16],
+                        help='amounts of concurrent fits to benchmark (default: 1 4 16)')
+    parser.add_argument('-n', '--iterations', type=int, default=8,
+                        help='iterations of the hyperparameter search (default: 8)')
+    parser.add_argument('-c', '--cv', type=int, default=2,
+                        help='cross validation folds (default: 2)')
+    parser.add_argument('--tree-method', type=str, default='hist',
+                        help='tree method of XGBoost (default: hist)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the hyperparameter search (default: 0)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main()
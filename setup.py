@@ -34,6 +34,9 @@ setup(
         'xgboost==1.7.6'
     ],
     extras_require={
+        'pyarrow': [
+            'pyarrow==15.0.2'
+        ],
         'test': [
             'pytest',  # pytest
             'coverage',  # coverage run -m pytest --junitxml=results.xml && coverage html
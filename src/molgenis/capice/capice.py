@@ -1,4 +1,6 @@
-from molgenis.capice.core.args_handler import ArgsHandler
+import sys
+
+from molgenis.capice.core.startup_profiler import StartupProfiler
 
 
 def main():
@@ -7,6 +9,11 @@ def main():
     args handler for all available modules. For usage, print the help on
     the command line by using (python3) capice(.py) --help.
     """
+    # Started before importing the argument handler, so that its imports are recorded too.
+    if StartupProfiler.FLAG in sys.argv[1:]:
+        StartupProfiler().start()
+    from molgenis.capice.core.args_handler import ArgsHandler
+
     argument_handler = ArgsHandler()
     argument_handler.create()
     argument_handler.handle()
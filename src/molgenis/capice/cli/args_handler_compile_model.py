@@ -0,0 +1,62 @@
+from molgenis.capice.core.capice_manager import CapiceManager
+from molgenis.capice.cli.args_handler_predict import ArgsHandlerPredict
+from molgenis.capice.utilities.compiled_model import CompiledModel
+
+
+class ArgsHandlerCompileModel(ArgsHandlerPredict):
+    """
+    Child class ArgsHandlerCompileModel, specific to the compile-model part of CAPICE. Validates
+    the model to compile the same way predict does.
+    """
+
+    @property
+    def _extension(self):
+        return '.json', '.ubj'
+
+    @property
+    def _required_output_extensions(self):
+        return (CompiledModel.EXTENSION,)
+
+    @property
+    def _empty_output_extension(self):
+        return self._required_output_extensions[0]
+
+    @property
+    def _input_argument(self):
+        return 'model', '-m/--model'
+
+    def create(self):
+        self.parser.add_argument(
+            '-m',
+            '--model',
+            action='append',
+            type=str,
+            required=True,
+            help=f'path to trained model ({self._extension_str()}) (required)'
+        )
+        self.parser.add_argument(
+            '-o',
+            '--output',
+            action='append',
+            type=str,
+            help=f'path to directory or file ({self._required_output_extensions_str()}) for '
+                 f'exporting the compiled model (optional)'
+        )
+        self.parser.add_argument(
+            '-f',
+            '--force',
+            action='store_true',
+            help='overwrites output if it already exists'
+        )
+
+    def _handle_module_specific_args(self, input_path, output_path, output_filename, output_given,
+                                     args):
+        # The input path is the path of the model (-m/--model).
+        model = self.validate_model(input_path)
+        CapiceManager().output_filename = output_filename
+        from molgenis.capice.main_compile_model import CapiceCompileModel
+
+        try:
+            CapiceCompileModel(model, output_path, output_given, self.force).run()
+        except ValueError as cm:
+            self.parser.error(str(cm))
@@ -1,4 +1,3 @@
-from molgenis.capice.main_explain import CapiceExplain
 from molgenis.capice.core.capice_manager import CapiceManager
 from molgenis.capice.cli.args_handler_parent import ArgsHandlerParent
 from molgenis.capice.validators.model_validator import ModelValidator
@@ -54,4 +53,6 @@ class ArgsHandlerExplain(ArgsHandlerParent):
         validator = ModelValidator()
         validator.validate_has_required_attributes(model)
         CapiceManager().output_filename = output_filename
+        from molgenis.capice.main_explain import CapiceExplain
+
         CapiceExplain(model, output_path, output_given, self.force).run()
@@ -1,13 +1,17 @@
 import os
+import typing
 from abc import ABCMeta, abstractmethod
 
-import xgboost as xgb
-
 from molgenis.capice import __version__
 from molgenis.capice.utilities.input_processor import InputProcessor
 from molgenis.capice.validators.input_validator import InputValidator
 from molgenis.capice.validators.version_validator import VersionValidator
 
+if typing.TYPE_CHECKING:
+    import xgboost as xgb
+
+    from molgenis.capice.utilities.compiled_model import CompiledModel
+
 
 class ArgsHandlerParent(metaclass=ABCMeta):
     """
@@ -60,6 +64,14 @@ class ArgsHandlerParent(metaclass=ABCMeta):
         """
         pass
 
+    @property
+    def _input_argument(self) -> tuple[str, str]:
+        """
+        Property to define the destination and name of the argument of the input file, from
+        which the output filename is derived.
+        """
+        return 'input', '-i/--input'
+
     @abstractmethod
     def create(self):
         """
@@ -86,7 +98,8 @@ class ArgsHandlerParent(metaclass=ABCMeta):
             version_validator.validate_capice_version(__version__)
         except ValueError as cm:
             self.parser.error(str(cm))
-        input_path = self._retrieve_argument_from_list(args.input, '-i/--input')
+        input_dest, input_name = self._input_argument
+        input_path = self._retrieve_argument_from_list(getattr(args, input_dest), input_name)
         try:
             self.input_validator.validate_input_path(input_path, extension=self._extension)
         except FileNotFoundError as cm:
@@ -191,7 +204,15 @@ class ArgsHandlerParent(metaclass=ABCMeta):
             return output_filename
 
     @staticmethod
-    def load_model(model_path: os.PathLike) -> xgb.XGBClassifier:
+    def load_model(model_path: os.PathLike) -> 'xgb.XGBClassifier | CompiledModel':
+        from molgenis.capice.utilities.compiled_model import CompiledModel
+
+        if str(model_path).endswith(CompiledModel.EXTENSION):
+            return CompiledModel.load(model_path)
+        # Imported when a model is loaded, so that parsing the arguments does not pay for
+        # importing xgboost (which imports scikit-learn and scipy).
+        import xgboost as xgb
+
         model = xgb.XGBClassifier()
         model.load_model(model_path)
         return model
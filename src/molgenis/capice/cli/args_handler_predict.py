@@ -1,7 +1,12 @@
+import os
+from importlib.util import find_spec
+
 from molgenis.capice import __version__
-from molgenis.capice.main_predict import CapicePredict
 from molgenis.capice.core.capice_manager import CapiceManager
+from molgenis.capice.utilities.vcf_parser import VCFParser
+from molgenis.capice.utilities.input_parser import InputParser
 from molgenis.capice.cli.args_handler_parent import ArgsHandlerParent
+from molgenis.capice.utilities.compiled_model import CompiledModel
 from molgenis.capice.validators.model_validator import ModelValidator
 from molgenis.capice.validators.version_validator import VersionValidator
 
@@ -13,15 +18,19 @@ class ArgsHandlerPredict(ArgsHandlerParent):
 
     def __init__(self, parser):
         super(ArgsHandlerPredict, self).__init__(parser=parser)
+        self.reader_default = InputParser.READERS[0]
+        self.workers_default = 1
+        self.queue_size_default = 2
+        self.engines = ('xgboost', 'numpy')
 
     @property
     def _extension(self):
-        return '.tsv', '.tsv.gz'
+        return ('.tsv', '.tsv.gz') + VCFParser.EXTENSIONS
 
     @property
     def _model_extension(self) -> tuple[str]:
         # Ignore because the amount of values of tuple does not matter.
-        return '.json', '.ubj'  # type: ignore
+        return '.json', '.ubj', CompiledModel.EXTENSION  # type: ignore
 
     def _model_extension_str(self) -> str:
         return self._join_extensions(self._model_extension)
@@ -49,7 +58,8 @@ class ArgsHandlerPredict(ArgsHandlerParent):
             action='append',
             type=str,
             required=True,
-            help=f'path to trained model ({self._model_extension_str()}) (required)'
+            help=f'path to trained model ({self._model_extension_str()}), a compiled model '
+                 f'(capice compile-model) requires --engine numpy (required)'
         )
         self.parser.add_argument(
             '-o',
@@ -65,13 +75,242 @@ class ArgsHandlerPredict(ArgsHandlerParent):
             action='store_true',
             help='overwrites output if it already exists'
         )
+        self.parser.add_argument(
+            '--chunk-size',
+            action='append',
+            type=int,
+            help='amount of variants to read, process and export at a time, limiting memory '
+                 'usage to the size of a chunk (optional)'
+        )
+        self.parser.add_argument(
+            '--reader',
+            action='append',
+            default=[self.reader_default],
+            choices=InputParser.READERS,
+            help=f'reader used to parse the input file, pyarrow requires the optional pyarrow '
+                 f'dependency (default: {self.reader_default}) (optional)'
+        )
+        self.parser.add_argument(
+            '--workers',
+            action='append',
+            type=int,
+            default=[self.workers_default],
+            help=f'amount of processes to process and predict chunks of the input in, the output '
+                 f'is the same as with a single process (default: {self.workers_default}) '
+                 f'(optional)'
+        )
+        self.parser.add_argument(
+            '--pipelined',
+            action='store_true',
+            help='load, predict and export chunks of the input within separate threads, '
+                 'overlapping the decompression of the input and compression of the output with '
+                 'predicting, and log the busy and waiting time of each of these stages'
+        )
+        self.parser.add_argument(
+            '--queue-size',
+            action='append',
+            type=int,
+            default=[self.queue_size_default],
+            help=f'maximum amount of chunks waiting between two stages when using --pipelined '
+                 f'(default: {self.queue_size_default}) (optional)'
+        )
+        self.parser.add_argument(
+            '--threads',
+            action='append',
+            type=int,
+            help='amount of threads XGBoost predicts with (default: the amount of threads of the '
+                 'model, or an equal share of the CPUs per worker when using --workers) '
+                 '(optional)'
+        )
+        self.parser.add_argument(
+            '--batch-size',
+            action='append',
+            type=int,
+            help='maximum amount of variants of which the feature matrix is assembled and '
+                 'predicted at a time, bounding the memory used by the feature matrix (optional)'
+        )
+        self.parser.add_argument(
+            '--engine',
+            action='append',
+            default=[self.engines[0]],
+            choices=self.engines,
+            help=f'engine to predict with, numpy evaluates a compiled model (or compiles the '
+                 f'model when loaded) without using xgboost (default: {self.engines[0]}) '
+                 f'(optional)'
+        )
+        self.parser.add_argument(
+            '--prescored',
+            action='append',
+            type=str,
+            help='path to a prescored store (created using capice prescore with the same model) '
+                 'to obtain the scores of already scored variants from (optional)'
+        )
+        self.parser.add_argument(
+            '--metrics-out',
+            action='append',
+            type=str,
+            help='path to write a JSON report to, of the wall time, CPU time, memory, rows and '
+                 'columns of each stage (optional)'
+        )
+        self.parser.add_argument(
+            '--metrics-trace-allocations',
+            action='store_true',
+            help='trace the Python memory allocations of each stage within the --metrics-out '
+                 'report, which slows down the run and so inflates its wall and CPU times'
+        )
+        self.parser.add_argument(
+            '--explain-plan',
+            action='store_true',
+            help='print the VEP processing plan of the model and exit without predicting'
+        )
 
     def _handle_module_specific_args(self, input_path, output_path, output_filename, output_given,
                                      args):
         model_path = self._retrieve_argument_from_list(args.model, '-m/--model')
         model = self.validate_model(model_path)
+        engine = self._retrieve_argument_from_list(args.engine, '--engine', has_default=True)
+        model = self.validate_engine(engine, model)
+        if args.explain_plan:
+            self.explain_plan(model)
+            return
+        chunk_size = self._retrieve_argument_from_list(args.chunk_size, '--chunk-size')
+        self.validate_chunk_size(chunk_size)
+        reader = self._retrieve_argument_from_list(args.reader, '--reader', has_default=True)
+        self.validate_reader(reader, chunk_size)
+        workers = self._retrieve_argument_from_list(args.workers, '--workers', has_default=True)
+        self.validate_workers(workers, reader)
+        queue_size = self._retrieve_argument_from_list(args.queue_size, '--queue-size',
+                                                       has_default=True)
+        self.validate_pipelined(args.pipelined, queue_size, reader)
+        threads = self._retrieve_argument_from_list(args.threads, '--threads')
+        batch_size = self._retrieve_argument_from_list(args.batch_size, '--batch-size')
+        self.validate_prediction(threads, batch_size)
+        prescored_path = self._retrieve_argument_from_list(args.prescored, '--prescored')
+        prescored = self.validate_prescored(prescored_path, model)
+        metrics_out = self._retrieve_argument_from_list(args.metrics_out, '--metrics-out')
+        self.validate_metrics_out(metrics_out, args.metrics_trace_allocations)
         CapiceManager().output_filename = output_filename
-        CapicePredict(input_path, model, output_path, output_given, self.force).run()
+        if metrics_out is not None:
+            from molgenis.capice.core.metrics_recorder import MetricsRecorder
+
+            MetricsRecorder().enable(trace_allocations=args.metrics_trace_allocations)
+        self._run_module(input_path, model, output_path, output_given, chunk_size, reader,
+                         prescored, workers, args.pipelined, queue_size, threads, batch_size)
+        if metrics_out is not None:
+            MetricsRecorder().write(metrics_out)
+            MetricsRecorder().disable()
+
+    def _run_module(self, input_path, model, output_path, output_given, chunk_size, reader,
+                    prescored, workers, pipelined, queue_size, threads, batch_size):
+        from molgenis.capice.main_predict import CapicePredict
+
+        CapicePredict(input_path, model, output_path, output_given, self.force,
+                      chunk_size=chunk_size, reader=reader, prescored=prescored,
+                      workers=workers, pipelined=pipelined, queue_size=queue_size,
+                      threads=threads, batch_size=batch_size).run()
+
+    @staticmethod
+    def explain_plan(model):
+        """
+        Function to print the VEP processing plan of the model.
+        """
+        from molgenis.capice.utilities.manual_vep_processor import ManualVEPProcessor
+
+        print(ManualVEPProcessor().get_plan(list(model.vep_features.keys())).explain())
+
+    def validate_chunk_size(self, chunk_size):
+        """
+        Function to validate that the chunk size, if given, is at least 1.
+        """
+        if chunk_size is not None and chunk_size < 1:
+            self.parser.error('The chunk size has to be at least 1!')
+
+    def validate_reader(self, reader, chunk_size):
+        """
+        Function to validate that the reader is available and supports the chunk size argument.
+        """
+        if reader == 'pyarrow':
+            if find_spec('pyarrow') is None:
+                self.parser.error('The pyarrow reader requires pyarrow to be installed!')
+            if chunk_size is not None:
+                self.parser.error('The pyarrow reader does not support --chunk-size!')
+
+    def validate_workers(self, workers, reader):
+        """
+        Function to validate that the amount of workers is at least 1 and, if above 1, supported
+        by the reader.
+        """
+        if workers < 1:
+            self.parser.error('The amount of workers has to be at least 1!')
+        if workers > 1 and reader == 'pyarrow':
+            self.parser.error('The pyarrow reader does not support --workers!')
+
+    def validate_pipelined(self, pipelined, queue_size, reader):
+        """
+        Function to validate that the queue size is at least 1 and that pipelining, if enabled, is
+        supported by the reader.
+        """
+        if queue_size < 1:
+            self.parser.error('The queue size has to be at least 1!')
+        if pipelined and reader == 'pyarrow':
+            self.parser.error('The pyarrow reader does not support --pipelined!')
+
+    def validate_prediction(self, threads, batch_size):
+        """
+        Function to validate that the amount of threads and the batch size, if given, are at
+        least 1.
+        """
+        if threads is not None and threads < 1:
+            self.parser.error('The amount of threads has to be at least 1!')
+        if batch_size is not None and batch_size < 1:
+            self.parser.error('The batch size has to be at least 1!')
+
+    def validate_metrics_out(self, metrics_out, trace_allocations=False):
+        """
+        Function to validate that the directory of the metrics report, if given, exists and that
+        the report does not exist yet (unless forced). Tracing allocations requires the report.
+        """
+        if metrics_out is None:
+            if trace_allocations:
+                self.parser.error('--metrics-trace-allocations requires --metrics-out!')
+            return
+        directory = os.path.dirname(os.path.abspath(metrics_out))
+        if not os.path.isdir(directory):
+            self.parser.error(f'The directory of --metrics-out {directory} does not exist!')
+        if os.path.exists(metrics_out) and not self.force:
+            self.parser.error(f'Metrics report {metrics_out} already exists! Use -f to overwrite.')
+
+    def validate_engine(self, engine, model):
+        """
+        Function to validate that a compiled model is predicted using the numpy engine, and to
+        compile the model if the numpy engine is used with a model that is not compiled.
+        :return: model, xgb.XGBClassifier or CompiledModel class
+        """
+        is_compiled = isinstance(model, CompiledModel)
+        if engine == 'xgboost' and is_compiled:
+            self.parser.error('A compiled model can only be used with --engine numpy!')
+        if engine == 'numpy' and not is_compiled:
+            try:
+                model = CompiledModel.compile(model)
+            except ValueError as cm:
+                self.parser.error(str(cm))
+        return model
+
+    def validate_prescored(self, prescored_path, model):
+        """
+        Function to validate that the prescored store, if given, exists and is created with model.
+        :return: PrescoredStore or None
+        """
+        if prescored_path is None:
+            return None
+        from molgenis.capice.utilities.prescored_store import PrescoredStore
+
+        try:
+            prescored = PrescoredStore(prescored_path)
+            prescored.validate_model(model)
+        except (FileNotFoundError, ValueError) as cm:
+            self.parser.error(str(cm))
+        return prescored
 
     def validate_model(self, model_path):
         """
@@ -84,7 +323,10 @@ class ArgsHandlerPredict(ArgsHandlerParent):
             self.input_validator.validate_input_path(model_path, extension=self._model_extension)
         except FileNotFoundError as cm:
             self.parser.error(str(cm))
-        model = self.load_model(model_path)
+        try:
+            model = self.load_model(model_path)
+        except ValueError as cm:
+            self.parser.error(str(cm))
         model_validator = ModelValidator()
         model_validator.validate_has_required_attributes(model)
         version_validator = VersionValidator()
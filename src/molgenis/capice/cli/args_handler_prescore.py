@@ -0,0 +1,25 @@
+from molgenis.capice.cli.args_handler_predict import ArgsHandlerPredict
+
+
+class ArgsHandlerPrescore(ArgsHandlerPredict):
+    """
+    Child class ArgsHandlerPrescore, specific to the prescore part of CAPICE
+    """
+
+    @property
+    def _required_output_extensions(self):
+        # Only gzip compressed, since each block of the store is a separate gzip member.
+        return ('.tsv.gz',)
+
+    @property
+    def _empty_output_extension(self):
+        return self._required_output_extensions[0]
+
+    def _run_module(self, input_path, model, output_path, output_given, chunk_size, reader,
+                    prescored, workers, pipelined, queue_size, threads, batch_size):
+        from molgenis.capice.main_prescore import CapicePrescore
+
+        CapicePrescore(input_path, model, output_path, output_given, self.force,
+                       chunk_size=chunk_size, reader=reader, prescored=prescored,
+                       workers=workers, pipelined=pipelined, queue_size=queue_size,
+                       threads=threads, batch_size=batch_size).run()
@@ -0,0 +1,134 @@
+import os
+
+from molgenis.capice import __version__
+from molgenis.capice.cli.args_handler_predict import ArgsHandlerPredict
+from molgenis.capice.validators.version_validator import VersionValidator
+
+
+class ArgsHandlerServe(ArgsHandlerPredict):
+    """
+    Child class ArgsHandlerServe, specific to the serve part of CAPICE. Serve does not have
+    input or output files, but validates its models the same way predict does.
+    """
+
+    def __init__(self, parser):
+        super(ArgsHandlerServe, self).__init__(parser=parser)
+        self.host_default = '127.0.0.1'
+        self.port_default = 8080
+        self.max_batch_size_default = 10000
+        self.batch_wait_default = 10
+        self.max_payload_size_default = 100
+
+    def create(self):
+        self.parser.add_argument(
+            '-m',
+            '--model',
+            action='append',
+            type=str,
+            required=True,
+            help=f'path to trained model ({self._model_extension_str()}), can be supplied '
+                 f'multiple times to serve multiple models, each requested by its filename '
+                 f'without extension (required)'
+        )
+        self.parser.add_argument(
+            '--host',
+            action='append',
+            type=str,
+            default=[self.host_default],
+            help=f'host to serve on (default: {self.host_default}) (optional)'
+        )
+        self.parser.add_argument(
+            '--port',
+            action='append',
+            type=int,
+            default=[self.port_default],
+            help=f'port to serve on (default: {self.port_default}) (optional)'
+        )
+        self.parser.add_argument(
+            '--socket',
+            action='append',
+            type=str,
+            help='path of a Unix socket to serve on instead of --host and --port (optional)'
+        )
+        self.parser.add_argument(
+            '--max-batch-size',
+            action='append',
+            type=int,
+            default=[self.max_batch_size_default],
+            help=f'amount of variants of concurrent requests at which these are predicted '
+                 f'together without waiting for more requests '
+                 f'(default: {self.max_batch_size_default}) (optional)'
+        )
+        self.parser.add_argument(
+            '--batch-wait',
+            action='append',
+            type=int,
+            default=[self.batch_wait_default],
+            help=f'maximum amount of milliseconds to wait for concurrent requests to predict '
+                 f'together (default: {self.batch_wait_default}) (optional)'
+        )
+        self.parser.add_argument(
+            '--max-payload-size',
+            action='append',
+            type=int,
+            default=[self.max_payload_size_default],
+            help=f'maximum size in megabytes of a posted payload, both as posted and '
+                 f'decompressed (default: {self.max_payload_size_default}) (optional)'
+        )
+
+    def _handle_args(self, args):
+        version_validator = VersionValidator()
+        try:
+            version_validator.validate_capice_version(__version__)
+        except ValueError as cm:
+            self.parser.error(str(cm))
+        models = self.validate_models(args.model)
+        host = self._retrieve_argument_from_list(args.host, '--host', has_default=True)
+        port = self._retrieve_argument_from_list(args.port, '--port', has_default=True)
+        socket_path = self._retrieve_argument_from_list(args.socket, '--socket')
+        max_batch_size = self._retrieve_argument_from_list(args.max_batch_size,
+                                                           '--max-batch-size', has_default=True)
+        batch_wait = self._retrieve_argument_from_list(args.batch_wait, '--batch-wait',
+                                                       has_default=True)
+        self.validate_batching(max_batch_size, batch_wait)
+        max_payload_size = self._retrieve_argument_from_list(
+            args.max_payload_size, '--max-payload-size', has_default=True
+        )
+        self.validate_max_payload_size(max_payload_size)
+        from molgenis.capice.main_serve import CapiceServe
+
+        CapiceServe(models, host=host, port=port, socket_path=socket_path,
+                    max_batch_size=max_batch_size, batch_wait=batch_wait / 1000,
+                    max_payload_size=max_payload_size * 1024 ** 2).run()
+
+    def validate_models(self, model_paths):
+        """
+        Function to validate each model and to name it by its filename without extension.
+        :return: dict of model name and model
+        """
+        models = {}
+        for model_path in model_paths:
+            name = os.path.basename(model_path)
+            for extension in self._model_extension:
+                name = name.removesuffix(extension)
+            if name in models:
+                self.parser.error(f'Multiple models are named {name}!')
+            models[name] = self.validate_model(model_path)
+        return models
+
+    def validate_batching(self, max_batch_size, batch_wait):
+        """
+        Function to validate that the maximum batch size is at least 1 and the batch wait is not
+        negative.
+        """
+        if max_batch_size < 1:
+            self.parser.error('The maximum batch size has to be at least 1!')
+        if batch_wait < 0:
+            self.parser.error('The batch wait can not be negative!')
+
+    def validate_max_payload_size(self, max_payload_size):
+        """
+        Function to validate that the maximum payload size is at least 1 megabyte.
+        """
+        if max_payload_size < 1:
+            self.parser.error('The maximum payload size has to be at least 1!')
@@ -1,4 +1,5 @@
-from molgenis.capice.main_train import CapiceTrain
+import os
+
 from molgenis.capice.core.capice_manager import CapiceManager
 from molgenis.capice.cli.args_handler_parent import ArgsHandlerParent
 
@@ -13,6 +14,10 @@ class ArgsHandlerTrain(ArgsHandlerParent):
         super(ArgsHandlerTrain, self).__init__(parser=parser)
         self.split_default = 0.2
         self.n_threads_default = 1
+        # Identical to CapiceTrain.TREE_METHODS, which is not imported to not import xgboost.
+        self.tree_methods = ('exact', 'hist', 'approx')
+        # Identical to CapiceTrain.SEARCHES.
+        self.searches = ('random', 'halving')
 
     @property
     def _extension(self):
@@ -79,9 +84,63 @@ class ArgsHandlerTrain(ArgsHandlerParent):
             action='append',
             default=[self.n_threads_default],
             type=int,
-            help=f'The amount of threads that can be used by XGBoost to parallel train (default: '
+            help=f'The amount of threads that can be used by XGBoost to parallel train, divided '
+                 f'over concurrent fits and the threads within each fit (default: '
                  f'{self.n_threads_default})'
         )
+        self.parser.add_argument(
+            '--threads-per-fit',
+            action='append',
+            type=int,
+            help='the amount of threads of each fit of the hyperparameter search, limiting the '
+                 'amount of concurrent fits to --threads divided by this (default: as many '
+                 'concurrent fits as possible) (optional)'
+        )
+        self.parser.add_argument(
+            '--tree-method',
+            action='append',
+            default=[self.tree_methods[0]],
+            choices=self.tree_methods,
+            help=f'the tree construction algorithm of XGBoost, hist and approx are considerably '
+                 f'faster on large datasets (default: {self.tree_methods[0]}) (optional)'
+        )
+        self.parser.add_argument(
+            '--search',
+            action='append',
+            default=[self.searches[0]],
+            choices=self.searches,
+            help=f'the hyperparameter search, random cross validates every candidate on all '
+                 f'training samples, halving (successive halving) continues only with the best '
+                 f'candidates on increasingly more samples (default: {self.searches[0]}) '
+                 f'(optional)'
+        )
+        self.parser.add_argument(
+            '--cache-dir',
+            action='append',
+            type=str,
+            help='path to a directory caching the processed training data, so that training '
+                 'again on the same input and features skips processing the input (optional)'
+        )
+        self.parser.add_argument(
+            '--out-of-core',
+            action='store_true',
+            help='train without keeping the input in memory, by processing it in chunks into '
+                 'memory-mapped arrays within --cache-dir (or a temporary directory within the '
+                 'output directory) (optional)'
+        )
+        self.parser.add_argument(
+            '--chunk-size',
+            action='append',
+            type=int,
+            help='the amount of variants to process at a time when using --out-of-core '
+                 '(default: 10000) (optional)'
+        )
+        self.parser.add_argument(
+            '--sparse',
+            action='store_true',
+            help='train on a sparse feature matrix, in which the 0 values of features that only '
+                 'contain 0 or 1 are not stored (optional)'
+        )
 
     def _handle_module_specific_args(self, input_path, output_path, output_filename, output_given,
                                      args):
@@ -94,8 +153,21 @@ class ArgsHandlerTrain(ArgsHandlerParent):
         n_threads = self._retrieve_argument_from_list(args.threads, '-t/--threads',
                                                       has_default=True)
         self.validate_n_threads(n_threads)
+        threads_per_fit = self._retrieve_argument_from_list(args.threads_per_fit,
+                                                            '--threads-per-fit')
+        self.validate_threads_per_fit(threads_per_fit, n_threads)
+        tree_method = self._retrieve_argument_from_list(args.tree_method, '--tree-method',
+                                                        has_default=True)
+        search = self._retrieve_argument_from_list(args.search, '--search', has_default=True)
+        cache_dir = self._retrieve_argument_from_list(args.cache_dir, '--cache-dir')
+        self.validate_cache_dir(cache_dir)
+        chunk_size = self._retrieve_argument_from_list(args.chunk_size, '--chunk-size')
+        self.validate_out_of_core(args.out_of_core, chunk_size, args.sparse)
 
         CapiceManager().output_filename = output_filename
+        # Imported when selected, since main_train imports scikit-learn and scipy.
+        from molgenis.capice.main_train import CapiceTrain
+
         CapiceTrain(
             input_path,
             features,
@@ -103,7 +175,14 @@ class ArgsHandlerTrain(ArgsHandlerParent):
             output_path,
             output_given,
             self.force,
-            n_threads
+            n_threads,
+            sparse=args.sparse,
+            tree_method=tree_method,
+            threads_per_fit=threads_per_fit,
+            search=search,
+            cache_dir=cache_dir,
+            out_of_core=args.out_of_core,
+            chunk_size=chunk_size
         ).run()
 
     def validate_n_threads(self, n_threads):
@@ -113,6 +192,35 @@ class ArgsHandlerTrain(ArgsHandlerParent):
         if n_threads < 1:
             self.parser.error('The amount of threads has to be at least 1!')
 
+    def validate_threads_per_fit(self, threads_per_fit, n_threads):
+        """
+        Function to validate that the threads per fit, if given, lie between 1 and the amount of
+        threads.
+        """
+        if threads_per_fit is not None and (threads_per_fit < 1 or threads_per_fit > n_threads):
+            self.parser.error('The threads per fit have to be at least 1 and at most the amount '
+                              'of threads!')
+
+    def validate_cache_dir(self, cache_dir):
+        """
+        Function to validate that the cache directory, if given, is not an existing file.
+        """
+        if cache_dir is not None and os.path.exists(cache_dir) and not os.path.isdir(cache_dir):
+            self.parser.error(f'The cache directory {cache_dir} is not a directory!')
+
+    def validate_out_of_core(self, out_of_core, chunk_size, sparse):
+        """
+        Function to validate that the chunk size, if given, is at least 1 and only given for
+        out-of-core training, which can not be combined with a sparse feature matrix.
+        """
+        if chunk_size is not None:
+            if chunk_size < 1:
+                self.parser.error('The chunk size has to be at least 1!')
+            if not out_of_core:
+                self.parser.error('--chunk-size can only be used with --out-of-core!')
+        if out_of_core and sparse:
+            self.parser.error('--out-of-core can not be combined with --sparse!')
+
     def validate_test_split(self, test_split):
         """
         Validator for test split to make sure it lies between 0 and 1
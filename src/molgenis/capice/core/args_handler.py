@@ -3,9 +3,13 @@ import argparse
 
 from molgenis.capice import __version__
 from molgenis.capice.core.capice_manager import CapiceManager
+from molgenis.capice.core.startup_profiler import StartupProfiler
 from molgenis.capice.cli.args_handler_train import ArgsHandlerTrain
 from molgenis.capice.cli.args_handler_predict import ArgsHandlerPredict
 from molgenis.capice.cli.args_handler_explain import ArgsHandlerExplain
+from molgenis.capice.cli.args_handler_serve import ArgsHandlerServe
+from molgenis.capice.cli.args_handler_prescore import ArgsHandlerPrescore
+from molgenis.capice.cli.args_handler_compile_model import ArgsHandlerCompileModel
 
 
 class ArgsHandler:
@@ -45,6 +49,9 @@ class ArgsHandler:
         Classmethod to create the ArgsHandler ArgumentParser instance
         and adds the subparsers to ArgsHandler. Does not automatically handle
         the input arguments, please use ArgsHandler.create().handle() for that.
+
+        The module specific handlers only import their module (main_predict, main_train etc.)
+        once it is selected, so that creating the subparsers stays cheap.
         """
         self._add_arguments()
         subparsers = self.parser.add_subparsers()
@@ -57,6 +64,15 @@ class ArgsHandler:
         explainer = ArgsHandlerExplain(subparsers.add_parser('explain'))
         explainer.create()
         explainer.handle()
+        prescorer = ArgsHandlerPrescore(subparsers.add_parser('prescore'))
+        prescorer.create()
+        prescorer.handle()
+        server = ArgsHandlerServe(subparsers.add_parser('serve'))
+        server.create()
+        server.handle()
+        compiler = ArgsHandlerCompileModel(subparsers.add_parser('compile-model'))
+        compiler.create()
+        compiler.handle()
 
     def _add_arguments(self):
         self.parser.add_argument(
@@ -66,6 +82,12 @@ class ArgsHandler:
             default=0,
             help='verbose mode. multiple -v options increase the verbosity')
 
+        self.parser.add_argument(
+            StartupProfiler.FLAG,
+            action='store_true',
+            help='report the import time per module to stderr on exit'
+        )
+
         self.parser.add_argument(
             '--version',
             action='version',
@@ -1,11 +1,15 @@
 import os
+import gzip
+from typing import TextIO
+from collections.abc import Iterable
 
 import pandas as pd
 
 from molgenis.capice.core.logger import Logger
 from molgenis.capice.core.capice_manager import CapiceManager
+from molgenis.capice.core.metrics_recorder import MetricsRecorder
 from molgenis.capice.utilities import check_file_exist
-from molgenis.capice.utilities.enums import Column, UniqueSeparator
+from molgenis.capice.utilities.enums import Column, PreservedColumn
 
 
 class CapiceExporter:
@@ -19,11 +23,7 @@ class CapiceExporter:
         self.file_path = file_path
         self.output_given = output_given
         self.force = force
-        self.export_cols = [
-            Column.chr.value,
-            Column.pos.value,
-            Column.ref.value.lower(),
-            Column.alt.value.lower(),
+        prediction_cols = [
             Column.gene_name.value,
             Column.gene_id.value,
             Column.id_source.value,
@@ -32,6 +32,10 @@ class CapiceExporter:
             Column.score.value,
             Column.suggested_class.value
         ]
+        # The preserved columns are exported under their export name (such as ref for REF).
+        self.export_cols = [column.col_name for column in PreservedColumn] + prediction_cols
+        self.export_header = [column.col_export_name for column in PreservedColumn] + \
+            prediction_cols
 
     def export_capice_prediction(self, datafile: pd.DataFrame):
         """
@@ -40,20 +44,57 @@ class CapiceExporter:
         :param datafile: prediction pandas DataFrame
         """
         export_path = os.path.join(self.file_path, self.capice_filename)
-        datafile = self._post_process_split_cols(datafile)
-        datafile = self._post_process_set_correct_dtypes(datafile)
+        with MetricsRecorder().stage('CapiceExporter', datafile) as run:
+            datafile = self._post_process_prediction(datafile)
+            run.rows_out = datafile.shape[0]
+            check_file_exist(export_path, self.force)
+            datafile.to_csv(export_path, sep='\t', index=False, columns=self.export_cols,
+                            header=self.export_header)
+        if not self.output_given:
+            print('Successfully exported CAPICE datafile to: %s', export_path)
+
+    def export_capice_prediction_chunks(self, datafiles: Iterable[pd.DataFrame]):
+        """
+        Function specific to export the chunks of the dataset created for the prediction
+        pathway to a single output file. Chunks are written as soon as they are supplied,
+        resulting in the same output as export_capice_prediction() over all chunks combined.
+        :param datafiles: iterable of prediction pandas DataFrames
+        """
+        export_path = os.path.join(self.file_path, self.capice_filename)
         check_file_exist(export_path, self.force)
-        datafile[self.export_cols].to_csv(export_path, sep='\t', index=False)
+        header = True
+        with self._open_export_file(export_path) as export_file:
+            for datafile in datafiles:
+                self.write_capice_prediction(datafile, export_file, header=header)
+                header = False
         if not self.output_given:
             print('Successfully exported CAPICE datafile to: %s', export_path)
 
+    def write_capice_prediction(self, datafile: pd.DataFrame, export_file: TextIO,
+                                header: bool = True):
+        """
+        Function to write the dataset created for the prediction pathway to an already opened
+        (text) file or buffer, in the same format as export_capice_prediction().
+        :param datafile: prediction pandas DataFrame
+        :param export_file: opened text file or buffer to write to
+        :param header: whether the header is written
+        """
+        with MetricsRecorder().stage('CapiceExporter', datafile) as run:
+            datafile = self._post_process_prediction(datafile)
+            run.rows_out = datafile.shape[0]
+            datafile.to_csv(export_file, sep='\t', index=False, columns=self.export_cols,
+                            header=self.export_header if header else False)
+
     @staticmethod
-    def _post_process_split_cols(datafile: pd.DataFrame):
-        datafile[
-            [Column.chr.value, Column.pos.value, Column.ref.value.lower(), Column.alt.value.lower()]
-        ] = datafile[Column.chr_pos_ref_alt.value].str.split(
-            UniqueSeparator.unique_separator.value, expand=True)
-        return datafile
+    def _open_export_file(export_path: str) -> TextIO:
+        # newline='' so that the line terminator pandas writes is not translated,
+        # identical to how pandas opens an output path itself.
+        if export_path.endswith('.gz'):
+            return gzip.open(export_path, 'wt', newline='')
+        return open(export_path, 'wt', newline='')
+
+    def _post_process_prediction(self, datafile: pd.DataFrame) -> pd.DataFrame:
+        return self._post_process_set_correct_dtypes(datafile)
 
     @staticmethod
     def _post_process_set_correct_dtypes(datafile: pd.DataFrame):
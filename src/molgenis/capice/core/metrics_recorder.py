@@ -0,0 +1,301 @@
+import json
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter, process_time
+from collections.abc import Iterable, Iterator
+
+from molgenis.capice import __version__
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Not available on Windows, in which case no RSS is reported.
+    resource = None  # type: ignore
+
+
+class StageMetrics:
+    """
+    Metrics of a single stage of CAPICE, summed over all its runs (such as over all chunks and
+    worker processes).
+
+    The tracemalloc and RSS figures are the change of memory during a run: tracemalloc_delta
+    the memory allocated (through Python) that is still in use after the run, tracemalloc_peak
+    the maximum (over all runs) peak allocated during a run and rss_peak_delta the increase of
+    the peak resident set size of the process. The tracemalloc figures are None unless
+    allocations are traced.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.rows_in: int | None = None
+        self.rows_out: int | None = None
+        self.columns_added: list[str] = []
+        self.tracemalloc_delta: int | None = None
+        self.tracemalloc_peak: int | None = None
+        self.rss_peak_delta: int | None = None
+
+    def merge(self, other: 'StageMetrics'):
+        """
+        Adds the runs of other (of the same stage) to this stage.
+        """
+        self.calls += other.calls
+        self.wall_time += other.wall_time
+        self.cpu_time += other.cpu_time
+        self.rows_in = self._add(self.rows_in, other.rows_in)
+        self.rows_out = self._add(self.rows_out, other.rows_out)
+        self.columns_added.extend(
+            column for column in other.columns_added if column not in self.columns_added
+        )
+        self.tracemalloc_delta = self._add(self.tracemalloc_delta, other.tracemalloc_delta)
+        self.tracemalloc_peak = self._max(self.tracemalloc_peak, other.tracemalloc_peak)
+        self.rss_peak_delta = self._add(self.rss_peak_delta, other.rss_peak_delta)
+
+    @staticmethod
+    def _add(value: int | None, other: int | None) -> int | None:
+        if value is None:
+            return other
+        if other is None:
+            return value
+        return value + other
+
+    @staticmethod
+    def _max(value: int | None, other: int | None) -> int | None:
+        if value is None:
+            return other
+        if other is None:
+            return value
+        return max(value, other)
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'wall_time': self.wall_time,
+            'cpu_time': self.cpu_time,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'columns_added': self.columns_added,
+            'tracemalloc_delta': self.tracemalloc_delta,
+            'tracemalloc_peak': self.tracemalloc_peak,
+            'rss_peak_delta': self.rss_peak_delta
+        }
+
+
+class StageRun:
+    """
+    A single run of a stage, to which the stage supplies the dataset it processed and the
+    dataset it produced.
+    """
+
+    def __init__(self, dataset=None):
+        self.rows_in: int | None = None
+        self.rows_out: int | None = None
+        self.columns_in: list[str] = []
+        self.columns_out: list[str] = []
+        self.discarded = False
+        if dataset is not None:
+            self.set_input(dataset)
+
+    def set_input(self, dataset):
+        self.rows_in = dataset.shape[0]
+        self.columns_in = list(dataset.columns)
+
+    def set_output(self, dataset):
+        self.rows_out = dataset.shape[0]
+        self.columns_out = list(dataset.columns)
+
+    def discard(self):
+        """
+        Excludes the run from the metrics of the stage.
+        """
+        self.discarded = True
+
+
+class MetricsRecorder:
+    """
+    Singleton recording the wall time, CPU time, memory, rows and columns of each stage of
+    CAPICE, written as a JSON report through write(). Only records once enabled. Tracing the
+    Python memory allocations through tracemalloc is a separate option of enable(), since it
+    slows down (and so inflates the wall and CPU time of) every allocating stage.
+
+    Stages that run concurrently (within the threads of --pipelined) share the process, so
+    their CPU time and memory figures overlap.
+    """
+    instance: 'MetricsRecorder | None' = None
+    # Prefix of the stage names of the VEP processors.
+    VEP_PROCESSOR_PREFIX = 'VEPProcessor.'
+    enabled: bool
+    trace_allocations: bool
+    stages: dict[str, StageMetrics]
+    _lock: threading.Lock
+    _started_tracing: bool
+    _start: tuple[float, float]
+
+    def __new__(cls):
+        if cls.instance is None:
+            cls.instance = super().__new__(cls)
+            cls.instance.enabled = False
+            cls.instance.trace_allocations = False
+            cls.instance.stages = {}
+            cls.instance._lock = threading.Lock()
+            cls.instance._started_tracing = False
+            cls.instance._start = (0.0, 0.0)
+        return cls.instance
+
+    def enable(self, trace_allocations: bool = False):
+        """
+        Starts recording, clearing earlier recorded stages.
+
+        Args:
+            trace_allocations:
+                Whether to trace the Python memory allocations of each stage, which slows down
+                the run.
+        """
+        self.enabled = True
+        self.trace_allocations = trace_allocations
+        self.stages = {}
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._start = (perf_counter(), process_time())
+
+    def disable(self):
+        """
+        Stops recording, and tracing memory allocations if started by enable().
+        """
+        self.enabled = False
+        self.trace_allocations = False
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str, dataset=None) -> Iterator[StageRun]:
+        """
+        Records a run of stage name over the code within the context.
+
+        Args:
+            name:
+                The name of the stage.
+            dataset:
+                The dataset the stage processes, if any.
+        Yields:
+            StageRun:
+                The run, of which the stage can supply the input and output datasets.
+        """
+        run = StageRun(dataset if self.enabled else None)
+        if not self.enabled:
+            yield run
+            return
+        rss_peak = self.get_rss_peak()
+        if self.trace_allocations:
+            traced = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall_time = perf_counter()
+        cpu_time = process_time()
+        yield run
+        if run.discarded:
+            return
+        metrics = StageMetrics(name)
+        metrics.calls = 1
+        metrics.wall_time = perf_counter() - wall_time
+        metrics.cpu_time = process_time() - cpu_time
+        if self.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            metrics.tracemalloc_delta = current - traced
+            metrics.tracemalloc_peak = max(peak - traced, 0)
+        rss_peak_after = self.get_rss_peak()
+        if rss_peak is not None and rss_peak_after is not None:
+            metrics.rss_peak_delta = rss_peak_after - rss_peak
+        metrics.rows_in = run.rows_in
+        metrics.rows_out = run.rows_out
+        columns_in = set(run.columns_in)
+        metrics.columns_added = [column for column in run.columns_out
+                                 if column not in columns_in]
+        self.merge([metrics])
+
+    def record_iteration(self, name: str, iterable: Iterable) -> Iterator:
+        """
+        Records obtaining each item of iterable (such as the next chunk of a reader) as a run of
+        stage name.
+        """
+        iterator = iter(iterable)
+        end = object()
+        while True:
+            with self.stage(name) as run:
+                item = next(iterator, end)
+                if item is end:
+                    run.discard()
+                else:
+                    run.set_output(item)
+            if item is end:
+                return
+            yield item
+
+    def merge(self, stages: Iterable[StageMetrics]):
+        """
+        Adds the runs of stages, for instance as recorded within a worker process.
+        """
+        with self._lock:
+            for metrics in stages:
+                if metrics.name in self.stages:
+                    self.stages[metrics.name].merge(metrics)
+                else:
+                    self.stages[metrics.name] = metrics
+
+    def pop_stages(self) -> list[StageMetrics]:
+        """
+        Returns the recorded stages and clears these.
+        """
+        with self._lock:
+            stages = list(self.stages.values())
+            self.stages = {}
+        return stages
+
+    @staticmethod
+    def get_rss_peak() -> int | None:
+        """
+        Returns:
+            int or None:
+                The peak resident set size of the process in bytes, None if not available.
+        """
+        if resource is None:
+            return None
+        rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS.
+        return rss_peak if sys.platform == 'darwin' else rss_peak * 1024
+
+    def get_report(self) -> dict:
+        """
+        Returns:
+            dict:
+                The report of the total and the recorded stages (in order of first run).
+        """
+        with self._lock:
+            stages = [metrics.to_dict() for metrics in self.stages.values()]
+        vep_processors = [stage for stage in stages
+                          if stage['name'].startswith(self.VEP_PROCESSOR_PREFIX)]
+        return {
+            'CAPICE_version': __version__,
+            'wall_time': perf_counter() - self._start[0],
+            'cpu_time': process_time() - self._start[1],
+            'rss_peak': self.get_rss_peak(),
+            # The wall and CPU times include the overhead of tracing allocations.
+            'traced_allocations': self.trace_allocations,
+            'slowest_vep_processor': max(
+                vep_processors, key=lambda stage: stage['wall_time']
+            )['name'][len(self.VEP_PROCESSOR_PREFIX):] if len(vep_processors) > 0 else None,
+            'stages': stages
+        }
+
+    def write(self, path: str):
+        """
+        Writes the report as JSON to path.
+        """
+        with open(path, 'wt') as report_file:
+            json.dump(self.get_report(), report_file, indent=2)
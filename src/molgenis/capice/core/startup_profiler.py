@@ -0,0 +1,97 @@
+import sys
+import atexit
+import importlib.abc
+from time import perf_counter
+
+
+class StartupProfiler(importlib.abc.MetaPathFinder):
+    """
+    Records the import time of each module that is imported once started, similar to
+    python -X importtime. The cumulative time of a module includes the imports done by the
+    module itself, the self time excludes these.
+
+    Only the execution of a module is timed, so the time to find a module is not included.
+    """
+    FLAG = '--startup-profile'
+
+    def __init__(self):
+        self.timings: list[tuple[str, float, float]] = []
+        # The cumulative time of the imports done by each module that is currently executing.
+        self._nested: list[float] = []
+
+    def start(self):
+        """
+        Starts recording imports and reports them to stderr when the interpreter exits.
+        """
+        sys.meta_path.insert(0, self)
+        atexit.register(self.report)
+
+    def stop(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, self)
+            return spec
+        return None
+
+    def _record(self, name: str, cumulative: float):
+        self_time = cumulative - self._nested.pop()
+        if len(self._nested) > 0:
+            self._nested[-1] += cumulative
+        self.timings.append((name, self_time, cumulative))
+
+    def report(self, limit: int = 25, file=None):
+        """
+        Prints the modules with the highest cumulative import time.
+
+        Args:
+            limit:
+                The amount of modules to print.
+            file:
+                The file to print to, stderr if None.
+        """
+        self.stop()
+        if file is None:
+            file = sys.stderr
+        total = sum(self_time for _, self_time, _ in self.timings)
+        print(f'Import time of {len(self.timings)} modules: {total:.3f} s, '
+              f'top {limit} by cumulative time:', file=file)
+        print(f'{"self (ms)":>10} {"cumulative (ms)":>16}  module', file=file)
+        for name, self_time, cumulative in sorted(
+                self.timings, key=lambda timing: timing[2], reverse=True
+        )[:limit]:
+            print(f'{self_time * 1000:>10.1f} {cumulative * 1000:>16.1f}  {name}', file=file)
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """
+    Wraps the loader of a module to time its execution. The module keeps its original loader.
+    """
+
+    def __init__(self, loader, profiler: StartupProfiler):
+        self.loader = loader
+        self.profiler = profiler
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        module.__loader__ = self.loader
+        module.__spec__.loader = self.loader
+        self.profiler._nested.append(0.0)
+        start = perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profiler._record(module.__name__, perf_counter() - start)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
@@ -1,10 +1,12 @@
 import os
 from abc import ABC, abstractmethod
+from collections.abc import Collection, Iterable, Iterator
 
 import pandas as pd
 
 from molgenis.capice.core.logger import Logger
 from molgenis.capice.core.capice_manager import CapiceManager
+from molgenis.capice.core.metrics_recorder import MetricsRecorder
 from molgenis.capice.utilities.input_parser import InputParser
 from molgenis.capice.core.capice_exporter import CapiceExporter
 from molgenis.capice.utilities.manual_vep_processor import ManualVEPProcessor
@@ -38,19 +40,70 @@ class Main(ABC):
         self.force = force
         self.log.debug('Force output if exists: %s', self.force)
 
+        # Input file reader.
+        self.reader = 'pandas'
+
     @abstractmethod
     def run(self):
         pass
 
-    def _load_file(self, additional_required_features: list | None = None):
+    def _load_file(self, additional_required_features: list | None = None,
+                   usecols: Collection[str] | None = None,
+                   dtype: dict[str, object] | None = None):
         """
         Function to load the input TSV file into main
         :return: pandas DataFrame
         """
-        input_parser = InputParser()
-        input_file = input_parser.parse(input_file_path=self.infile)
-        post_load_processor = LoadFilePostProcessor(dataset=input_file)
-        input_file = post_load_processor.process()
+        input_parser = InputParser(reader=self.reader)
+        with MetricsRecorder().stage('InputParser.parse') as run:
+            input_file = input_parser.parse(
+                input_file_path=self.infile, usecols=usecols, dtype=dtype
+            )
+            run.set_output(input_file)
+        return self._post_process_loaded_file(input_file, additional_required_features)
+
+    def _load_file_chunks(self, chunk_size: int,
+                          additional_required_features: list | None = None,
+                          usecols: Collection[str] | None = None,
+                          dtype: dict[str, object] | None = None) -> Iterator[pd.DataFrame]:
+        """
+        Function to load the input TSV file into main in chunks of at most chunk_size samples.
+        Each chunk is post-processed and validated the same way _load_file() does for the full
+        input file.
+
+        Args:
+            chunk_size:
+                The maximum amount of samples a single chunk contains.
+            additional_required_features:
+                Features that are required to be present within the input file on top of
+                the minimally required columns.
+            usecols:
+                Collection of column names to limit reading the input file to.
+            dtype:
+                Dictionary of column names and the dtype they should be read as.
+
+        Yields:
+            pandas.DataFrame:
+                The next post-processed and validated chunk of the input file.
+        """
+        input_parser = InputParser(reader=self.reader)
+        for input_chunk in MetricsRecorder().record_iteration(
+                'InputParser.parse',
+                input_parser.parse_chunks(
+                    input_file_path=self.infile, chunk_size=chunk_size, usecols=usecols,
+                    dtype=dtype
+                )
+        ):
+            yield self._post_process_loaded_file(input_chunk, additional_required_features)
+
+    @staticmethod
+    def _post_process_loaded_file(input_file: pd.DataFrame,
+                                  additional_required_features: list | None = None) -> \
+            pd.DataFrame:
+        with MetricsRecorder().stage('LoadFilePostProcessor', input_file) as run:
+            post_load_processor = LoadFilePostProcessor(dataset=input_file)
+            input_file = post_load_processor.process()
+            run.set_output(input_file)
         validator = PostFileParseValidator()
         # Individual calls to the validator for error readability
         validator.validate_variants_present(input_file)
@@ -103,12 +156,14 @@ class Main(ABC):
     def categorical_process(loaded_data: pd.DataFrame,
                             processing_features: dict[str, list[str]] | None = None,
                             train_features: list | None = None):
-        processor = CategoricalProcessor()
-        capice_data, processed_features = processor.process(
-            loaded_data,
-            processable_features=train_features,
-            predetermined_features=processing_features
-        )
+        with MetricsRecorder().stage('CategoricalProcessor', loaded_data) as run:
+            processor = CategoricalProcessor()
+            capice_data, processed_features = processor.process(
+                loaded_data,
+                processable_features=train_features,
+                predetermined_features=processing_features
+            )
+            run.set_output(capice_data)
         return capice_data, processed_features
 
     def _export(self, dataset: pd.DataFrame, output: os.PathLike):
@@ -120,3 +175,13 @@ class Main(ABC):
             output_given=self.output_given,
             force=self.force
         ).export_capice_prediction(datafile=dataset)
+
+    def _export_chunks(self, datasets: Iterable[pd.DataFrame], output: os.PathLike):
+        """
+        Function to prepare the chunks of data to be exported to a single output file
+        """
+        CapiceExporter(
+            file_path=output,
+            output_given=self.output_given,
+            force=self.force
+        ).export_capice_prediction_chunks(datafiles=datasets)
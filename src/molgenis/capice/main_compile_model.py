@@ -0,0 +1,33 @@
+import os
+
+from molgenis.capice.main_capice import Main
+from molgenis.capice.utilities import check_file_exist
+from molgenis.capice.core.capice_manager import CapiceManager
+from molgenis.capice.utilities.compiled_model import CompiledModel
+
+
+class CapiceCompileModel(Main):
+    """
+    Compile model class of CAPICE that compiles the trees of a model into a CompiledModel, which
+    predict can use through --engine numpy.
+    """
+
+    def __init__(self, model, output_path, output_given, force):
+        super().__init__(
+            input_path=None,
+            output_path=output_path,
+            output_given=output_given,
+            force=force
+        )
+        self.model = model
+
+    def run(self):
+        """
+        Function to make CAPICE run in a compile model matter.
+        """
+        compiled_model = CompiledModel.compile(self.model)
+        output_path = os.path.join(self.output, CapiceManager().output_filename)
+        check_file_exist(output_path, self.force)
+        compiled_model.save(output_path)
+        if not self.output_given:
+            print(f'Successfully exported compiled model to: {output_path}')
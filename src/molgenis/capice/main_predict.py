@@ -1,7 +1,23 @@
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
 from molgenis.capice.main_capice import Main
+from molgenis.capice.core.logger import Logger
+from molgenis.capice.core.metrics_recorder import MetricsRecorder, StageMetrics
+from molgenis.capice.utilities.enums import Column, InputColumn
+from molgenis.capice.utilities.pipeline import Pipeline
 from molgenis.capice.utilities.predictor import Predictor
+from molgenis.capice.utilities.input_schema import InputSchema
 from molgenis.capice.utilities.class_suggestor import ClassSuggestor
+from molgenis.capice.core.capice_exporter import CapiceExporter
+from molgenis.capice.utilities.prescored_store import PrescoredStore
+from molgenis.capice.utilities.categorical_processor import CategoricalProcessor
 from molgenis.capice.validators.predict_validator import PredictValidator
+from molgenis.capice.validators.post_file_parse_validator import PostFileParseValidator
 from molgenis.capice.validators.post_vep_processing_validator import PostVEPProcessingValidator
 
 
@@ -10,8 +26,13 @@ class CapicePredict(Main):
     Predict class of CAPICE to call the different modules to impute,
     process and eventually predict a score over a CAPICE annotated file.
     """
+    # The chunk size used for workers or pipelining if no chunk size is supplied.
+    DEFAULT_CHUNK_SIZE = 10000
 
-    def __init__(self, input_path, model, output_path, output_given, force):
+    def __init__(self, input_path, model, output_path, output_given, force, chunk_size=None,
+                 reader='pandas', prescored: PrescoredStore | None = None, workers: int = 1,
+                 pipelined: bool = False, queue_size: int = 2, threads: int | None = None,
+                 batch_size: int | None = None):
         super().__init__(
             input_path,
             output_path,
@@ -22,13 +43,180 @@ class CapicePredict(Main):
         # Model.
         self.model = model
 
+        # Chunk size.
+        self.chunk_size = chunk_size
+        self.log.debug('Chunk size confirmed: %s', self.chunk_size)
+
+        # Input file reader.
+        self.reader = reader
+        self.log.debug('Reader confirmed: %s', self.reader)
+
+        # Prescored store.
+        self.prescored = prescored
+        if self.prescored is not None:
+            self.log.debug('Prescored store confirmed: %s', self.prescored.path)
+
+        # Worker processes.
+        self.workers = workers
+        self.log.debug('Workers confirmed: %d', self.workers)
+
+        # Pipelining.
+        self.pipelined = pipelined
+        self.queue_size = queue_size
+        self.log.debug('Pipelined confirmed: %s, queue size: %d', self.pipelined, self.queue_size)
+
+        # Prediction threads and batch size.
+        self.threads = threads
+        self.batch_size = batch_size
+        self.log.debug('Threads confirmed: %s, batch size: %s', self.threads, self.batch_size)
+
     def run(self):
         """
         Function to make CAPICE run in a prediction matter.
         """
-        capice_data = self._load_file()
+        usecols = self._get_required_input_columns()
+        dtype = self._get_input_dtypes()
+        if self._is_chunked():
+            self._predict_and_export_chunks(
+                usecols=usecols, dtype=dtype,
+                export=lambda datasets: self._export_chunks(datasets=datasets, output=self.output)
+            )
+        else:
+            capice_data = self._load_file(usecols=usecols, dtype=dtype)
+            capice_data = self.process_and_predict(loaded_data=capice_data)
+            self._export(dataset=capice_data, output=self.output)
+
+    def _is_chunked(self) -> bool:
+        return self.chunk_size is not None or self.workers > 1 or self.pipelined
+
+    def _predict_and_export_chunks(self, usecols, dtype,
+                                   export: Callable[[Iterable[pd.DataFrame]], None]):
+        """
+        Function to load, process, predict and export the input file chunk by chunk, so that
+        only a single chunk is kept in memory at a time (or a few if workers is above 1 or if
+        pipelined). If pipelined, loading, predicting and exporting each run within their own
+        thread, overlapping the (de)compression of the files with predicting.
+        :param export: function that exports the predicted chunks
+        """
+        chunks = self._load_file_chunks(
+            chunk_size=self.chunk_size or self.DEFAULT_CHUNK_SIZE, usecols=usecols, dtype=dtype
+        )
+        if self.pipelined:
+            Pipeline(queue_size=self.queue_size).run(
+                ('load', chunks),
+                ('predict', self._predict_chunks),
+                ('export', export)
+            )
+        else:
+            export(self._predict_chunks(chunks))
+
+    def _predict_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """
+        Generator to process and predict the loaded chunks, within the worker processes if
+        workers is above 1.
+        """
+        if self.workers > 1:
+            yield from self._predict_chunks_parallel(chunks)
+        else:
+            for capice_data in chunks:
+                yield self.process_and_predict(loaded_data=capice_data)
+
+    def _predict_chunks_parallel(self, chunks):
+        """
+        Generator to process and predict the loaded chunks within a pool of worker processes,
+        yielding the predicted chunks in the order of the input file. The amount of chunks
+        submitted to the pool at a time is bounded to limit memory usage. The stages recorded
+        within the workers are added to the MetricsRecorder of the main process.
+        """
+        # Unless supplied, each worker gets an equal share of the threads xgboost predicts with.
+        n_threads = self.threads or max(1, (os.cpu_count() or 1) // self.workers)
+        export_columns = CapiceExporter(
+            file_path=self.output, output_given=self.output_given, force=self.force
+        ).export_cols
+        recorder = MetricsRecorder()
+        self.log.info('Predicting within %d worker processes using %d threads each.',
+                      self.workers, n_threads)
+        with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.model, self.prescored, n_threads, self.batch_size, export_columns,
+                          recorder.enabled, recorder.trace_allocations)
+        ) as executor:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append(executor.submit(_process_and_predict_chunk, chunk))
+                if len(in_flight) >= 2 * self.workers:
+                    yield self._merge_worker_result(in_flight.popleft().result())
+            while len(in_flight) > 0:
+                yield self._merge_worker_result(in_flight.popleft().result())
+
+    @staticmethod
+    def _merge_worker_result(result: tuple[pd.DataFrame, list[StageMetrics]]) -> pd.DataFrame:
+        capice_data, stages = result
+        MetricsRecorder().merge(stages)
+        return capice_data
+
+    def _get_required_input_columns(self) -> set[str]:
+        """
+        Function to determine which input columns are required by the model, so that all other
+        columns do not have to be read from the input file.
+        :return: set of column names (both as they are named after processing and as named
+            within the input file)
+        """
+        required_columns = {
+            column.col_name for column in PostFileParseValidator.MINIMUM_REQUIRED_COLUMNS
+        }
+        required_columns.update(self.model.vep_features.keys())
+        required_columns.update(self.model.processable_features.keys())
+        required_columns.update(self.model.get_booster().feature_names)
+        # Columns are renamed after loading, so the names as present in the input file are
+        # required too.
+        for column in InputColumn:
+            if column.col_name in required_columns:
+                required_columns.add(column.col_input_name)
+        self.log.debug('Columns required by the model: %s', ', '.join(sorted(required_columns)))
+        return required_columns
+
+    @staticmethod
+    def _get_input_dtypes() -> dict[str, object]:
+        """
+        Function to obtain the dtypes of the known input columns, so that these do not have to be
+        inferred when reading the input file.
+        :return: dict of input column names and their dtype
+        """
+        return InputSchema().get_dtypes()
+
+    def process_and_predict(self, loaded_data):
+        """
+        Function to obtain the score and suggested class of loaded_data. Samples within the
+        prescored store (if supplied) obtain their score from the store, all other samples are
+        processed and predicted.
+        :return: pandas DataFrame
+        """
+        if self.prescored is None:
+            return self._process_and_predict(loaded_data)
+        scores = self.prescored.lookup(loaded_data)
+        is_prescored = scores.notna()
+        self.log.info('Obtained %d of %d samples from the prescored store.',
+                      is_prescored.sum(), loaded_data.shape[0])
+        capice_data = []
+        if not is_prescored.all():
+            capice_data.append(self._process_and_predict(loaded_data[~is_prescored].copy()))
+        if is_prescored.any():
+            prescored_data = loaded_data[is_prescored].copy()
+            CategoricalProcessor.create_preservation_cols(prescored_data)
+            prescored_data[Column.score.value] = scores[is_prescored]
+            capice_data.append(self.apply_suggested_class(predicted_data=prescored_data))
+        # Restores the order of loaded_data.
+        return pd.concat(capice_data).loc[loaded_data.index]
+
+    def _process_and_predict(self, loaded_data):
+        """
+        Function to process loaded data all the way up to the suggested class.
+        :return: pandas DataFrame
+        """
         capice_data = self.process(
-            loaded_data=capice_data,
+            loaded_data=loaded_data,
             process_features=list(self.model.vep_features.keys())
         )[0]
         PostVEPProcessingValidator().validate_features_present(
@@ -40,8 +228,7 @@ class CapicePredict(Main):
             train_features=None
         )[0]
         capice_data = self.predict(loaded_data=capice_data)
-        capice_data = self.apply_suggested_class(predicted_data=capice_data)
-        self._export(dataset=capice_data, output=self.output)
+        return self.apply_suggested_class(predicted_data=capice_data)
 
     def predict(self, loaded_data):
         """
@@ -50,8 +237,10 @@ class CapicePredict(Main):
         """
         validator = PredictValidator()
         validator.validate_data_predict_ready(loaded_data, self.model)
-        predictor = Predictor(self.model)
-        capice_data = predictor.predict(loaded_data)
+        with MetricsRecorder().stage('Predictor', loaded_data) as run:
+            predictor = Predictor(self.model, n_threads=self.threads, batch_size=self.batch_size)
+            capice_data = predictor.predict(loaded_data)
+            run.set_output(capice_data)
         return capice_data
 
     @staticmethod
@@ -60,6 +249,39 @@ class CapicePredict(Main):
         Method to call the ClassSuggestor
         :return: pandas DataFrame
         """
-        suggestor = ClassSuggestor()
-        capice_data = suggestor.apply_suggestion(predicted_data)
+        with MetricsRecorder().stage('ClassSuggestor', predicted_data) as run:
+            suggestor = ClassSuggestor()
+            capice_data = suggestor.apply_suggestion(predicted_data)
+            run.set_output(capice_data)
         return capice_data
+
+
+# State of a worker process of CapicePredict._predict_chunks_parallel().
+_worker_predict: CapicePredict | None = None
+_worker_export_columns: list[str] = []
+
+
+def _init_worker(model, prescored: PrescoredStore | None, n_threads: int,
+                 batch_size: int | None, export_columns: list[str], record_metrics: bool,
+                 trace_allocations: bool):
+    global _worker_predict, _worker_export_columns
+    # Enabling clears the stages a forked worker inherits from the main process.
+    if record_metrics:
+        MetricsRecorder().enable(trace_allocations=trace_allocations)
+    else:
+        MetricsRecorder().disable()
+    _worker_predict = CapicePredict(input_path=None, model=model, output_path=None,
+                                    output_given=True, force=False, prescored=prescored,
+                                    threads=n_threads, batch_size=batch_size)
+    _worker_export_columns = export_columns
+
+
+def _process_and_predict_chunk(loaded_data: pd.DataFrame) -> \
+        tuple[pd.DataFrame, list[StageMetrics]]:
+    if _worker_predict is None:
+        error_message = 'Worker process is not initialized by _init_worker()!'
+        Logger().logger.critical(error_message)
+        raise RuntimeError(error_message)
+    # Only the exported columns are returned, limiting the data sent back to the main process.
+    capice_data = _worker_predict.process_and_predict(loaded_data)[_worker_export_columns]
+    return capice_data, MetricsRecorder().pop_stages()
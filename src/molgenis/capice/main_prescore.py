@@ -0,0 +1,53 @@
+import os
+
+import pandas as pd
+
+from molgenis.capice.main_predict import CapicePredict
+from molgenis.capice.utilities import check_file_exist
+from molgenis.capice.core.capice_manager import CapiceManager
+from molgenis.capice.utilities.enums import Column, PreservedColumn
+from molgenis.capice.utilities.prescored_store import PrescoredStore
+
+
+class CapicePrescore(CapicePredict):
+    """
+    Prescore class of CAPICE that predicts the scores of a CAPICE annotated file and writes
+    these to a prescored store, to be used by predict through --prescored.
+    """
+
+    def run(self):
+        """
+        Function to make CAPICE run in a prescore matter.
+        """
+        usecols = self._get_required_input_columns()
+        dtype = self._get_input_dtypes()
+        output_path = os.path.join(self.output, CapiceManager().output_filename)
+        check_file_exist(output_path, self.force)
+
+        def export(datasets):
+            PrescoredStore.write(
+                output_path,
+                (self._get_store_columns(dataset) for dataset in datasets),
+                self.model
+            )
+
+        if self._is_chunked():
+            self._predict_and_export_chunks(usecols=usecols, dtype=dtype, export=export)
+        else:
+            export([self.process_and_predict(
+                loaded_data=self._load_file(usecols=usecols, dtype=dtype)
+            )])
+        if not self.output_given:
+            print(f'Successfully exported prescored store to: {output_path}')
+
+    @staticmethod
+    def _get_store_columns(dataset: pd.DataFrame) -> pd.DataFrame:
+        """
+        Function to obtain the columns of a predicted dataset that are stored within the
+        prescored store, named as within the store.
+        :return: pandas DataFrame
+        """
+        columns = {column.col_name: column.col_export_name for column in PreservedColumn}
+        columns[Column.feature.value] = Column.feature.value
+        columns[Column.score.value] = Column.score.value
+        return dataset[list(columns.keys())].rename(columns=columns)
@@ -0,0 +1,271 @@
+import io
+import os
+import gzip
+import json
+import zlib
+import tempfile
+import socketserver
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import xgboost as xgb
+
+from molgenis.capice.main_capice import Main
+from molgenis.capice.core.logger import Logger
+from molgenis.capice.main_predict import CapicePredict
+from molgenis.capice.core.capice_exporter import CapiceExporter
+from molgenis.capice.utilities.input_parser import InputParser
+from molgenis.capice.utilities.predict_batcher import PredictBatcher
+
+
+class CapiceServe:
+    """
+    Serve class of CAPICE that keeps one or more models loaded and predicts the CAPICE annotated
+    TSV or VEP annotated VCF payloads (optionally gzipped) posted to a local HTTP server.
+
+    Endpoints:
+    - POST /predict/<model>: responds with the prediction TSV, equal to the output of predict.
+      <model> can be omitted if only a single model is served.
+    - GET /models: responds with a JSON object of the served models and their CAPICE version.
+
+    Requests that are posted concurrently are micro-batched per model (see PredictBatcher).
+    """
+    VCF_HEADER = b'##fileformat=VCF'
+
+    def __init__(self, models: dict[str, xgb.XGBClassifier], host: str = '127.0.0.1',
+                 port: int = 8080, socket_path: str | None = None,
+                 max_batch_size: int = 10000, batch_wait: float = 0.01,
+                 max_payload_size: int = 100 * 1024 ** 2):
+        """
+        Args:
+            models:
+                Dictionary of the model name (as used within the request path) and the model.
+            host:
+                The host to serve on.
+            port:
+                The port to serve on, 0 to use any free port.
+            socket_path:
+                Path of the Unix socket to serve on instead of host and port.
+            max_batch_size:
+                The amount of samples at which a batch is predicted without further waiting.
+            batch_wait:
+                The maximum amount of seconds to wait for other requests to batch with.
+            max_payload_size:
+                The maximum amount of bytes of a payload, both as posted and decompressed.
+        """
+        self.log = Logger().logger
+        self.log.info('Initiating selected mode.')
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.max_payload_size = max_payload_size
+        self.exporter = CapiceExporter(file_path=None, output_given=True, force=False)
+        self.predictors = {}
+        self.batchers = {}
+        for name, model in models.items():
+            predict = CapicePredict(input_path=None, model=model, output_path=None,
+                                    output_given=True, force=False)
+            self.predictors[name] = (predict, predict._get_required_input_columns(),
+                                     predict._get_input_dtypes())
+            self.batchers[name] = PredictBatcher(predict, max_batch_size=max_batch_size,
+                                                 max_wait=batch_wait)
+            self.log.info('Loaded model %s (CAPICE version: %s).', name, model.CAPICE_version)
+
+    def run(self):
+        """
+        Function to make CAPICE run in a serve matter, until interrupted.
+        """
+        server = self.create_server()
+        if self.socket_path is not None:
+            self.log.info('Serving on Unix socket: %s', self.socket_path)
+        else:
+            self.log.info('Serving on: http://%s:%d', *server.server_address[:2])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.log.info('Interrupted, shutting down.')
+        finally:
+            server.server_close()
+            self.close()
+
+    def create_server(self) -> socketserver.BaseServer:
+        """
+        Function to create (and bind) the server, without serving yet.
+        """
+        # The request handlers are created by the server for every request, with this instance.
+        handler = partial(_CapiceRequestHandler, capice=self)
+        server: socketserver.BaseServer
+        if self.socket_path is not None:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            server = _UnixHTTPServer(self.socket_path, handler)
+        else:
+            server = _HTTPServer((self.host, self.port), handler)
+        return server
+
+    def close(self):
+        for batcher in self.batchers.values():
+            batcher.close()
+        if self.socket_path is not None and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def get_models(self) -> dict[str, str]:
+        return {
+            name: predict.model.CAPICE_version for name, (predict, _, _) in
+            self.predictors.items()
+        }
+
+    def resolve_model_name(self, model_name: str | None) -> str | None:
+        """
+        Function to obtain the name of the served model to predict with.
+        :param model_name: the requested model name, None for the only served model
+        :return: the served model name or None if not served
+        """
+        if model_name is None and len(self.predictors) == 1:
+            return next(iter(self.predictors))
+        if model_name in self.predictors:
+            return model_name
+        return None
+
+    def predict(self, payload: bytes, model_name: str) -> str:
+        """
+        Function to predict the CAPICE scores of payload.
+
+        Args:
+            payload:
+                The content of a (gzipped) CAPICE annotated TSV or VEP annotated VCF.
+            model_name:
+                The name of the (served) model to predict with.
+        Returns:
+            str:
+                The prediction TSV.
+        Raises:
+            KeyError:
+                If the payload is missing required columns.
+            ValueError:
+                If the payload could not be loaded or validated.
+        """
+        predict, usecols, dtype = self.predictors[model_name]
+        loaded_data = self._load_payload(payload, usecols, dtype)
+        predicted = self.batchers[model_name].submit(loaded_data)
+        output = io.StringIO()
+        self.exporter.write_capice_prediction(predicted, output)
+        return output.getvalue()
+
+    def _load_payload(self, payload: bytes, usecols, dtype):
+        """
+        Loads (and validates) the payload the same way predict loads its input file, by writing
+        it to a temporary file.
+        """
+        if payload.startswith(b'\x1f\x8b'):
+            payload = self._decompress(payload)
+        suffix = '.vcf' if payload.startswith(self.VCF_HEADER) else '.tsv'
+        with tempfile.TemporaryDirectory(prefix='capice_serve_') as directory:
+            payload_path = os.path.join(directory, 'payload' + suffix)
+            with open(payload_path, 'wb') as payload_file:
+                payload_file.write(payload)
+            loaded_data = InputParser().parse(payload_path, usecols=usecols, dtype=dtype)
+        return Main._post_process_loaded_file(loaded_data)
+
+    def _decompress(self, payload: bytes) -> bytes:
+        """
+        Decompresses the gzipped payload, up to max_payload_size bytes.
+
+        Raises:
+            ValueError:
+                If the payload is not a valid gzip file or exceeds max_payload_size bytes once
+                decompressed.
+        """
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(payload)) as payload_file:
+                decompressed = payload_file.read(self.max_payload_size + 1)
+        except (OSError, EOFError, zlib.error) as e:
+            raise ValueError(f'Payload is not a valid gzip file: {e}') from e
+        if len(decompressed) > self.max_payload_size:
+            raise ValueError(f'Decompressed payload exceeds the maximum of '
+                             f'{self.max_payload_size} bytes!')
+        return decompressed
+
+
+class _CapiceRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'CAPICE'
+
+    def __init__(self, *args, capice: CapiceServe, **kwargs):
+        # Set before initializing, since the request is handled within the initialization.
+        self.capice = capice
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path.rstrip('/') != '/models':
+            self._respond(HTTPStatus.NOT_FOUND, 'Not found.\n')
+            return
+        self._respond(HTTPStatus.OK, json.dumps(self.capice.get_models()) + '\n',
+                      content_type='application/json')
+
+    def do_POST(self):
+        path = self.path.strip('/').split('/')
+        if path[0] != 'predict' or len(path) > 2:
+            self._respond(HTTPStatus.NOT_FOUND, 'Not found.\n')
+            return
+        model_name = self.capice.resolve_model_name(path[1] if len(path) == 2 else None)
+        if model_name is None:
+            self._respond(HTTPStatus.NOT_FOUND, 'Model not served, served models: ' +
+                          ', '.join(self.capice.get_models()) + '\n')
+            return
+        payload = self._read_payload()
+        if payload is None:
+            return
+        try:
+            output = self.capice.predict(payload, model_name)
+        except (KeyError, ValueError, TypeError) as e:
+            self._respond(HTTPStatus.BAD_REQUEST, f'{e}\n')
+        except Exception as e:
+            self.capice.log.exception('Prediction failed.')
+            self._respond(HTTPStatus.INTERNAL_SERVER_ERROR, f'{e}\n')
+        else:
+            self._respond(HTTPStatus.OK, output, content_type='text/tab-separated-values')
+
+    def _read_payload(self) -> bytes | None:
+        """
+        Reads the payload of Content-Length bytes, or responds with an error (returning None) if
+        the Content-Length is missing, invalid or exceeds the maximum payload size.
+        """
+        content_length = self.headers.get('Content-Length')
+        try:
+            size = int(content_length) if content_length is not None else None
+        except ValueError:
+            size = -1
+        if size is None:
+            error = (HTTPStatus.LENGTH_REQUIRED, 'Content-Length is required.\n')
+        elif size < 0:
+            error = (HTTPStatus.BAD_REQUEST, f'Invalid Content-Length: {content_length}\n')
+        elif size > self.capice.max_payload_size:
+            error = (HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                     f'Payload exceeds the maximum of {self.capice.max_payload_size} bytes.\n')
+        else:
+            return self.rfile.read(size)
+        # The payload is not read, so the connection can not be used for another request.
+        self.close_connection = True
+        self._respond(*error)
+        return None
+
+    def _respond(self, status: HTTPStatus, body: str, content_type: str = 'text/plain'):
+        encoded = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        # Unix socket clients have no address, so the request is logged without it.
+        Logger().logger.debug('Request: %s', format % args)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
@@ -1,17 +1,28 @@
-import json
 import os
+import json
+import tempfile
+from contextlib import contextmanager
+from collections.abc import Iterator
 
 import numpy as np
 import pandas as pd
 import xgboost as xgb
 from scipy import stats
-from sklearn.model_selection import train_test_split, RandomizedSearchCV
+from sklearn.base import clone
+# Enables HalvingRandomSearchCV, which is experimental within scikit-learn.
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import train_test_split, check_cv, RandomizedSearchCV, \
+    HalvingRandomSearchCV
 
 from molgenis.capice.main_capice import Main
 from molgenis.capice import __version__
 from molgenis.capice.utilities import check_if_in_list
 from molgenis.capice.utilities.enums import InputColumn
 from molgenis.capice.core.capice_exporter import CapiceExporter
+from molgenis.capice.utilities.thread_budget import ThreadBudget
+from molgenis.capice.utilities.training_cache import TrainingCache
+from molgenis.capice.utilities.feature_assembler import FeatureAssembler
+from molgenis.capice.utilities.categorical_processor import CategoricalProcessor
 
 
 class CapiceTrain(Main):
@@ -19,10 +30,9 @@ class CapiceTrain(Main):
     Train class of CAPICE to create new CAPICE like models for new or specific
     use cases.
     """
-    # Xgboost uses OpenMP for multithreading. However, using n_jobs/nthread in XGBClassifier
-    # doesn't respect the set value. Current approach is to disable multithreading for OpenMP and
-    # parallelize through RandomizedSearchCV's n_jobs parameter.
-    os.environ["OMP_THREAD_LIMIT"] = "1"
+    TREE_METHODS = ('exact', 'hist', 'approx')
+    SEARCHES = ('random', 'halving')
+    DEFAULT_CHUNK_SIZE = 10000
 
     def __init__(
             self,
@@ -32,7 +42,14 @@ class CapiceTrain(Main):
             output_path,
             output_given,
             force,
-            threads
+            threads,
+            sparse=False,
+            tree_method='exact',
+            threads_per_fit=None,
+            search='random',
+            cache_dir=None,
+            out_of_core=False,
+            chunk_size=None
     ):
         super().__init__(
             input_path,
@@ -51,6 +68,32 @@ class CapiceTrain(Main):
             'The percentage of data used for the testing dataset within training: %s',
             self.train_test_size)
 
+        # Sparse feature matrix.
+        self.sparse = sparse
+        self.log.debug('Training on the sparse feature matrix: %s', self.sparse)
+
+        # Tree method of XGBoost.
+        self.tree_method = tree_method
+        self.log.debug('Tree method confirmed: %s', self.tree_method)
+
+        # Threads of each fit, determined from the available threads if None.
+        self.threads_per_fit = threads_per_fit
+        self.log.debug('Threads per fit confirmed: %s', self.threads_per_fit)
+
+        # Hyperparameter search strategy.
+        self.search = search
+        self.log.debug('Search confirmed: %s', self.search)
+
+        # Directory caching the processed training data, not cached if None.
+        self.cache_dir = cache_dir
+        self.log.debug('Cache directory confirmed: %s', self.cache_dir)
+
+        # Out-of-core training, processing the input in chunks of chunk_size samples.
+        self.out_of_core = out_of_core
+        self.chunk_size = chunk_size
+        self.log.debug('Out-of-core training confirmed: %s (chunk size: %s)', self.out_of_core,
+                       self.chunk_size)
+
         # Required features when file is loaded
         self.additional_required = [InputColumn.binarized_label.col_name,
                                     InputColumn.sample_weight.col_name]
@@ -60,12 +103,16 @@ class CapiceTrain(Main):
         self.n_jobs = threads
         self.cross_validate = 5
         self.n_iterations = 20
+        self.halving_factor = 3
+        # Whether concurrent fits read the training data from memory-mapped files.
+        self.shared_memory = True
 
         # (Other) global variables
         self.random_state = 45
         self.split_random_state = 4
         self.model_random_state = 0
         self.train_features = []
+        self.sparse_features = None
         self.loglevel = self.manager.loglevel
         self.exporter = CapiceExporter(
             file_path=self.output,
@@ -78,6 +125,42 @@ class CapiceTrain(Main):
         Main function. Will make a variety of calls to the required modules in
         order to create new CAPICE models.
         """
+        if self.out_of_core:
+            model, vep_processed, processed_features = self.train_out_of_core()
+        else:
+            processed_data, vep_processed, processed_features = self.load_and_process()
+            processed_train, processed_test = self.split_data(dataset=processed_data,
+                                                              test_size=self.train_test_size)
+            model = self.train(test_set=processed_test, train_set=processed_train)
+        setattr(model, "vep_features", vep_processed)
+        setattr(model, "processable_features", processed_features)
+        setattr(model, 'CAPICE_version', __version__)
+        if self.sparse:
+            setattr(model, 'sparse_features', self.sparse_features)
+        self.exporter.export_capice_model(model=model)
+
+    def load_and_process(self) -> tuple[pd.DataFrame, dict[str, list[str]], dict[str, list[str]]]:
+        """
+        Loads and processes the input file up to the training features. If a cache directory is
+        given, the processed dataset is loaded from the cache if the input file and features
+        have been processed before, and stored in the cache otherwise.
+
+        Returns:
+            tuple:
+                Tuple [0] containing: The processed dataset.
+                Tuple [1] containing: The VEP features and the features derived from them.
+                Tuple [2] containing: The categorical features and their categories.
+        """
+        cache = None
+        cache_key = None
+        if self.cache_dir is not None:
+            cache = TrainingCache(self.cache_dir)
+            cache_key = cache.get_key(self.infile, self.json_path)
+            cached = cache.load(cache_key)
+            if cached is not None:
+                processed_data, self.train_features, vep_processed, processed_features = cached
+                self._set_sparse_features(processed_data)
+                return processed_data, vep_processed, processed_features
         data = self._load_file(additional_required_features=self.additional_required)
         with open(self.json_path, 'rt') as impute_values_file:
             train_features = list(json.load(impute_values_file).keys())
@@ -104,14 +187,108 @@ class CapiceTrain(Main):
         )
 
         self._set_train_features(processable_features, processed_features)
+        if cache is not None:
+            cache.store(cache_key, processed_data, self.train_features, vep_processed,
+                        processed_features)
+        self._set_sparse_features(processed_data)
+        return processed_data, vep_processed, processed_features
+
+    def train_out_of_core(self) -> tuple[xgb.XGBClassifier, dict[str, list[str]],
+                                         dict[str, list[str]]]:
+        """
+        Trains without keeping the input file or its processed dataset in memory. The input
+        file is processed in chunks into the memory-mapped arrays of a TrainingCache entry
+        (within the cache directory, or a temporary directory within the output directory if
+        not given). The train test split and the cross validation folds of the search are
+        indices into these arrays, so that only the samples of each fit are copied.
+
+        Returns:
+            tuple:
+                Tuple [0] containing: The trained model.
+                Tuple [1] containing: The VEP features and the features derived from them.
+                Tuple [2] containing: The categorical features and their categories.
+        """
+        if self.cache_dir is not None:
+            return self._train_out_of_core(TrainingCache(self.cache_dir))
+        with tempfile.TemporaryDirectory(dir=self.output, prefix='.capice_train_') as cache_dir:
+            return self._train_out_of_core(TrainingCache(cache_dir))
+
+    def _train_out_of_core(self, cache: TrainingCache) -> tuple[
+        xgb.XGBClassifier, dict[str, list[str]], dict[str, list[str]]
+    ]:
+        cache_key = cache.get_key(self.infile, self.json_path)
+        arrays = cache.load_arrays(cache_key, mmap=True)
+        if arrays is None:
+            self._process_chunks(cache, cache_key)
+            arrays = cache.load_arrays(cache_key, mmap=True)
+        features, labels, sample_weights, metadata = arrays  # type: ignore
+        self.train_features = metadata['train_features']
+        train_indices, test_indices = self.split_data(np.arange(features.shape[0]),
+                                                      test_size=self.train_test_size)
+        eval_set = self._to_eval_set(xgb.__version__, features[test_indices],
+                                     labels[test_indices])
+        model = self._train(features, labels, sample_weights, eval_set,
+                            train_indices=train_indices)
+        # A numpy array does not contain the feature names (which predict requires) and types,
+        # which are set to those of training on the processed dataset.
+        booster = model.get_booster()
+        booster.feature_names = self.train_features
+        booster.feature_types = xgb.DMatrix(
+            pd.DataFrame(columns=self.train_features).astype(metadata['dtypes'])
+        ).feature_types
+        return model, metadata['vep_processed'], metadata['processed_features']
+
+    def _process_chunks(self, cache: TrainingCache, cache_key: str) -> None:
+        """
+        Processes the input file into cache in two passes over its chunks: the first counts the
+        samples and the values of the categorical features, determining the same categories as
+        processing the entire input file, the second processes the chunks into their features.
+        """
+        with open(self.json_path, 'rt') as impute_values_file:
+            train_features = list(json.load(impute_values_file).keys())
+        self._validate_train_features_duplicates(train_features)
+        n_samples = 0
+        counts: dict[str, pd.Series] = {}
+        processable_features = []
+        columns = []
+        vep_processed: dict[str, list[str]] = {}
+        for data, vep_processed in self._load_and_process_chunks(train_features):
+            if n_samples == 0:
+                processable_features = self._reset_processing_features(
+                    train_features, vep_processed, data.columns
+                )
+                columns = list(data.columns)
+            n_samples += data.shape[0]
+            counts = CategoricalProcessor.merge_category_counts(
+                counts, CategoricalProcessor.count_categories(data, processable_features)
+            )
+        processed_features = CategoricalProcessor().get_categories(counts, columns)
+        self._set_train_features(processable_features, processed_features)
+        cache.store_chunks(
+            cache_key,
+            n_samples,
+            (self.categorical_process(data, processing_features=processed_features)[0]
+             for data, _ in self._load_and_process_chunks(train_features)),
+            self.train_features,
+            vep_processed,
+            processed_features
+        )
 
-        processed_train, processed_test = self.split_data(dataset=processed_data,
-                                                          test_size=self.train_test_size)
-        model = self.train(test_set=processed_test, train_set=processed_train)
-        setattr(model, "vep_features", vep_processed)
-        setattr(model, "processable_features", processed_features)
-        setattr(model, 'CAPICE_version', __version__)
-        self.exporter.export_capice_model(model=model)
+    def _load_and_process_chunks(self, train_features: list[str]) -> Iterator[
+        tuple[pd.DataFrame, dict[str, list[str]]]
+    ]:
+        for data in self._load_file_chunks(self.chunk_size or self.DEFAULT_CHUNK_SIZE,
+                                           additional_required_features=self.additional_required):
+            self._validate_features_present(data, train_features)
+            yield self.process(loaded_data=data, process_features=train_features)
+
+    def _set_sparse_features(self, processed_data: pd.DataFrame) -> None:
+        if self.sparse:
+            self.sparse_features = FeatureAssembler.get_sparse_features(
+                processed_data, self.train_features
+            )
+            self.log.info('The following features are stored sparse: %s',
+                          ', '.join(self.sparse_features))
 
     def _validate_features_present(self, dataset, train_features) -> None:
         missing = []
@@ -208,8 +385,12 @@ class CapiceTrain(Main):
         :return: a list with tuple with pandas Dataframe, pandas Series and possibly "test"
         eval_set
         """
-        eval_data = [test_set[self.train_features],
-                     test_set[InputColumn.binarized_label.col_name]]
+        return self._to_eval_set(xgb_version, self._assemble_features(test_set),
+                                 test_set[InputColumn.binarized_label.col_name])
+
+    @staticmethod
+    def _to_eval_set(xgb_version, features, labels):
+        eval_data = [features, labels]
         if int(xgb_version.split('.')[0]) < 1:
             eval_data.append('test')
         return [tuple(eval_data)]
@@ -223,6 +404,27 @@ class CapiceTrain(Main):
             the testing dataset for determine performance during training
         :param train_set: pandas.DataFrame,
             the training dataset on which the model will be created on
+
+        The threads (n_jobs) are divided over the concurrent fits of the search and the
+        threads of XGBoost within each fit by the ThreadBudget. The best model is refitted
+        using all threads.
+
+        The search is either a randomized search (random), which cross validates every
+        candidate on all training samples, or successive halving (halving), which cross
+        validates all candidates on a fraction of the training samples and only continues with
+        the best 1 / halving_factor of the candidates on halving_factor times as many samples,
+        up to all training samples.
+        """
+        eval_set = self._create_eval_set(xgb.__version__, test_set)
+        return self._train(self._assemble_features(train_set),
+                           train_set[InputColumn.binarized_label.col_name],
+                           train_set[InputColumn.sample_weight.col_name], eval_set)
+
+    def _train(self, features, labels, sample_weight, eval_set, train_indices=None):
+        """
+        Searches the hyperparameters and fits the best model on features, or only on the
+        samples at train_indices if given. The cross validation folds of the search then index
+        into features directly, so that the samples are only copied for each fit.
         """
         param_dist = {
             'max_depth': stats.randint(1, 20),
@@ -237,11 +439,16 @@ class CapiceTrain(Main):
 
         self.log.debug('Preparing the estimator model.')
 
+        budget = ThreadBudget(self.n_jobs, self.cross_validate * self.n_iterations,
+                              threads_per_fit=self.threads_per_fit)
+        self.log.info('Searching with tree method %s, running %s.', self.tree_method, budget)
+
         model_estimator = xgb.XGBClassifier(
             verbosity=verbosity,
             objective='binary:logistic',
             booster='gbtree',
-            tree_method='exact',
+            tree_method=self.tree_method,
+            n_jobs=budget.threads_per_fit,
             min_child_weight=1,
             max_delta_step=0,
             subsample=1, colsample_bytree=1,
@@ -258,21 +465,38 @@ class CapiceTrain(Main):
                 'early_stopping_rounds': self.esr
             }
         )
-        randomised_search_cv = RandomizedSearchCV(estimator=model_estimator,
-                                                  param_distributions=param_dist,
-                                                  scoring='roc_auc', n_jobs=self.n_jobs,
-                                                  cv=self.cross_validate,
-                                                  n_iter=self.n_iterations,
-                                                  verbose=verbosity)
-
-        eval_set = self._create_eval_set(xgb.__version__, test_set)
+        if train_indices is None:
+            cv = self.cross_validate
+        else:
+            # The folds the search would create for the samples at train_indices.
+            cv = [
+                (train_indices[train], train_indices[test])
+                for train, test in check_cv(
+                    self.cross_validate, labels[train_indices], classifier=True
+                ).split(train_indices, labels[train_indices])
+            ]
+        randomised_search_cv = self._create_search(model_estimator, param_dist, budget.n_jobs,
+                                                   verbosity, cv)
+
+        fit_params = {
+            'eval_set': eval_set,
+            'verbose': xgb_verbosity,
+            'sample_weight': sample_weight
+        }
 
-        self.log.info('Random search starting, please hold.')
-        randomised_search_cv.fit(train_set[self.train_features],
-                                 train_set[InputColumn.binarized_label.col_name],
-                                 eval_set=eval_set,
-                                 verbose=xgb_verbosity,
-                                 sample_weight=train_set[InputColumn.sample_weight.col_name])
+        self.log.info('%s search starting, please hold.',
+                      'Successive halving' if self.search == 'halving' else 'Random')
+        with self._share_arrays(
+                budget.n_jobs, features, labels, sample_weight, *eval_set[0][:2]
+        ) as (search_features, search_labels, search_weights, eval_features, eval_labels):
+            randomised_search_cv.fit(
+                search_features,
+                search_labels,
+                **dict(fit_params, sample_weight=search_weights,
+                       eval_set=[(eval_features, eval_labels, *eval_set[0][2:])])
+            )
+        if self.search == 'halving':
+            self._log_halving_fits(randomised_search_cv)
         self.log.info(
             'Training successful, '
             'average CV AUC of best performing model: %.4f',
@@ -286,4 +510,110 @@ class CapiceTrain(Main):
             ])
         )
 
-        return randomised_search_cv.best_estimator_
+        # Identical to the refit of the search, but using all threads.
+        model = clone(model_estimator).set_params(
+            **randomised_search_cv.best_params_, n_jobs=self.n_jobs
+        )
+        if train_indices is not None:
+            features = features[train_indices]
+            labels = labels[train_indices]
+            fit_params['sample_weight'] = sample_weight[train_indices]
+        model.fit(features, labels, **fit_params)
+        # Not exported, so that predicting with the model is not limited to the training threads
+        # (set as attribute, since set_params() would reconfigure the trained booster).
+        model.n_jobs = None
+        if self.sparse:
+            # A sparse matrix does not contain feature names, which predict requires.
+            model.get_booster().feature_names = self.train_features
+        return model
+
+    @contextmanager
+    def _share_arrays(self, n_jobs: int, *arrays) -> Iterator[list]:
+        """
+        Places the (dense) arrays in memory-mapped files within a temporary directory in the
+        output directory when the search runs concurrent fits. Joblib then passes these to its
+        worker processes by reference, which all read the same pages of the file, instead of
+        pickling every array for every fit (or dumping it to its own memory-mapped file).
+        Features DataFrames are stored as float32 matrix, arrays that are memory-mapped already
+        (out-of-core) are passed as is.
+
+        Yields:
+            list:
+                The (memory-mapped) arrays, in order of arrays.
+        """
+        if n_jobs == 1 or not self.shared_memory or self.sparse:
+            yield list(arrays)
+            return
+        with tempfile.TemporaryDirectory(dir=self.output, prefix='.capice_train_') as directory:
+            shared = []
+            for i, array in enumerate(arrays):
+                if isinstance(array, np.memmap):
+                    shared.append(array)
+                    continue
+                path = os.path.join(directory, f'{i}.npy')
+                if isinstance(array, pd.DataFrame):
+                    shared_array = np.lib.format.open_memmap(
+                        path, mode='w+', dtype=np.float32, shape=array.shape
+                    )
+                    FeatureAssembler(list(array.columns)).assemble_matrix(
+                        array, out=shared_array
+                    )
+                else:
+                    values = np.asarray(array)
+                    shared_array = np.lib.format.open_memmap(
+                        path, mode='w+', dtype=values.dtype, shape=values.shape
+                    )
+                    shared_array[:] = values
+                shared_array.flush()
+                del shared_array
+                shared.append(np.load(path, mmap_mode='r'))
+            self.log.debug('Sharing the training data with the concurrent fits through %s.',
+                           directory)
+            yield shared
+
+    def _create_search(self, model_estimator, param_dist, n_jobs, verbosity, cv):
+        if self.search == 'halving':
+            # All n_iterations candidates are evaluated on the least amount of samples, such
+            # that the last iteration uses all training samples. The amount of samples of an
+            # iteration is a fraction of the samples of features, which are all subsampled
+            # alike when the folds index into features (out-of-core).
+            return HalvingRandomSearchCV(estimator=model_estimator,
+                                         param_distributions=param_dist,
+                                         n_candidates=self.n_iterations,
+                                         factor=self.halving_factor,
+                                         resource='n_samples',
+                                         min_resources='exhaust',
+                                         scoring='roc_auc', n_jobs=n_jobs,
+                                         cv=cv,
+                                         verbose=verbosity,
+                                         refit=False)
+        return RandomizedSearchCV(estimator=model_estimator,
+                                  param_distributions=param_dist,
+                                  scoring='roc_auc', n_jobs=n_jobs,
+                                  cv=cv,
+                                  n_iter=self.n_iterations,
+                                  verbose=verbosity,
+                                  refit=False)
+
+    def _log_halving_fits(self, search: HalvingRandomSearchCV):
+        """
+        Logs the fits of the successive halving search as the equivalent amount of fits on all
+        training samples, compared to a randomized search over the same candidates.
+        """
+        fits = sum(search.n_candidates_) * self.cross_validate
+        full_fits = search.n_candidates_[0] * self.cross_validate
+        equivalent_fits = sum(
+            n_candidates * n_resources
+            for n_candidates, n_resources in zip(search.n_candidates_, search.n_resources_)
+        ) * self.cross_validate / search.max_resources_
+        self.log.info(
+            'Successive halving ran %d fits over %d iterations, equivalent to %.1f fits on all '
+            'training samples instead of the %d fits of a randomized search (saved %.1f fits).',
+            fits, search.n_iterations_, equivalent_fits, full_fits, full_fits - equivalent_fits
+        )
+
+    def _assemble_features(self, dataset: pd.DataFrame):
+        return FeatureAssembler(
+            self.train_features,
+            sparse_features=self.sparse_features
+        ).assemble(dataset)
@@ -1,10 +1,11 @@
+from collections.abc import Iterable
+
 import numpy as np
 import pandas as pd
 
 from molgenis.capice.core.logger import Logger
 from molgenis.capice.core.capice_manager import CapiceManager
-from molgenis.capice.utilities.column_utils import ColumnUtils
-from molgenis.capice.utilities.enums import Column, UniqueSeparator
+from molgenis.capice.utilities.enums import Column, PreservedColumn
 
 
 class CategoricalProcessor:
@@ -52,7 +53,7 @@ class CategoricalProcessor:
         """
         self.log.info('Starting processing categorical columns.')
         self._validate_one_feature_list_present(processable_features, predetermined_features)
-        self._create_preservation_col(dataset)
+        self.create_preservation_cols(dataset)
         if predetermined_features is None:
             # Type ignore, else mypy takes issue with Typing since processable_features can be
             # None, so it is considered Optional[list[str]] instead of list[str].
@@ -65,8 +66,6 @@ class CategoricalProcessor:
 
         processed_dataset = self._get_dummies(dataset, processing_features)
 
-        self._ensure_columns_present(processed_dataset, processing_features)
-
         self.log.info('Successfully processed categorical data.')
         return processed_dataset, processing_features
 
@@ -81,17 +80,16 @@ class CategoricalProcessor:
             raise ValueError(error_message)
 
     @staticmethod
-    def _create_preservation_col(dataset: pd.DataFrame) -> None:
+    def create_preservation_cols(dataset: pd.DataFrame) -> None:
         """
-        Function to create the chr_pos_ref_alt column so that it doesn't get
-        lost in preprocessing.
+        Function to copy the chr, pos, REF and ALT columns to their PreservedColumn so that they
+        don't get lost in preprocessing (such as REF and ALT in pandas.get_dummies()).
         :param dataset: unprocessed pandas DataFrame
         :return: unprocessed pandas DataFrame
-            containing column 'chr_pos_ref_alt'
+            containing the PreservedColumn columns
         """
-        dataset[Column.chr_pos_ref_alt.value] = dataset[
-            [Column.chr.value, Column.pos.value, Column.ref.value, Column.alt.value]
-        ].astype(str).agg(UniqueSeparator.unique_separator.value.join, axis=1)
+        for column in PreservedColumn:
+            dataset[column.col_name] = dataset[column.col_source_name]
 
     def _get_categorical_columns(self, dataset: pd.DataFrame,
                                  processable_features: list[str]) -> dict[str, list]:
@@ -108,67 +106,124 @@ class CategoricalProcessor:
                 processing_features[feature] = self._process_object(dataset[feature])
         return processing_features
 
+    @staticmethod
+    def count_categories(dataset: pd.DataFrame,
+                         processable_features: list[str]) -> dict[str, pd.Series]:
+        """
+        Method to count the values of the "Object" dtype features of dataset that are in the
+        processable_features list, in order of their first occurrence. The counts of the chunks
+        of a dataset can be summed through merge_category_counts(), after which
+        get_categories() determines the same categories as processing the entire dataset.
+        """
+        return {
+            feature: dataset[feature].value_counts(sort=False)
+            for feature in dataset.select_dtypes(include=["O"]).columns
+            if feature in processable_features
+        }
+
+    @staticmethod
+    def merge_category_counts(counts: dict[str, pd.Series],
+                              other: dict[str, pd.Series]) -> dict[str, pd.Series]:
+        """
+        Method to sum the category counts of other (of a later chunk) into counts, keeping the
+        order of first occurrence.
+        """
+        merged = dict(counts)
+        for feature, feature_counts in other.items():
+            if feature in merged:
+                merged[feature] = pd.concat([merged[feature], feature_counts]).groupby(
+                    level=0, sort=False
+                ).sum()
+            else:
+                merged[feature] = feature_counts
+        return merged
+
+    def get_categories(self, counts: dict[str, pd.Series],
+                       columns: Iterable[str]) -> dict[str, list]:
+        """
+        Method to determine the top 5 categories of each feature from its counts (of
+        count_categories()), in order of the columns of the dataset.
+        """
+        return {
+            feature: self._get_top_n_cats(feature, counts[feature].sort_values(ascending=False),
+                                          return_num=5)
+            for feature in columns if feature in counts
+        }
+
     def _process_object(self, feature_column: pd.Series) -> list:
         """
         Method to call the top X categories method with return number 5
         """
-        top_categories = self._get_top_n_cats(feature_column, return_num=5)
+        top_categories = self._get_top_n_cats(feature_column.name, feature_column.value_counts(),
+                                              return_num=5)
         return top_categories
 
-    def _get_top_n_cats(self, column: pd.Series, return_num: int) -> list:
+    def _get_top_n_cats(self, feature: str, value_counts: pd.Series, return_num: int) -> list:
         """
         Function for when a training file is preprocessed to get the top
         return_num quantity values within a categorical column.
         Some converting is done for the logger to be able to print them.
-        :param column: pandas Series
+        :param feature: string, name of the categorical column
+        :param value_counts: pandas Series, counts of the values (descending)
         :param return_num: integer
-        :return: pandas Series
+        :return: list
         """
-        counts = column.value_counts().index
-        value_counts = list(counts[:return_num])
+        counts = value_counts.index
+        top_values = list(counts[:return_num])
         if len(counts) > return_num:
-            value_counts.append(Column.other.value)
+            top_values.append(Column.other.value)
         message = 'For feature: %s saved the following values: %s'
-        self.log.info(message, column.name, ', '.join(value_counts))
-        return value_counts
+        self.log.info(message, feature, ', '.join(top_values))
+        return top_values
 
     def _get_dummies(self, dataset: pd.DataFrame, processing_features: dict) -> pd.DataFrame:
         """
-        Method to call the pandas.get_dummies() method to convert categorical into multiple columns
-        of 0 and 1.
+        Method to one-hot encode the categorical features into columns of 0 and 1 according to
+        their codebook (processing_features). All indicator columns are written into a single
+        uint8 block, which replaces the categorical features within the returned DataFrame.
+        dataset itself is left unchanged.
         """
+        dummy_columns = [
+            f'{feature}_{value}'
+            for feature, feature_values in processing_features.items()
+            for value in feature_values
+        ]
+        dummies = np.zeros((dataset.shape[0], len(dummy_columns)), dtype=np.uint8)
+        offset = 0
         for feature, feature_values in processing_features.items():
-            self._set_other_values(dataset, feature, feature_values)
-        processed_dataset = pd.get_dummies(dataset, columns=processing_features.keys())
-        return processed_dataset
+            self.log.debug(
+                'Converting %d features for feature: %s : %s',
+                len(feature_values),
+                feature,
+                ", ".join(feature_values)
+            )
+            positions = self._get_codebook_positions(dataset[feature], feature_values)
+            rows = np.flatnonzero(positions >= 0)
+            dummies[rows, offset + positions[rows]] = 1
+            offset += len(feature_values)
+        return pd.concat(
+            [dataset.drop(columns=list(processing_features.keys())),
+             pd.DataFrame(dummies, columns=dummy_columns, index=dataset.index)],
+            axis=1,
+            copy=False
+        )
 
-    def _set_other_values(self, dataset: pd.DataFrame, feature_name: str, feature_values: list) -> \
-            None:
+    @staticmethod
+    def _get_codebook_positions(column: pd.Series, feature_values: list) -> np.ndarray:
         """
-        Method to set all other entries within a column to "other" if they are not in
-        feature_values list.
+        Method to map every entry of column to the position of its value within feature_values,
+        using the codes of a pandas.Categorical as lookup. Entries not in feature_values are
+        mapped to the position of the "other" value, or to -1 if "other" is not in
+        feature_values.
         """
-        self.log.debug(
-            'Converting %d features for feature: %s : %s',
-            len(feature_values),
-            feature_name,
-            ", ".join(feature_values)
-        )
-        dataset[feature_name] = np.where(
-            dataset[feature_name].isin(feature_values),
-            dataset[feature_name],
-            Column.other.value
+        categories = [value for value in feature_values if value != Column.other.value]
+        codes = pd.Categorical(column, categories=categories).codes
+        if Column.other.value in feature_values:
+            other_position = feature_values.index(Column.other.value)
+        else:
+            other_position = -1
+        # Code -1 (entry not within categories) indexes the last element: the "other" position.
+        lookup = np.array(
+            [feature_values.index(value) for value in categories] + [other_position]
         )
-
-    def _ensure_columns_present(self, dataset: pd.DataFrame, categorical_out_columns: dict) -> None:
-        merged_columns = []
-        for main_feature, derivative_features in categorical_out_columns.items():
-            for feature in derivative_features:
-                merged_columns.append(f'{main_feature}_{feature}')
-        column_utils = ColumnUtils()
-        column_utils.set_specified_columns(merged_columns)
-        missing = column_utils.get_missing_diff_with(dataset.columns)
-        for feature in missing:
-            message = 'Detected column %s not present in columns. Adding full column on NaN'
-            self.log.debug(message, feature)
-            dataset[feature] = np.nan
+        return lookup[codes]
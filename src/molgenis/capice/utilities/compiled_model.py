@@ -0,0 +1,299 @@
+import json
+import struct
+import typing
+
+import numpy as np
+import pandas as pd
+
+from molgenis.capice.core.logger import Logger
+
+if typing.TYPE_CHECKING:
+    import xgboost as xgb
+
+
+class CompiledModel:
+    """
+    CAPICE model of which the trees of the XGBoost booster are compiled into a single contiguous
+    NumPy array of nodes, so that it can predict without xgboost (and its import of scikit-learn
+    and scipy) being loaded.
+
+    Predicting evaluates all trees over a block of samples at once, level by level: every level
+    moves each sample one node down within every tree, where the children of a leaf are the leaf
+    itself. The scores are those of XGBClassifier.predict_proba() (computed in float32 as well),
+    including only using the trees up to the best iteration of the model.
+
+    The compiled file consists of a JSON header (the model attributes and tree roots) followed by
+    the node array, which is memory-mapped when loaded.
+
+    Supports gbtree models with the binary:logistic objective and numerical splits (all CAPICE
+    models). Provides the attributes of a CAPICE XGBClassifier used for predicting; the model is
+    its own booster (get_booster()), providing feature_names and inplace_predict().
+    """
+    EXTENSION = '.compiled'
+    FORMAT_VERSION = 1
+    MAGIC = b'CAPICECM'
+    NODE_DTYPE = np.dtype(
+        [
+            ('feature', '<i4'),
+            ('threshold', '<f4'),
+            ('left', '<i4'),
+            ('right', '<i4'),
+            ('value', '<f4'),
+            ('default_left', 'u1')
+        ],
+        align=True
+    )
+    # The node array starts at a multiple of ALIGNMENT bytes within the compiled file.
+    ALIGNMENT = 64
+    # The amount of samples of which the trees are evaluated at a time.
+    BLOCK_SIZE = 4096
+
+    def __init__(self, header: dict, nodes: np.ndarray):
+        """
+        Args:
+            header:
+                The model attributes and the index of the root node of each tree.
+            nodes:
+                The nodes of all trees (of NODE_DTYPE).
+        """
+        self.log = Logger().logger
+        self.header = header
+        self.nodes = nodes
+        self.CAPICE_version = header['CAPICE_version']
+        self.vep_features = header['vep_features']
+        self.processable_features = header['processable_features']
+        if header['sparse_features'] is not None:
+            self.sparse_features = header['sparse_features']
+        self.feature_names = header['feature_names']
+        self.missing = header['missing']
+        self.model_checksum = header['model_checksum']
+        self.roots = np.array(header['roots'], dtype=np.int32)
+        self.max_depth = header['max_depth']
+        self.base_margin = np.float32(header['base_margin'])
+
+    @classmethod
+    def compile(cls, model: 'xgb.XGBClassifier') -> 'CompiledModel':
+        """
+        Compiles the trees of model that are used by XGBClassifier.predict_proba().
+
+        Raises:
+            ValueError:
+                If the booster, objective or splits of model are not supported.
+        """
+        # Imported here to not import the prescored store (and xgboost) for compiled models.
+        from molgenis.capice.utilities.prescored_store import PrescoredStore
+
+        log = Logger().logger
+        booster = model.get_booster()
+        learner = json.loads(booster.save_raw(raw_format='json'))['learner']
+        objective = learner['objective']['name']
+        gradient_booster = learner['gradient_booster']
+        if gradient_booster['name'] != 'gbtree' or objective != 'binary:logistic':
+            error_message = 'Unable to compile model with booster %s and objective %s, only ' \
+                            'gbtree with binary:logistic is supported!'
+            log.critical(error_message, gradient_booster['name'], objective)
+            raise ValueError(error_message % (gradient_booster['name'], objective))
+        trees = gradient_booster['model']['trees']
+        try:
+            trees_per_iteration = int(
+                gradient_booster['model']['gbtree_model_param']['num_parallel_tree']
+            )
+            trees = trees[:(model.best_iteration + 1) * trees_per_iteration]
+        except AttributeError:
+            # Without best iteration predict_proba() uses all trees.
+            pass
+        nodes = []
+        roots = []
+        max_depth = 0
+        offset = 0
+        for tree in trees:
+            if any(split_type != 0 for split_type in tree['split_type']):
+                error_message = 'Unable to compile model with categorical splits!'
+                log.critical(error_message)
+                raise ValueError(error_message)
+            tree_nodes, depth = cls._compile_tree(tree, offset)
+            nodes.append(tree_nodes)
+            roots.append(offset)
+            max_depth = max(max_depth, depth)
+            offset += tree_nodes.shape[0]
+        base_score = np.float32(learner['learner_model_param']['base_score'])
+        header = {
+            'format_version': cls.FORMAT_VERSION,
+            'CAPICE_version': model.CAPICE_version,
+            'vep_features': model.vep_features,
+            'processable_features': model.processable_features,
+            'sparse_features': getattr(model, 'sparse_features', None),
+            'feature_names': booster.feature_names,
+            'missing': float(model.missing),
+            'model_checksum': PrescoredStore.get_model_checksum(model),
+            'roots': roots,
+            'max_depth': max_depth,
+            # The margin of the base score, as computed by XGBoost (in float32).
+            'base_margin': float(np.float32(
+                -np.log(np.float64(np.float32(1) / base_score - np.float32(1)))
+            )),
+            'n_nodes': offset
+        }
+        log.info('Compiled %d trees of %d nodes with a maximum depth of %d.', len(roots), offset,
+                 max_depth)
+        return cls(header, np.concatenate(nodes) if len(nodes) > 0 else
+                   np.zeros(0, dtype=cls.NODE_DTYPE))
+
+    @classmethod
+    def _compile_tree(cls, tree: dict, offset: int) -> tuple[np.ndarray, int]:
+        """
+        Converts a tree of the XGBoost JSON model into nodes, of which the children are indexed
+        from offset. The children of a leaf are the leaf itself.
+
+        Returns:
+            tuple:
+                The nodes and the depth of the tree.
+        """
+        left = np.array(tree['left_children'], dtype=np.int32)
+        right = np.array(tree['right_children'], dtype=np.int32)
+        is_leaf = left == -1
+        index = np.arange(left.shape[0], dtype=np.int32)
+        nodes = np.zeros(left.shape[0], dtype=cls.NODE_DTYPE)
+        nodes['feature'] = np.where(is_leaf, 0, np.array(tree['split_indices'], dtype=np.int32))
+        split_conditions = np.array(tree['split_conditions'], dtype=np.float32)
+        # The split condition of a leaf is its value.
+        nodes['threshold'] = np.where(is_leaf, np.float32(np.nan), split_conditions)
+        nodes['value'] = np.where(is_leaf, split_conditions, np.float32(0))
+        nodes['left'] = np.where(is_leaf, index, left) + offset
+        nodes['right'] = np.where(is_leaf, index, right) + offset
+        nodes['default_left'] = np.array(tree['default_left'], dtype=np.uint8)
+        depth = 0
+        level = [0]
+        while True:
+            level = [child for node in level if not is_leaf[node]
+                     for child in (left[node], right[node])]
+            if len(level) == 0:
+                return nodes, depth
+            depth += 1
+
+    @classmethod
+    def load(cls, path: str) -> 'CompiledModel':
+        """
+        Loads the compiled model at path, memory-mapping its node array.
+
+        Raises:
+            ValueError:
+                If path is not a compiled model of the supported format version.
+        """
+        with open(path, 'rb') as compiled_file:
+            magic = compiled_file.read(len(cls.MAGIC))
+            header_size = compiled_file.read(8)
+            if magic != cls.MAGIC or len(header_size) != 8:
+                error_message = 'File %s is not a compiled CAPICE model!'
+                Logger().logger.critical(error_message, path)
+                raise ValueError(error_message % path)
+            header = json.loads(compiled_file.read(struct.unpack('<Q', header_size)[0]))
+        if header['format_version'] != cls.FORMAT_VERSION:
+            error_message = 'Compiled model %s has format version %s, expected %s!'
+            Logger().logger.critical(error_message, path, header['format_version'],
+                                     cls.FORMAT_VERSION)
+            raise ValueError(
+                error_message % (path, header['format_version'], cls.FORMAT_VERSION)
+            )
+        nodes = np.memmap(path, dtype=cls.NODE_DTYPE, mode='r', offset=cls._nodes_offset(header),
+                          shape=(header['n_nodes'],)) if header['n_nodes'] > 0 else \
+            np.zeros(0, dtype=cls.NODE_DTYPE)
+        return cls(header, nodes)
+
+    def save(self, path: str):
+        """
+        Writes the compiled model to path.
+        """
+        header = self._encode_header(self.header)
+        with open(path, 'wb') as compiled_file:
+            compiled_file.write(self.MAGIC)
+            compiled_file.write(struct.pack('<Q', len(header)))
+            compiled_file.write(header)
+            padding = self._nodes_offset(self.header) - len(self.MAGIC) - 8 - len(header)
+            compiled_file.write(b'\0' * padding)
+            compiled_file.write(np.ascontiguousarray(self.nodes).tobytes())
+
+    @staticmethod
+    def _encode_header(header: dict) -> bytes:
+        return json.dumps(header).encode('utf-8')
+
+    @classmethod
+    def _nodes_offset(cls, header: dict) -> int:
+        size = len(cls.MAGIC) + 8 + len(cls._encode_header(header))
+        return -(-size // cls.ALIGNMENT) * cls.ALIGNMENT
+
+    def get_booster(self) -> 'CompiledModel':
+        return self
+
+    def inplace_predict(self, data, iteration_range: tuple[int, int] = (0, 0),
+                        missing: float = np.nan) -> np.ndarray:
+        """
+        Predicts the probabilities of the positive class, like Booster.inplace_predict().
+
+        Args:
+            data:
+                The feature matrix, as numpy.ndarray or scipy.sparse matrix (of which the values
+                that are not stored are missing).
+            iteration_range:
+                The range of trees to use, (0, 0) for all trees.
+            missing:
+                The value that is considered missing, next to NaN.
+        Returns:
+            numpy.ndarray:
+                float32 probabilities of the positive class.
+        """
+        if hasattr(data, 'tocoo'):
+            data = self._sparse_to_dense(data)
+        data = np.asarray(data, dtype=np.float32)
+        roots = self.roots[slice(*iteration_range) if iteration_range != (0, 0) else slice(None)]
+        scores = np.empty(data.shape[0], dtype=np.float32)
+        for start in range(0, data.shape[0], self.BLOCK_SIZE):
+            margin = self._predict_margin(data[start:start + self.BLOCK_SIZE], roots, missing)
+            # The exponent is rounded from float64, matching the (correctly rounded) float32
+            # exponent XGBoost uses, which numpy does not provide.
+            scores[start:start + self.BLOCK_SIZE] = np.float32(1) / (
+                np.float32(1) + np.exp(-margin.astype(np.float64)).astype(np.float32)
+            )
+        return scores
+
+    def predict_proba(self, data) -> np.ndarray:
+        """
+        Predicts the probabilities of both classes, like XGBClassifier.predict_proba().
+        """
+        if isinstance(data, pd.DataFrame):
+            data = data[self.feature_names].to_numpy(dtype=np.float32, na_value=np.nan)
+        scores = self.inplace_predict(data, missing=self.missing)
+        return np.column_stack([1 - scores, scores])
+
+    def _predict_margin(self, data: np.ndarray, roots: np.ndarray, missing: float) -> np.ndarray:
+        nodes = np.repeat(roots[np.newaxis, :], data.shape[0], axis=0)
+        rows = np.arange(data.shape[0])[:, np.newaxis]
+        is_missing = np.isnan(data)
+        if not np.isnan(missing):
+            is_missing |= data == missing
+        feature = self.nodes['feature']
+        threshold = self.nodes['threshold']
+        default_left = self.nodes['default_left'].astype(bool)
+        left = self.nodes['left']
+        right = self.nodes['right']
+        for _ in range(self.max_depth):
+            features = feature[nodes]
+            go_left = np.where(
+                is_missing[rows, features],
+                default_left[nodes],
+                data[rows, features] < threshold[nodes]
+            )
+            nodes = np.where(go_left, left[nodes], right[nodes])
+        values = self.nodes['value'][nodes]
+        # Summed per tree in order (in float32), like XGBoost does.
+        margin = np.full(data.shape[0], self.base_margin, dtype=np.float32)
+        for i in range(values.shape[1]):
+            margin += values[:, i]
+        return margin
+
+    @staticmethod
+    def _sparse_to_dense(data) -> np.ndarray:
+        coo = data.tocoo()
+        dense = np.full(coo.shape, np.nan, dtype=np.float32)
+        dense[coo.row, coo.col] = coo.data
+        return dense
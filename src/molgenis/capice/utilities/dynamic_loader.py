@@ -107,7 +107,9 @@ class DynamicLoader:
         for attribute in dir(loaded_spec):
             if not attribute.startswith('Template') and not attribute.startswith('__'):
                 get_attribute = getattr(loaded_spec, attribute)
-                if ('name' in dir(get_attribute) and 'usable' in dir(get_attribute)
-                        and get_attribute().usable is True):
-                    return_spec = get_attribute()
+                if 'name' in dir(get_attribute) and 'usable' in dir(get_attribute):
+                    # Instantiated once, to both check usable and return the instance.
+                    instance = get_attribute()
+                    if instance.usable is True:
+                        return_spec = instance
         return return_spec
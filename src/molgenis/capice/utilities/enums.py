@@ -35,7 +35,6 @@ class Column(Enum):
     """
     Enums to use that are specific to the column names after.
     """
-    chr_pos_ref_alt = 'chr_pos_ref_alt'
     chr = 'chr'
     pos = 'pos'
     ref = 'REF'
@@ -62,12 +61,23 @@ class OutputClasses(Enum):
     damaging = ''
 
 
-class UniqueSeparator(Enum):
+class PreservedColumn(Enum):
     """
-    Enum specific to creating a specific separator for the preservation of the chr pos ref alt
-    columns.
+    Columns that are preserved as a copy before (categorical) processing, so that their original
+    values can still be exported after the source column has been processed.
+    `col_name` is the column name of the preserved copy.
+    `col_source_name` is the name of the column that is preserved.
+    `col_export_name` is the name of the column within the output file.
     """
-    unique_separator = '_VeryUniqueCAPICESeparator_'
+    chr = ('preserved_chr', 'chr', 'chr')
+    pos = ('preserved_pos', 'pos', 'pos')
+    ref = ('preserved_REF', 'REF', 'ref')
+    alt = ('preserved_ALT', 'ALT', 'alt')
+
+    def __init__(self, col_name, col_source_name, col_export_name):
+        self.col_name = col_name
+        self.col_source_name = col_source_name
+        self.col_export_name = col_export_name
 
 
 class Versioning(Enum):
@@ -0,0 +1,227 @@
+import typing
+
+import numpy as np
+import pandas as pd
+
+from molgenis.capice.core.logger import Logger
+
+if typing.TYPE_CHECKING:
+    from scipy import sparse
+
+
+class FeatureAssembler:
+    """
+    Assembles the feature matrix of a model from the processed dataset, either as a (dense)
+    pandas DataFrame or as a scipy.sparse CSR matrix.
+
+    XGBoost considers an entry that is not stored within a sparse matrix as missing, not as 0.
+    Therefore only the sparse features (which only contain 0 or 1, such as the is_* columns of
+    the Consequence processor and the categorical one-hot columns) do not store their 0 values.
+    All other features store every value, except for missing values. Since this differs from
+    the dense representation, a model has to be trained on the sparse matrix to be able to
+    predict from it.
+    """
+
+    # The amount of rows assemble_matrix() fills at a time.
+    FILL_BLOCK_SIZE = 1024
+
+    def __init__(self, feature_names: list[str], sparse_features: list[str] | None = None):
+        """
+        Args:
+            feature_names:
+                The features (in order) of the model.
+            sparse_features:
+                The features of which 0 values are not stored within the sparse matrix.
+                If None: the dense feature matrix is assembled.
+        """
+        self.log = Logger().logger
+        self.feature_names = feature_names
+        self.sparse_features = sparse_features
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.sparse_features is not None
+
+    @staticmethod
+    def get_sparse_features(dataset: pd.DataFrame, features: list[str]) -> list[str]:
+        """
+        Method to obtain the features of dataset that only contain the values 0 or 1.
+
+        Args:
+            dataset:
+                The processed dataset.
+            features:
+                The features to consider.
+        Returns:
+            list:
+                The features (in order of features) that only contain the values 0 or 1.
+        """
+        indicators = dataset[features].isin([0, 1]).all()
+        return indicators[indicators].index.tolist()
+
+    def assemble_matrix(self, dataset: pd.DataFrame, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Method to assemble the dense feature matrix of dataset as a single contiguous float32
+        array, without creating an intermediate DataFrame of the features.
+
+        Args:
+            dataset:
+                The processed dataset containing all feature_names.
+            out:
+                The float32 array (of samples by feature_names) to fill, such as a memory-mapped
+                array. If None: a new array is allocated.
+        Returns:
+            numpy.ndarray:
+                C-contiguous float32 array of the features of dataset in order of
+                feature_names, with NaN for missing values.
+        """
+        columns = []
+        for feature in self.feature_names:
+            column = dataset[feature]
+            if isinstance(column.dtype, np.dtype):
+                # A view of the values, which are converted to float32 when filled in.
+                columns.append(column.to_numpy())
+            else:
+                # Extension dtypes (such as nullable integers) are converted with NaN as missing.
+                columns.append(column.to_numpy(dtype=np.float32, na_value=np.nan))
+        matrix = out if out is not None else np.empty(
+            (dataset.shape[0], len(self.feature_names)), dtype=np.float32
+        )
+        # Filled per block of rows, so that the strided writes of each column stay in cache.
+        for start in range(0, dataset.shape[0], self.FILL_BLOCK_SIZE):
+            block = matrix[start:start + self.FILL_BLOCK_SIZE]
+            for i, column in enumerate(columns):
+                block[:, i] = column[start:start + self.FILL_BLOCK_SIZE]
+        return matrix
+
+    def deduplicate(self, matrix: 'np.ndarray | sparse.csr_matrix') -> tuple[np.ndarray,
+                                                                             np.ndarray]:
+        """
+        Method to find the unique feature vectors of matrix, so that only these have to be
+        predicted. The bits of each row are hashed and the rows of equal hashes are verified to
+        be equal, so that a hash collision can not result in a wrong score.
+
+        Args:
+            matrix:
+                C-contiguous float32 feature matrix, as assembled by assemble_matrix(), or
+                float32 CSR matrix, as assembled by assemble().
+        Returns:
+            tuple:
+                The positions of the first row of each unique feature vector and, for every row
+                of matrix, the index of its unique feature vector. All positions of matrix if
+                two different feature vectors share the same hash.
+        """
+        if isinstance(matrix, np.ndarray):
+            hashes = self._hash_dense_rows(matrix)
+        else:
+            if not matrix.has_sorted_indices:
+                matrix = matrix.sorted_indices()
+            hashes = self._hash_sparse_rows(matrix)
+        inverse, unique_hashes = pd.factorize(hashes)
+        # The first row of each unique hash, assigned in reverse so that the first row remains.
+        unique_rows = np.empty(unique_hashes.shape[0], dtype=np.intp)
+        unique_rows[inverse[::-1]] = np.arange(inverse.shape[0] - 1, -1, -1)
+        representatives = unique_rows[inverse]
+        if isinstance(matrix, np.ndarray):
+            is_equal = self._are_dense_rows_equal(matrix, representatives)
+        else:
+            is_equal = self._are_sparse_rows_equal(matrix, representatives)
+        if not is_equal:
+            self.log.warning('Hash collision of different feature vectors, not deduplicating.')
+            all_rows = np.arange(matrix.shape[0])
+            return all_rows, all_rows
+        return unique_rows, inverse
+
+    def _hash_dense_rows(self, matrix: np.ndarray) -> np.ndarray:
+        bits = matrix.view(np.uint32)
+        hashes = np.empty(matrix.shape[0], dtype=np.uint64)
+        multipliers = self._get_hash_multipliers(matrix.shape[1])
+        for start in range(0, matrix.shape[0], self.FILL_BLOCK_SIZE):
+            hashes[start:start + self.FILL_BLOCK_SIZE] = (
+                bits[start:start + self.FILL_BLOCK_SIZE].astype(np.uint64) * multipliers
+            ).sum(axis=1)
+        return hashes
+
+    def _are_dense_rows_equal(self, matrix: np.ndarray, representatives: np.ndarray) -> bool:
+        bits = matrix.view(np.uint32)
+        for start in range(0, matrix.shape[0], self.FILL_BLOCK_SIZE):
+            block = slice(start, start + self.FILL_BLOCK_SIZE)
+            if not (bits[block] == bits[representatives[block]]).all():
+                return False
+        return True
+
+    def _hash_sparse_rows(self, matrix: 'sparse.csr_matrix') -> np.ndarray:
+        # A stored value adds 1 to its bits, so that a stored 0 differs from a value not stored.
+        multipliers = self._get_hash_multipliers(matrix.shape[1])
+        stored_hashes = (
+            matrix.data.view(np.uint32).astype(np.uint64) + np.uint64(1)
+        ) * multipliers[matrix.indices]
+        # The sum of the stored values of each row, as the difference of the cumulative sums
+        # (which wrap around the same way as the sum).
+        cumulative = np.concatenate([np.zeros(1, dtype=np.uint64), np.cumsum(stored_hashes)])
+        return cumulative[matrix.indptr[1:]] - cumulative[matrix.indptr[:-1]]
+
+    @staticmethod
+    def _are_sparse_rows_equal(matrix: 'sparse.csr_matrix',
+                               representatives: np.ndarray) -> bool:
+        row_sizes = np.diff(matrix.indptr)
+        if not (row_sizes == row_sizes[representatives]).all():
+            return False
+        # The position of every stored value within the row of its representative.
+        rows = np.repeat(np.arange(matrix.shape[0]), row_sizes)
+        positions = np.arange(matrix.nnz) - matrix.indptr[rows] + \
+            matrix.indptr[representatives[rows]]
+        bits = matrix.data.view(np.uint32)
+        return bool((matrix.indices == matrix.indices[positions]).all() and
+                    (bits == bits[positions]).all())
+
+    @staticmethod
+    def _get_hash_multipliers(n_features: int) -> np.ndarray:
+        # Odd (fixed) random 64-bit multipliers, one per feature.
+        generator = np.random.default_rng(0)
+        return generator.integers(
+            0, 2 ** 63, size=n_features, dtype=np.uint64
+        ) * np.uint64(2) + np.uint64(1)
+
+    def assemble(self, dataset: pd.DataFrame) -> 'pd.DataFrame | sparse.csr_matrix':
+        """
+        Method to assemble the feature matrix of dataset.
+
+        Args:
+            dataset:
+                The processed dataset containing all feature_names.
+        Returns:
+            pandas.DataFrame or scipy.sparse.csr_matrix:
+                The features of dataset in order of feature_names. A CSR matrix of float32 if
+                sparse_features is supplied, else a pandas DataFrame.
+        """
+        if not self.is_sparse:
+            return dataset[self.feature_names]
+        # Imported for sparse models only, so that predicting with a compiled model (through
+        # --engine numpy) does not import scipy.
+        from scipy import sparse
+
+        sparse_features = set(self.sparse_features)  # type: ignore
+        indices = []
+        data = []
+        indptr = np.zeros(len(self.feature_names) + 1, dtype=np.int64)
+        for i, feature in enumerate(self.feature_names):
+            values = dataset[feature].to_numpy(dtype=np.float32, na_value=np.nan)
+            is_stored = ~np.isnan(values)
+            if feature in sparse_features:
+                is_stored &= values != 0
+            stored = np.flatnonzero(is_stored)
+            indices.append(stored)
+            data.append(values[stored])
+            indptr[i + 1] = indptr[i] + stored.size
+        # Assembled per column (CSC) since dataset is stored per column, then converted to CSR.
+        matrix = sparse.csc_matrix(
+            (np.concatenate(data), np.concatenate(indices), indptr),
+            shape=(dataset.shape[0], len(self.feature_names))
+        ).tocsr()
+        self.log.debug(
+            'Assembled sparse feature matrix storing %d of %d values.',
+            matrix.nnz,
+            dataset.shape[0] * len(self.feature_names)
+        )
+        return matrix
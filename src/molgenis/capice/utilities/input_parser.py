@@ -1,12 +1,32 @@
+from contextlib import contextmanager
+from collections.abc import Callable, Collection, Iterator
+
 import pandas as pd
 
 from molgenis.capice.core.logger import Logger
+from molgenis.capice.utilities.vcf_parser import VCFParser
 
 
 class InputParser:
-    def __init__(self):
+    """
+    Parser of the input file. Supports multiple readers:
+    - pandas: the pandas C parser.
+    - pyarrow: the (optional dependency) pyarrow CSV reader, which parses multithreaded and
+      decompresses gzipped input in a separate thread while parsing.
+    Next to TSV input, VEP annotated VCF input is read directly by streaming it through the
+    VCFParser.
+    """
+    READERS = ('pandas', 'pyarrow')
+    # The default NA values of pandas.read_csv() with the VEP missing value "." added, so that
+    # all readers consider the same values as missing.
+    NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+                 '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'n/a', 'nan', 'null', '.']
+
+    def __init__(self, reader: str = 'pandas'):
         self.log = Logger().logger
         self.sep = '\t'
+        self._validate_reader(reader)
+        self.reader = reader
 
     def set_separator(self, sep: str):
         """
@@ -19,19 +39,168 @@ class InputParser:
         """
         self.sep = sep
 
-    def parse(self, input_file_path: str):
+    def parse(self, input_file_path: str, usecols: Collection[str] | None = None,
+              dtype: dict[str, object] | None = None):
         """
         Class to start the parsing of additional information from the input
         file.
 
         :param input_file_path: str, direction to the input file
+        :param usecols: collection of column names to limit reading the input file to. Columns
+            that are not present within the input file are ignored. If None: all columns are read.
+        :param dtype: dictionary of column names and the dtype they should be read as.
+        """
+        self._log_reading(input_file_path)
+        if self.reader == 'pyarrow':
+            input_file = self._parse_pyarrow(input_file_path, usecols, dtype)
+        else:
+            with self._open(input_file_path) as input_source:
+                input_file = pd.read_csv(
+                    input_source,
+                    sep=self.sep,
+                    na_values='.',
+                    low_memory=False,
+                    usecols=self._get_usecols(usecols),
+                    dtype=dtype
+                )
+        message = 'Input file at %s loaded with %s samples.'
+        self.log.info(message, input_file_path, input_file.shape[0])
+        return input_file
+
+    def parse_chunks(self, input_file_path: str, chunk_size: int,
+                     usecols: Collection[str] | None = None,
+                     dtype: dict[str, object] | None = None) -> Iterator[pd.DataFrame]:
         """
+        Method to parse the input file in chunks of at most chunk_size samples, so that only a
+        single chunk has to be kept in memory at a time.
+
+        Args:
+            input_file_path:
+                Path to the input file.
+            chunk_size:
+                The maximum amount of samples (rows) a single chunk contains.
+            usecols:
+                Collection of column names to limit reading the input file to. Columns that
+                are not present within the input file are ignored. If None: all columns are read.
+            dtype:
+                Dictionary of column names and the dtype they should be read as.
+
+        Yields:
+            pandas.DataFrame:
+                The next chunk of the input file.
+        """
+        if self.reader != 'pandas':
+            error_message = 'Parsing in chunks is only supported by the pandas reader!'
+            self.log.critical(error_message)
+            raise ValueError(error_message)
+        self._log_reading(input_file_path)
+        self.log.info('Reading in chunks of %d samples.', chunk_size)
+        n_samples = 0
+        with self._open(input_file_path) as input_source, pd.read_csv(
+                input_source,
+                sep=self.sep,
+                na_values='.',
+                low_memory=False,
+                usecols=self._get_usecols(usecols),
+                dtype=dtype,
+                chunksize=chunk_size
+        ) as reader:
+            for chunk in reader:
+                n_samples += chunk.shape[0]
+                self.log.debug('Loaded chunk of %d samples.', chunk.shape[0])
+                yield chunk
+        message = 'Input file at %s loaded with %s samples.'
+        self.log.info(message, input_file_path, n_samples)
+
+    def _parse_pyarrow(self, input_file_path: str, usecols: Collection[str] | None,
+                       dtype: dict[str, object] | None) -> pd.DataFrame:
+        """
+        Parses the input file using the pyarrow CSV reader. The dtypes are supplied to pyarrow
+        up front, so these columns are directly parsed into their final type.
+        """
+        # Imported here since pyarrow is an optional dependency.
+        import pyarrow as pa
+        from pyarrow import csv
+
+        with self._open(input_file_path) as input_source:
+            header = pd.read_csv(input_source, sep=self.sep, nrows=0).columns
+        if usecols is not None:
+            header = [column for column in header if column in set(usecols)]
+            include_columns = header
+        else:
+            include_columns = []
+        if dtype is None:
+            dtype = {}
+        dtype = {column: col_dtype for column, col_dtype in dtype.items() if column in header}
+        with self._open(input_file_path) as input_source:
+            table = csv.read_csv(
+                input_source,
+                read_options=csv.ReadOptions(use_threads=True),
+                parse_options=csv.ParseOptions(delimiter=self.sep),
+                convert_options=csv.ConvertOptions(
+                    column_types={
+                        column: self._to_arrow_type(col_dtype)
+                        for column, col_dtype in dtype.items()
+                    },
+                    include_columns=include_columns,
+                    null_values=self.NA_VALUES,
+                    strings_can_be_null=True
+                )
+            )
+        # Columns without any value are numeric NaN columns within pandas.read_csv().
+        null_columns = [field.name for field in table.schema if pa.types.is_null(field.type)]
+        input_file = table.to_pandas()
+        input_file[null_columns] = input_file[null_columns].astype(float)
+        # Converts the pyarrow types to the exact pandas dtypes (such as nullable integers).
+        return input_file.astype(
+            {column: col_dtype for column, col_dtype in dtype.items() if col_dtype is not str}
+        )
+
+    @staticmethod
+    @contextmanager
+    def _open(input_file_path: str):
+        """
+        Context manager supplying the source to read the input file from: the path itself for TSV
+        input, or a stream of the converted rows for VEP annotated VCF input.
+        """
+        if VCFParser.is_vcf(input_file_path):
+            with VCFParser().open(input_file_path) as input_source:
+                yield input_source
+        else:
+            yield input_file_path
+
+    @staticmethod
+    def _to_arrow_type(dtype: object):
+        import pyarrow as pa
+
+        if dtype is str:
+            return pa.string()
+        if dtype == 'category':
+            return pa.dictionary(pa.int32(), pa.string())
+        pandas_dtype = pd.api.types.pandas_dtype(dtype)
+        return pa.from_numpy_dtype(getattr(pandas_dtype, 'numpy_dtype', pandas_dtype))
+
+    def _validate_reader(self, reader: str):
+        if reader not in self.READERS:
+            error_message = 'Unknown reader %s, supported readers: %s'
+            self.log.critical(error_message, reader, ', '.join(self.READERS))
+            raise ValueError(error_message % (reader, ', '.join(self.READERS)))
+
+    def _get_usecols(self, usecols: Collection[str] | None) -> Callable[[str], bool] | None:
+        """
+        Converts usecols to a callable, since pandas.read_csv() raises an error for a list
+        containing columns that are not present within the input file.
+        """
+        if usecols is None:
+            return None
+        usecols = set(usecols)
+        self.log.debug('Limiting reading the input file to columns: %s',
+                       ', '.join(sorted(usecols)))
+        return lambda column: column in usecols
+
+    def _log_reading(self, input_file_path: str):
         if self.sep == '\t':
             used_sep = 'Tab'
         else:
             used_sep = self.sep
         self.log.info('Reading VEP file from: %s using separator: %s', input_file_path, used_sep)
-        input_file = pd.read_csv(input_file_path, sep=self.sep, na_values='.', low_memory=False)
-        message = 'Input file at %s loaded with %s samples.'
-        self.log.info(message, input_file_path, input_file.shape[0])
-        return input_file
@@ -0,0 +1,46 @@
+from collections.abc import Collection
+
+from molgenis.capice.vep.sift import SIFT
+from molgenis.capice.vep.poly_phen import PolyPhen
+from molgenis.capice.utilities.enums import InputColumn
+from molgenis.capice.vep.amino_acids import AminoAcids
+from molgenis.capice.vep.consequence import Consequence
+
+
+class InputSchema:
+    """
+    Registry of the dtypes that the known input columns should be read as, so that readers do not
+    have to infer them. Keys are the column names as present within the input file.
+    """
+
+    def __init__(self):
+        self.dtypes: dict[str, object] = {
+            InputColumn.chr.col_input_name: str,
+            InputColumn.pos.col_input_name: 'Int32',
+            InputColumn.ref.col_input_name: str,
+            InputColumn.alt.col_input_name: str,
+            InputColumn.gene_name.col_input_name: str,
+            InputColumn.gene_name_source.col_input_name: 'category',
+            InputColumn.feature.col_input_name: str,
+            InputColumn.feature_type.col_input_name: 'category',
+            Consequence().name: 'category',
+            AminoAcids().name: 'category',
+            SIFT().name: 'float32',
+            PolyPhen().name: 'float32'
+        }
+
+    def get_dtypes(self, columns: Collection[str] | None = None) -> dict[str, object]:
+        """
+        Getter for the registered dtypes.
+
+        Args:
+            columns:
+                Collection of column names to limit the registered dtypes to.
+                If None: all registered dtypes are returned.
+        Returns:
+            dict:
+                Input column names (key) and the dtype they should be read as (value).
+        """
+        if columns is None:
+            return dict(self.dtypes)
+        return {column: dtype for column, dtype in self.dtypes.items() if column in columns}
@@ -1,10 +1,10 @@
-import os
-
+import numpy as np
 import pandas as pd
 
 from molgenis.capice.core.logger import Logger
-from molgenis.capice.utilities import get_project_root_dir
-from molgenis.capice.utilities.dynamic_loader import DynamicLoader
+from molgenis.capice.core.metrics_recorder import MetricsRecorder
+from molgenis.capice.utilities.processing_plan import ProcessingPlan
+from molgenis.capice.utilities.vep_processor_registry import VEPProcessorRegistry
 
 
 class ManualVEPProcessor:
@@ -16,11 +16,14 @@ class ManualVEPProcessor:
     def __init__(self):
         self.log = Logger().logger
         self.feature_processing_tracker = {}
+        # Bytes saved by the compact dtypes of each processor, compared to 64-bit columns.
+        self.memory_saved: dict[str, int] = {}
 
     def process(self, dataset: pd.DataFrame, process_features: list[str]) -> pd.DataFrame:
         """
         Callable method for the ManualVEPProcessor to start processing.
-        Loads all the VEP processors dynamically from /src/molgenis/capice/vep.
+        Runs the VEP processors (of the VEPProcessorRegistry) required for process_features,
+        according to their ProcessingPlan.
 
         Args:
             dataset: The input dataset over which the VEP features should be processed.
@@ -32,32 +35,74 @@ class ManualVEPProcessor:
 
         """
         self.log.info('Starting manual VEP feature processing.')
-        vep_annotators = self._load_vep_processors()
-        dropping_columns = []
+        plan = self.get_plan(process_features)
+        recorder = MetricsRecorder()
         n_feats_processed = 0
-        for processor in vep_annotators:
-            if (
-                    processor.name in dataset.columns and
-                    processor.name in process_features and
-                    processor.usable
-            ):
+        for step in plan.steps:
+            processor = step.processor
+            if processor.name in dataset.columns:
                 self.log.debug('Processing: %s', processor.name)
                 self._add_feature_tracking(processor.name, processor.columns)
-                dataset = processor.process(dataset)
-                if processor.drop and processor.name not in dropping_columns:
-                    dropping_columns.append(processor.name)
+                with recorder.stage(
+                        recorder.VEP_PROCESSOR_PREFIX + type(processor).__name__, dataset
+                ) as run:
+                    dataset = processor.process(dataset)
+                    self._apply_dtypes(processor, dataset)
+                    run.set_output(dataset)
                 n_feats_processed += 1
             else:
                 self.log.warning('Could not use processor %s on input dataset!', processor.name)
-        self.log.debug('Property drop was set True for columns: %s', ', '.join(dropping_columns))
-        dataset.drop(columns=dropping_columns, inplace=True)
-        self.log.info('Processing successful.')
+            drop_columns = [column for column in step.drop_columns if column in dataset.columns]
+            if len(drop_columns) > 0:
+                self.log.debug('Dropping processed columns: %s', ', '.join(drop_columns))
+                dataset.drop(columns=drop_columns, inplace=True)
+        self.log.info('Processing successful, compact dtypes saved %.1f MB.',
+                      sum(self.memory_saved.values()) / 1e6)
         self.log.debug('Processed %d features.', n_feats_processed)
         return dataset
 
+    def _apply_dtypes(self, processor, dataset: pd.DataFrame):
+        """
+        Method to cast the output columns of processor to their compact dtypes (processor.dtypes),
+        such as int8 for indicators and float32 for numerics, and to track the memory saved
+        compared to 64-bit columns. An integer column containing missing values is cast to
+        float32 instead.
+        """
+        # Keyed by the processor class, since processors (such as Length and Type) share a name.
+        processor_class = type(processor).__name__
+        saved = 0
+        for column, dtype in getattr(processor, 'dtypes', {}).items():
+            if column not in dataset.columns:
+                continue
+            if np.issubdtype(dtype, np.integer) and dataset[column].isnull().any():
+                dtype = np.float32
+            if dataset[column].dtype != dtype:
+                dataset[column] = dataset[column].astype(dtype)
+            saved += dataset.shape[0] * (8 - dataset[column].dtype.itemsize)
+        if saved > 0:
+            self.log.debug('Compact dtypes of processor %s saved %.1f MB.', processor_class,
+                           saved / 1e6)
+        self.memory_saved[processor_class] = self.memory_saved.get(processor_class, 0) + saved
+
+    def get_plan(self, process_features: list[str]) -> ProcessingPlan:
+        """
+        Method to obtain the execution plan of the VEP processors for process_features.
+
+        Args:
+            process_features: A collection of all input features over which VEP processing
+                              should happen.
+
+        Returns:
+            ProcessingPlan: The (cached) plan of the processors required for process_features.
+        """
+        return ProcessingPlan.create(
+            self._load_vep_processors(), tuple(sorted(set(process_features)))
+        )
+
     def _add_feature_tracking(self, processor_name: str, processor_features: list[str]):
         if processor_name not in self.feature_processing_tracker.keys():
-            self.feature_processing_tracker[processor_name] = processor_features
+            # Copied, since the processor instances are shared.
+            self.feature_processing_tracker[processor_name] = list(processor_features)
         else:
             self.feature_processing_tracker[processor_name].extend(processor_features)
 
@@ -72,9 +117,6 @@ class ManualVEPProcessor:
         return self.feature_processing_tracker
 
     def _load_vep_processors(self):
-        location = os.path.join(get_project_root_dir(), 'vep')
-        self.log.debug('Loading modules at %s', location)
-        loader = DynamicLoader(required_attributes=['name', 'process'], path=location)
-        loaded_modules = loader.load_manual_annotators()
-        self.log.debug('Loaded %d modules.', len(loaded_modules))
-        return loaded_modules
+        processors = VEPProcessorRegistry.get_processors()
+        self.log.debug('Using %d VEP processors.', len(processors))
+        return processors
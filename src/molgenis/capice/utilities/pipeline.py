@@ -0,0 +1,181 @@
+import queue
+import threading
+from time import perf_counter
+from collections.abc import Callable, Iterable, Iterator
+
+from molgenis.capice.core.logger import Logger
+
+
+class PipelineStage:
+    """
+    Timings of a single stage of the Pipeline.
+
+    busy is the time the stage spent working, input_wait the time it waited on the previous
+    stage to supply its next item (the stage is starved) and output_wait the time it waited on
+    the next stage to accept an item (the queue towards the next stage is full).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.total = 0.0
+        self.input_wait = 0.0
+        self.output_wait = 0.0
+
+    @property
+    def busy(self) -> float:
+        return self.total - self.input_wait - self.output_wait
+
+    def __str__(self):
+        return (f'Stage {self.name}: busy {self.busy:.3f} s, waiting for input '
+                f'{self.input_wait:.3f} s, waiting for output {self.output_wait:.3f} s, '
+                f'{self.items} items.')
+
+
+class _Stopped(Exception):
+    """
+    Raised within a stage when another stage has failed.
+    """
+
+
+class _ConsumerFinished(Exception):
+    """
+    Raised within a stage when the next stage has finished without obtaining all its items.
+    """
+
+
+class Pipeline:
+    """
+    Runs each stage of a chain of stages within its own thread, connected through bounded
+    queues, so that the stages overlap instead of running in sequence (for instance
+    decompressing the next chunk of the input while the current chunk is predicted and the
+    previous chunk is compressed into the output).
+
+    Each stage is a function that takes the iterable of items of the previous stage and returns
+    the iterable of items for the next stage. The first stage is an iterable itself and the
+    return value of the last stage is ignored. The amount of items kept in memory is bounded by
+    the queue size between every two stages.
+
+    If any stage raises an error, the other stages are stopped and the error is raised by run().
+    If a stage returns without obtaining all items of the previous stage, the previous stages
+    are stopped as well.
+    """
+    _END = object()
+    # Interval at which blocked stages check whether another stage has failed.
+    _POLL_INTERVAL = 0.1
+
+    def __init__(self, queue_size: int = 2):
+        """
+        Args:
+            queue_size:
+                The maximum amount of items within the queue between two stages.
+        """
+        self.log = Logger().logger
+        self.queue_size = queue_size
+        self.stages: list[PipelineStage] = []
+        self._stopped = threading.Event()
+        self._errors: list[Exception] = []
+
+    def run(self, source: tuple[str, Iterable],
+            *stages: tuple[str, Callable[[Iterable], Iterable | None]]):
+        """
+        Runs the pipeline until all items have passed the last stage.
+
+        Args:
+            source:
+                Tuple of the name and the iterable of the first stage.
+            *stages:
+                Tuples of the name and the function of each next stage.
+        """
+        self.stages = [PipelineStage(source[0])] + [PipelineStage(name) for name, _ in stages]
+        queues: list[queue.Queue] = [queue.Queue(maxsize=self.queue_size) for _ in stages]
+        # Set once the stage reading from the queue has finished.
+        consumed = [threading.Event() for _ in stages]
+        threads = [threading.Thread(
+            target=self._run_stage,
+            args=(self.stages[0], lambda _: source[1], None, None, queues[0], consumed[0]),
+            name=f'pipeline-{source[0]}'
+        )]
+        for i, (name, function) in enumerate(stages, start=1):
+            threads.append(threading.Thread(
+                target=self._run_stage,
+                args=(self.stages[i], function, queues[i - 1], consumed[i - 1],
+                      queues[i] if i < len(queues) else None,
+                      consumed[i] if i < len(consumed) else None),
+                name=f'pipeline-{name}'
+            ))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for stage in self.stages:
+            self.log.info(str(stage))
+        if len(self._errors) > 0:
+            raise self._errors[0]
+
+    def _run_stage(self, stage: PipelineStage, function: Callable,
+                   input_queue: queue.Queue | None, input_consumed: threading.Event | None,
+                   output_queue: queue.Queue | None, output_consumed: threading.Event | None):
+        start = perf_counter()
+        outputs = None
+        try:
+            inputs = self._iterate(input_queue, stage) if input_queue is not None else None
+            outputs = function(inputs)
+            if output_queue is not None:
+                for item in outputs:
+                    stage.items += 1
+                    self._put(output_queue, output_consumed, item, stage)
+                self._put(output_queue, output_consumed, self._END, stage)
+            elif outputs is not None:
+                # The items of the last stage are counted as these are obtained.
+                for _ in outputs:
+                    pass
+        except _ConsumerFinished:
+            # Finishes a generator (such as a reader) that is not iterated any further.
+            if outputs is not None and hasattr(outputs, 'close'):
+                outputs.close()
+        except _Stopped:
+            pass
+        except Exception as e:
+            self._errors.append(e)
+            self._stopped.set()
+        finally:
+            # The previous stage stops once this stage has finished.
+            if input_consumed is not None:
+                input_consumed.set()
+            stage.total = perf_counter() - start
+
+    def _iterate(self, input_queue: queue.Queue, stage: PipelineStage) -> Iterator:
+        while True:
+            start = perf_counter()
+            item = self._get(input_queue)
+            stage.input_wait += perf_counter() - start
+            if item is self._END:
+                return
+            if stage is self.stages[-1]:
+                stage.items += 1
+            yield item
+
+    def _get(self, input_queue: queue.Queue):
+        while True:
+            if self._stopped.is_set():
+                raise _Stopped()
+            try:
+                return input_queue.get(timeout=self._POLL_INTERVAL)
+            except queue.Empty:
+                pass
+
+    def _put(self, output_queue: queue.Queue, output_consumed: threading.Event | None, item,
+             stage: PipelineStage):
+        start = perf_counter()
+        while True:
+            if self._stopped.is_set():
+                raise _Stopped()
+            if output_consumed is not None and output_consumed.is_set():
+                raise _ConsumerFinished()
+            try:
+                output_queue.put(item, timeout=self._POLL_INTERVAL)
+                break
+            except queue.Full:
+                pass
+        stage.output_wait += perf_counter() - start
@@ -0,0 +1,139 @@
+import queue
+import threading
+from time import monotonic
+
+import numpy as np
+import pandas as pd
+
+from molgenis.capice.core.logger import Logger
+
+
+class _BatchRequest:
+    """
+    A single submitted dataset, of which the result is set by the batcher thread.
+    """
+
+    def __init__(self, loaded_data: pd.DataFrame):
+        self.loaded_data = loaded_data
+        self.result: pd.DataFrame | None = None
+        self.error: Exception | None = None
+        self.done = threading.Event()
+
+
+class PredictBatcher:
+    """
+    Micro-batches datasets that are submitted concurrently (such as by the requests of
+    capice serve), so that these are processed and predicted as a single dataset.
+
+    A single batcher thread collects submitted datasets until either max_batch_size samples are
+    collected or max_wait seconds have passed since the first dataset of the batch was
+    submitted. Since processing and predicting is independent per sample, the result of each
+    submitted dataset is identical to processing and predicting it on its own.
+    """
+
+    def __init__(self, predict, max_batch_size: int = 10000, max_wait: float = 0.01):
+        """
+        Args:
+            predict:
+                The CapicePredict instance of which process_and_predict() is called for each
+                batch.
+            max_batch_size:
+                The amount of samples at which a batch is predicted without further waiting.
+            max_wait:
+                The maximum amount of seconds to wait for other datasets to be submitted.
+        """
+        self.log = Logger().logger
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: queue.Queue[_BatchRequest | None] = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='capice-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, loaded_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Submits loaded_data and blocks until it is processed and predicted.
+
+        Args:
+            loaded_data:
+                The loaded (and validated) input dataset.
+        Returns:
+            pandas.DataFrame:
+                The processed and predicted loaded_data, as process_and_predict() returns it.
+        Raises:
+            Exception:
+                Any exception raised by processing or predicting loaded_data.
+        """
+        request = _BatchRequest(loaded_data)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result  # type: ignore
+
+    def close(self):
+        """
+        Stops the batcher thread once all submitted datasets are predicted.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            n_samples = request.loaded_data.shape[0]
+            deadline = monotonic() + self.max_wait
+            closing = False
+            while n_samples < self.max_batch_size:
+                timeout = deadline - monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    closing = True
+                    break
+                batch.append(request)
+                n_samples += request.loaded_data.shape[0]
+            self._predict_batch(batch)
+            if closing:
+                return
+
+    def _predict_batch(self, batch: list[_BatchRequest]):
+        self.log.debug('Predicting batch of %d samples from %d requests.',
+                       sum(request.loaded_data.shape[0] for request in batch), len(batch))
+        try:
+            if len(batch) == 1:
+                batch[0].result = self.predict.process_and_predict(batch[0].loaded_data)
+            else:
+                self._predict_combined(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].error = e
+            else:
+                # Predicted on their own, so that only the failing requests obtain the error.
+                for request in batch:
+                    self._predict_batch([request])
+                return
+        for request in batch:
+            request.done.set()
+
+    def _predict_combined(self, batch: list[_BatchRequest]):
+        starts = np.cumsum([0] + [request.loaded_data.shape[0] for request in batch])
+        predicted = self.predict.process_and_predict(
+            pd.concat([request.loaded_data for request in batch], ignore_index=True)
+        )
+        # The index of the combined dataset is retained by process_and_predict(), so the
+        # samples of each request are those within its range of the index.
+        positions = predicted.index.to_numpy()
+        owner = np.searchsorted(starts, positions, side='right') - 1
+        for i, request in enumerate(batch):
+            is_owned = owner == i
+            result = predicted[is_owned].copy()
+            result.index = request.loaded_data.index[positions[is_owned] - starts[i]]
+            request.result = result
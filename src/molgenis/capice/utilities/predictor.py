@@ -1,19 +1,47 @@
+import numpy as np
+
 from molgenis.capice.core.logger import Logger
 from molgenis.capice.utilities.enums import Column
+from molgenis.capice.utilities.compiled_model import CompiledModel
+from molgenis.capice.utilities.feature_assembler import FeatureAssembler
 
 
 class Predictor:
     """
     Predictor class for CAPICE. Produces the final CAPICE score.
+
+    Predicts directly through Booster.inplace_predict() over a contiguous float32 feature matrix
+    (or the CSR matrix of sparse models), instead of through XGBClassifier.predict_proba(), which
+    copies the features into a new DataFrame and validates these before predicting. The scores
+    are the same as those of predict_proba(), including only using the trees up to the best
+    iteration of the model.
+
+    Rows of which the feature vectors are equal (for instance variants within overlapping
+    transcripts of the same consequence) are predicted once, after which the score is assigned
+    to all of these rows.
     """
 
-    def __init__(self, model):
+    def __init__(self, model, n_threads: int | None = None, batch_size: int | None = None,
+                 deduplicate: bool = True):
         """
         :param model: XGBClassifier, the custom pickled model instance of user
         provided model.
+        :param n_threads: int, the amount of threads XGBoost predicts with. If None: the
+        amount of threads of the model is used.
+        :param batch_size: int, the maximum amount of samples of which the feature matrix is
+        assembled and predicted at a time, bounding the memory used by the feature matrix. If
+        None: all samples are predicted at once.
+        :param deduplicate: bool, whether to only predict the unique feature vectors (of each
+        batch).
         """
         self.log = Logger().logger
         self.model = model
+        self.booster = model.get_booster()
+        # A compiled model predicts within a single thread.
+        if n_threads is not None and not isinstance(self.booster, CompiledModel):
+            self.booster.set_param('nthread', n_threads)
+        self.batch_size = batch_size
+        self.deduplicate = deduplicate
         self.log.info('Starting prediction.')
 
     def predict(self, dataset):
@@ -25,7 +53,56 @@ class Predictor:
         CAPICE score per variant.
         """
         self.log.info('Predicting for %d samples.', dataset.shape[0])
-        dataset[Column.score.value] = self.model.predict_proba(
-            dataset[self.model.get_booster().feature_names])[:, 1]
+        # Models trained on the sparse feature matrix contain the attribute sparse_features.
+        assembler = FeatureAssembler(
+            self.booster.feature_names,
+            sparse_features=getattr(self.model, 'sparse_features', None)
+        )
+        batch_size = self.batch_size or max(dataset.shape[0], 1)
+        scores = np.empty(dataset.shape[0], dtype=np.float32)
+        n_unique = 0
+        for start in range(0, dataset.shape[0], batch_size):
+            matrix, inverse = self._assemble(assembler, dataset.iloc[start:start + batch_size])
+            n_unique += matrix.shape[0]
+            batch_scores = self.booster.inplace_predict(
+                matrix,
+                iteration_range=self._get_iteration_range(),
+                missing=self.model.missing
+            )
+            scores[start:start + batch_size] = batch_scores if inverse is None else \
+                batch_scores[inverse]
+        if self.deduplicate and n_unique > 0:
+            self.log.info(
+                'Predicted %d unique feature vectors for %d samples (deduplication ratio: %.2f).',
+                n_unique, dataset.shape[0], dataset.shape[0] / n_unique
+            )
+        dataset[Column.score.value] = scores
         self.log.info('Prediction successful.')
         return dataset
+
+    def _assemble(self, assembler: FeatureAssembler, batch) -> tuple:
+        """
+        Assembles the feature matrix of batch, of only its unique feature vectors if
+        deduplicating.
+        :return: tuple: the feature matrix and, if deduplicating, the row of the feature matrix
+        for every row of batch (else None).
+        """
+        if assembler.is_sparse:
+            matrix = assembler.assemble(batch)
+        else:
+            matrix = assembler.assemble_matrix(batch)
+        if not self.deduplicate:
+            return matrix, None
+        unique_rows, inverse = assembler.deduplicate(matrix)
+        if unique_rows.shape[0] < batch.shape[0]:
+            matrix = matrix[unique_rows]
+        return matrix, inverse
+
+    def _get_iteration_range(self) -> tuple[int, int]:
+        # Identical to XGBClassifier.predict_proba(): up to the best iteration if present.
+        if getattr(self.model, 'booster', None) == 'gblinear':
+            return 0, 0
+        try:
+            return 0, self.model.best_iteration + 1
+        except AttributeError:
+            return 0, 0
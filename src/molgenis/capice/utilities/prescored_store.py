@@ -0,0 +1,362 @@
+import io
+import os
+import gzip
+import json
+import typing
+import pickle
+import hashlib
+import tempfile
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from molgenis.capice.core.logger import Logger
+from molgenis.capice.utilities.enums import Column, InputColumn
+
+if typing.TYPE_CHECKING:
+    import xgboost as xgb
+
+
+class PrescoredStore:
+    """
+    On-disk store of CAPICE scores, keyed by chr, pos, ref, alt and feature.
+
+    The store is a TSV sorted on chromosome and position that is split into blocks. Each block is
+    a separate gzip member, so that the store is still a regular gzipped TSV while a single block
+    can be decompressed on its own. The sidecar index (the store path followed by .idx) contains
+    the position range and byte location of each block and the model the scores belong to.
+    """
+    INDEX_EXTENSION = '.idx'
+    KEY = [Column.chr.value, Column.pos.value, Column.ref.value.lower(),
+           Column.alt.value.lower(), Column.feature.value]
+    COLUMNS = KEY + [Column.score.value]
+    DTYPES = {
+        Column.chr.value: str,
+        Column.pos.value: np.int64,
+        Column.ref.value.lower(): str,
+        Column.alt.value.lower(): str,
+        Column.feature.value: str,
+        Column.score.value: np.float32
+    }
+    # The amount of samples within a block, which is only exceeded to keep all samples of the
+    # same position within a single block.
+    BLOCK_SIZE = 10000
+    # The amount of samples read from each sorted run at a time while merging the runs.
+    MERGE_READ_SIZE = 100000
+    # The maximum amount of runs merged at once, more runs are merged in multiple passes.
+    MERGE_WIDTH = 64
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path:
+                Path to the store, of which the index should be present at path + .idx .
+        Raises:
+            FileNotFoundError:
+                If either the store or its index does not exist.
+        """
+        self.log = Logger().logger
+        self.path = path
+        for required_path in [self.path, self.index_path(self.path)]:
+            if not os.path.isfile(required_path):
+                error_message = 'Prescored store file %s does not exist!'
+                self.log.critical(error_message, required_path)
+                raise FileNotFoundError(error_message % required_path)
+        with open(self.index_path(self.path), 'rt') as index_file:
+            index = json.load(index_file)
+        self.capice_version = index['CAPICE_version']
+        self.model_checksum = index['model_checksum']
+        self.blocks = {}
+        for chrom, blocks in pd.DataFrame(
+                index['blocks'], columns=['chr', 'start', 'end', 'offset', 'size']
+        ).groupby('chr', sort=False):
+            self.blocks[chrom] = blocks.drop(columns='chr').to_numpy(dtype=np.int64)
+
+    @classmethod
+    def index_path(cls, path: str) -> str:
+        return path + cls.INDEX_EXTENSION
+
+    @staticmethod
+    def get_model_checksum(model: 'xgb.XGBClassifier') -> str:
+        """
+        Method to obtain the checksum of the trees of model, so that scores of a different model
+        with the same CAPICE version are not used. A compiled model has the checksum of the model
+        it is compiled from.
+        """
+        if hasattr(model, 'model_checksum'):
+            return model.model_checksum
+        return hashlib.sha256(model.get_booster().save_raw(raw_format='ubj')).hexdigest()
+
+    def validate_model(self, model: 'xgb.XGBClassifier') -> None:
+        """
+        Validates that the scores within the store are created by model.
+
+        Raises:
+            ValueError:
+                If the CAPICE version or checksum of model do not match the store.
+        """
+        if (
+                model.CAPICE_version != self.capice_version or
+                self.get_model_checksum(model) != self.model_checksum
+        ):
+            error_message = 'Prescored store %s was created with a different model ' \
+                            '(CAPICE version: %s)!'
+            self.log.critical(error_message, self.path, self.capice_version)
+            raise ValueError(error_message % (self.path, self.capice_version))
+
+    @classmethod
+    def write(cls, path: str, datasets: Iterable[pd.DataFrame], model: 'xgb.XGBClassifier',
+              block_size: int = BLOCK_SIZE) -> int:
+        """
+        Writes the scores of datasets to a new store at path (and its index).
+
+        Only a single dataset is sorted in memory at a time: each dataset is sorted and written
+        to a temporary run (next to path), after which the runs are merged into the blocks of
+        the store. Of samples with the same key, the first is stored.
+
+        Args:
+            path:
+                Path to write the store to.
+            datasets:
+                Iterable of pandas DataFrames containing (at least) the COLUMNS.
+            model:
+                The model the scores have been predicted with.
+            block_size:
+                The amount of samples within a block.
+        Returns:
+            int:
+                The amount of samples within the store.
+        """
+        log = Logger().logger
+        blocks: list[list] = []
+        n_samples = 0
+        with tempfile.TemporaryDirectory(
+                prefix='.capice_prescore_', dir=os.path.dirname(os.path.abspath(path))
+        ) as run_directory:
+            runs = cls._write_runs(datasets, run_directory)
+            log.debug('Sorted the scores into %d runs.', len(runs))
+            merge_pass = 0
+            while len(runs) > cls.MERGE_WIDTH:
+                # Merged in multiple passes, limiting the amount of runs read at once.
+                merge_pass += 1
+                merged_runs = []
+                for i in range(0, len(runs), cls.MERGE_WIDTH):
+                    merged_run = os.path.join(run_directory, f'{merge_pass}_{i}.pkl')
+                    with open(merged_run, 'wb') as run_file:
+                        for scores in cls._merge_runs(runs[i:i + cls.MERGE_WIDTH]):
+                            pickle.dump(scores, run_file, protocol=pickle.HIGHEST_PROTOCOL)
+                    merged_runs.append(merged_run)
+                for run in runs:
+                    os.remove(run)
+                runs = merged_runs
+            with open(path, 'wb') as store_file:
+                store_file.write(gzip.compress(('\t'.join(cls.COLUMNS) + '\n').encode()))
+                pending = None
+                for scores in cls._merge_runs(runs):
+                    if pending is not None:
+                        scores = pd.concat([pending, scores], ignore_index=True)
+                    pending = cls._write_blocks(store_file, scores, block_size, blocks)
+                    n_samples += scores.shape[0] - (0 if pending is None else pending.shape[0])
+                if pending is not None:
+                    cls._write_blocks(store_file, pending, block_size, blocks, final=True)
+                    n_samples += pending.shape[0]
+        with open(cls.index_path(path), 'wt') as index_file:
+            json.dump(
+                {
+                    'CAPICE_version': model.CAPICE_version,
+                    'model_checksum': cls.get_model_checksum(model),
+                    'columns': cls.COLUMNS,
+                    'blocks': blocks
+                },
+                index_file
+            )
+        log.info('Written %d prescored samples in %d blocks to: %s', n_samples, len(blocks),
+                 path)
+        return n_samples
+
+    @classmethod
+    def _write_runs(cls, datasets: Iterable[pd.DataFrame], directory: str) -> list[str]:
+        """
+        Writes the normalized scores of each dataset, sorted on KEY, to a run within directory.
+        A run consists of consecutive pickled DataFrames of (at most) MERGE_READ_SIZE samples.
+
+        Returns:
+            list:
+                The paths of the runs, in order of datasets. Empty datasets have no run.
+        """
+        runs: list[str] = []
+        for dataset in datasets:
+            scores = cls._normalize(dataset[cls.COLUMNS])
+            scores.drop_duplicates(subset=cls.KEY, inplace=True)
+            if scores.shape[0] == 0:
+                continue
+            scores.sort_values(by=cls.KEY, inplace=True)
+            run = os.path.join(directory, f'{len(runs)}.pkl')
+            with open(run, 'wb') as run_file:
+                for start in range(0, scores.shape[0], cls.MERGE_READ_SIZE):
+                    pickle.dump(scores.iloc[start:start + cls.MERGE_READ_SIZE], run_file,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+            runs.append(run)
+        return runs
+
+    @staticmethod
+    def _read_run(run: str) -> Iterator[pd.DataFrame]:
+        with open(run, 'rb') as run_file:
+            while True:
+                try:
+                    yield pickle.load(run_file)
+                except EOFError:
+                    return
+
+    @classmethod
+    def _merge_runs(cls, runs: list[str]) -> Iterator[pd.DataFrame]:
+        """
+        Merges the sorted runs, reading a single DataFrame of a run at a time.
+
+        Yields:
+            pandas.DataFrame:
+                The next samples sorted on KEY, without duplicate keys (keeping the sample of the
+                first run). All samples of a position are within the same DataFrame.
+        """
+        readers = [cls._read_run(run) for run in runs]
+        buffers = [next(reader) for reader in readers]
+        exhausted = [False] * len(runs)
+        while True:
+            # All samples before the smallest last position of the buffers of the runs that are
+            # not exhausted have been read, and can be merged.
+            last_positions = [
+                (buffer[Column.chr.value].iat[-1], buffer[Column.pos.value].iat[-1])
+                for buffer, is_exhausted in zip(buffers, exhausted) if not is_exhausted
+            ]
+            bound = min(last_positions) if len(last_positions) > 0 else None
+            merged = []
+            for i, buffer in enumerate(buffers):
+                if bound is None:
+                    merged.append(buffer)
+                    continue
+                chrom = buffer[Column.chr.value]
+                is_before = (chrom < bound[0]) | (
+                    (chrom == bound[0]) & (buffer[Column.pos.value] < bound[1])
+                )
+                merged.append(buffer[is_before])
+                buffers[i] = buffer[~is_before]
+            scores = pd.concat(merged, ignore_index=True)
+            if scores.shape[0] > 0:
+                scores.drop_duplicates(subset=cls.KEY, inplace=True)
+                scores.sort_values(by=cls.KEY, inplace=True, ignore_index=True)
+                yield scores
+            if bound is None:
+                return
+            # The runs ending at the bound are read further.
+            for i, buffer in enumerate(buffers):
+                if exhausted[i] or (buffer[Column.chr.value].iat[-1],
+                                    buffer[Column.pos.value].iat[-1]) != bound:
+                    continue
+                chunk = next(readers[i], None)
+                if chunk is None:
+                    exhausted[i] = True
+                else:
+                    buffers[i] = pd.concat([buffer, chunk], ignore_index=True)
+
+    @classmethod
+    def _write_blocks(cls, store_file, scores: pd.DataFrame, block_size: int, blocks: list,
+                      final: bool = False) -> pd.DataFrame | None:
+        """
+        Writes the blocks of scores (sorted on KEY and containing all samples of its positions)
+        to store_file and adds these to blocks. Unless final, the samples of the last chromosome
+        that do not fill a block are not written, since later scores can add to this block.
+
+        Returns:
+            pandas.DataFrame or None:
+                The samples that are not written, None if all samples are written.
+        """
+        chroms = scores[Column.chr.value].to_numpy()
+        positions = scores[Column.pos.value].to_numpy()
+        chrom_starts = np.concatenate(
+            [[0], np.flatnonzero(chroms[1:] != chroms[:-1]) + 1, [chroms.size]]
+        )
+        for chrom_start, chrom_end in zip(chrom_starts[:-1], chrom_starts[1:]):
+            is_last_chrom = chrom_end == chroms.size and not final
+            start = chrom_start
+            while start < chrom_end:
+                if is_last_chrom and chrom_end - start < block_size:
+                    return scores.iloc[start:].reset_index(drop=True)
+                end = min(start + block_size, chrom_end)
+                # All samples of a position are kept within a single block.
+                while end < chrom_end and positions[end] == positions[end - 1]:
+                    end += 1
+                block = gzip.compress(scores.iloc[start:end].to_csv(
+                    sep='\t', header=False, index=False
+                ).encode())
+                blocks.append([chroms[start], int(positions[start]), int(positions[end - 1]),
+                               store_file.tell(), len(block)])
+                store_file.write(block)
+                start = end
+        return None
+
+    def lookup(self, dataset: pd.DataFrame) -> pd.Series:
+        """
+        Looks up the scores of the samples within dataset. Only the blocks that can contain the
+        positions of dataset are read.
+
+        Args:
+            dataset:
+                Loaded (input) dataset, containing the chr, pos, REF, ALT and feature columns.
+        Returns:
+            pandas.Series:
+                The float32 scores (index equal to dataset), missing if not within the store.
+        """
+        keys = self._normalize(
+            dataset[[InputColumn.chr.col_name, InputColumn.pos.col_name,
+                     InputColumn.ref.col_name, InputColumn.alt.col_name,
+                     InputColumn.feature.col_name]].set_axis(self.KEY, axis=1)
+        )
+        scores = pd.Series(np.nan, index=dataset.index, dtype=np.float32)
+        block_rows = []
+        for chrom, positions in keys.groupby(Column.chr.value, sort=False)[Column.pos.value]:
+            if chrom not in self.blocks:
+                continue
+            blocks = self.blocks[chrom]
+            positions = positions.to_numpy()
+            # Blocks are sorted on and do not overlap in position, so the only block that can
+            # contain a position is the first block ending at or after it.
+            candidates = np.searchsorted(blocks[:, 1], positions, side='left')
+            in_range = candidates < blocks.shape[0]
+            candidates = candidates[in_range]
+            candidates = np.unique(candidates[blocks[candidates, 0] <= positions[in_range]])
+            block_rows.extend(blocks[candidates].tolist())
+        if len(block_rows) == 0:
+            return scores
+        with open(self.path, 'rb') as store_file:
+            prescored = pd.concat(
+                [self._read_block(store_file, offset, size) for _, _, offset, size in block_rows],
+                ignore_index=True
+            )
+        hits = keys.assign(row=np.arange(keys.shape[0])).merge(
+            prescored, on=self.KEY, how='inner'
+        )
+        scores.iloc[hits['row'].to_numpy()] = hits[Column.score.value].to_numpy()
+        self.log.debug('Read %d blocks from the prescored store.', len(block_rows))
+        return scores
+
+    def _read_block(self, store_file, offset: int, size: int) -> pd.DataFrame:
+        store_file.seek(offset)
+        return pd.read_csv(
+            io.BytesIO(gzip.decompress(store_file.read(size))),
+            sep='\t',
+            header=None,
+            names=self.COLUMNS,
+            dtype=self.DTYPES,
+            keep_default_na=False
+        )
+
+    @classmethod
+    def _normalize(cls, dataset: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converts the key columns of dataset to the dtypes of the store, with an empty string
+        for a missing feature.
+        """
+        dataset = dataset.copy()
+        dataset[Column.feature.value] = dataset[Column.feature.value].fillna('')
+        return dataset.astype({column: cls.DTYPES[column] for column in dataset.columns})
@@ -0,0 +1,100 @@
+import functools
+from collections.abc import Iterable
+
+
+class ProcessingStep:
+    """
+    A single VEP processor within the ProcessingPlan.
+    """
+
+    def __init__(self, processor, drop_columns: list[str]):
+        """
+        Args:
+            processor:
+                The VEP processor to run.
+            drop_columns:
+                The (processed) input columns that are dropped directly after running the
+                processor, since no later step uses them.
+        """
+        self.processor = processor
+        self.input_columns = list(getattr(processor, 'input_columns', [processor.name]))
+        self.output_columns = list(processor.columns)
+        self.drop_columns = drop_columns
+
+
+class ProcessingPlan:
+    """
+    Ordered execution plan of the VEP processors required for the (model) features.
+
+    Processors of which the name is not within the features are not part of the plan. A
+    processed column that has to be dropped (processor.drop) is dropped as soon as the last
+    step using it as input has run, instead of after running all processors, limiting the
+    peak memory usage.
+    """
+
+    def __init__(self, processors: Iterable, process_features: Iterable[str]):
+        """
+        Args:
+            processors:
+                All available VEP processors, in the order these should be run.
+            process_features:
+                The features over which VEP processing should happen.
+        """
+        process_features = set(process_features)
+        self.skipped_processors = []
+        planned = []
+        for processor in processors:
+            if processor.name in process_features and processor.usable:
+                planned.append(processor)
+            else:
+                self.skipped_processors.append(processor)
+        dropped_columns = {processor.name for processor in planned if processor.drop}
+        last_consumer = {}
+        for i, processor in enumerate(planned):
+            for column in getattr(processor, 'input_columns', [processor.name]):
+                if column in dropped_columns:
+                    last_consumer[column] = i
+        self.steps = [
+            ProcessingStep(
+                processor,
+                drop_columns=[column for column, consumer in last_consumer.items() if consumer == i]
+            ) for i, processor in enumerate(planned)
+        ]
+
+    @classmethod
+    @functools.lru_cache(maxsize=16)
+    def create(cls, processors: tuple, process_features: tuple[str, ...]) -> 'ProcessingPlan':
+        """
+        Creates the plan, or returns the plan previously created for the same processors and
+        features.
+        """
+        return cls(processors, process_features)
+
+    @property
+    def input_columns(self) -> list[str]:
+        """
+        All input columns used by the steps of the plan, in order of first use.
+        """
+        return list(dict.fromkeys(
+            column for step in self.steps for column in step.input_columns
+        ))
+
+    def explain(self) -> str:
+        """
+        Returns:
+            str:
+                Human readable representation of the plan.
+        """
+        lines = [f'VEP processing plan of {len(self.steps)} steps:']
+        for i, step in enumerate(self.steps, start=1):
+            lines.append(f'{i}. {type(step.processor).__name__} ({step.processor.name})')
+            lines.append(f'   input:  {", ".join(step.input_columns)}')
+            lines.append(f'   output: {", ".join(step.output_columns)}')
+            if len(step.drop_columns) > 0:
+                lines.append(f'   drops:  {", ".join(step.drop_columns)}')
+        if len(self.skipped_processors) > 0:
+            lines.append('Skipped processors (not required): ' + ', '.join(
+                f'{type(processor).__name__} ({processor.name})'
+                for processor in self.skipped_processors
+            ))
+        return '\n'.join(lines)
@@ -0,0 +1,31 @@
+class ThreadBudget:
+    """
+    Splits the threads available for training between the fits that run concurrently (the
+    n_jobs of the hyperparameter search) and the OpenMP threads of XGBoost within each fit.
+
+    Concurrent fits scale better than the threads within a single fit, but each concurrent fit
+    keeps its own copy of the training data in memory. By default all threads go to concurrent
+    fits (at most one per fit) and the remaining threads are divided over these fits. Supplying
+    threads_per_fit limits the amount of concurrent fits (and thereby the memory usage) instead.
+    """
+
+    def __init__(self, threads: int, n_fits: int, threads_per_fit: int | None = None):
+        """
+        Args:
+            threads:
+                The total amount of threads available.
+            n_fits:
+                The amount of fits of the hyperparameter search.
+            threads_per_fit:
+                The amount of threads of each fit. If None: determined from threads and n_fits.
+        """
+        self.threads = threads
+        if threads_per_fit is None:
+            self.n_jobs = max(1, min(threads, n_fits))
+            self.threads_per_fit = max(1, threads // self.n_jobs)
+        else:
+            self.threads_per_fit = max(1, min(threads_per_fit, threads))
+            self.n_jobs = max(1, threads // self.threads_per_fit)
+
+    def __str__(self):
+        return f'{self.n_jobs} concurrent fits using {self.threads_per_fit} threads each'
@@ -0,0 +1,249 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from typing import Literal
+from collections.abc import Iterable
+
+import numpy as np
+import pandas as pd
+
+from molgenis.capice import __version__
+from molgenis.capice.core.logger import Logger
+from molgenis.capice.utilities.enums import InputColumn
+from molgenis.capice.utilities.feature_assembler import FeatureAssembler
+
+
+class TrainingCache:
+    """
+    On-disk cache of the processed training data of CAPICE train, so that training again on the
+    same input file and features skips loading and processing the input file.
+
+    Each entry is a directory within the cache directory named after its key: the SHA-256 of the
+    CAPICE version and the contents of the input file and features file. An entry contains the
+    float32 feature matrix, the int64 labels and the float64 sample weights as .npy files and
+    the train features (and their dtypes), VEP processed features and categorical features as
+    metadata.json. The features are converted back to their dtypes when loaded, since XGBoost
+    stores the feature types within the model. The arrays can also be memory-mapped
+    (load_arrays()), such as for out-of-core training.
+    """
+    FORMAT_VERSION = 2
+    FEATURES_FILE = 'features.npy'
+    LABELS_FILE = 'labels.npy'
+    SAMPLE_WEIGHTS_FILE = 'sample_weights.npy'
+    METADATA_FILE = 'metadata.json'
+    # Fixed, so that the values of later chunks are never truncated to the dtype of the first.
+    LABELS_DTYPE = np.int64
+    SAMPLE_WEIGHTS_DTYPE = np.float64
+    # The amount of bytes read at a time when computing the key.
+    READ_SIZE = 1024 * 1024
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory:
+                The cache directory, which is created if it does not exist.
+        """
+        self.log = Logger().logger
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def get_key(cls, input_path: str, features_path: str) -> str:
+        """
+        Method to obtain the key of the processed training data of input_path and features_path.
+        """
+        key = hashlib.sha256()
+        key.update(f'{cls.FORMAT_VERSION}\0{__version__}\0'.encode('utf-8'))
+        for path in [input_path, features_path]:
+            content = hashlib.sha256()
+            with open(path, 'rb') as file:
+                for block in iter(lambda: file.read(cls.READ_SIZE), b''):
+                    content.update(block)
+            key.update(content.digest())
+        return key.hexdigest()
+
+    def get_entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def load(self, key: str) -> tuple[pd.DataFrame, list[str], dict[str, list[str]],
+                                      dict[str, list[str]]] | None:
+        """
+        Loads the processed training data of key.
+
+        Returns:
+            tuple or None:
+                None if key is not cached, else:
+                Tuple [0] containing: The processed dataset of the train features, label and
+                sample weight.
+                Tuple [1] containing: The train features.
+                Tuple [2] containing: The VEP features and the features derived from them.
+                Tuple [3] containing: The categorical features and their categories.
+        """
+        arrays = self.load_arrays(key)
+        if arrays is None:
+            return None
+        features, labels, sample_weights, metadata = arrays
+        dataset = pd.DataFrame(features, columns=metadata['train_features']).astype(
+            metadata['dtypes']
+        )
+        dataset[InputColumn.binarized_label.col_name] = labels
+        dataset[InputColumn.sample_weight.col_name] = sample_weights
+        return (dataset, metadata['train_features'], metadata['vep_processed'],
+                metadata['processed_features'])
+
+    def load_arrays(self, key: str, mmap: bool = False) -> tuple[
+        np.ndarray, np.ndarray, np.ndarray, dict
+    ] | None:
+        """
+        Loads the processed training data of key as arrays.
+
+        Args:
+            key:
+                The key of the processed training data.
+            mmap:
+                Whether to memory-map the arrays (read-only) instead of reading them into
+                memory.
+        Returns:
+            tuple or None:
+                None if key is not cached, else:
+                Tuple [0] containing: The float32 feature matrix (samples by train features).
+                Tuple [1] containing: The labels.
+                Tuple [2] containing: The sample weights.
+                Tuple [3] containing: The metadata.
+        """
+        entry_path = self.get_entry_path(key)
+        metadata_path = os.path.join(entry_path, self.METADATA_FILE)
+        if not os.path.isfile(metadata_path):
+            self.log.info('Processed training data is not cached yet: %s', entry_path)
+            return None
+        with open(metadata_path, 'rt') as metadata_file:
+            metadata = json.load(metadata_file)
+        mmap_mode: Literal['r'] | None = 'r' if mmap else None
+        arrays = tuple(
+            np.load(os.path.join(entry_path, file_name), mmap_mode=mmap_mode)
+            for file_name in [self.FEATURES_FILE, self.LABELS_FILE, self.SAMPLE_WEIGHTS_FILE]
+        )
+        self.log.info('Loaded processed training data of %d samples from cache: %s',
+                      arrays[0].shape[0], entry_path)
+        return arrays[0], arrays[1], arrays[2], metadata
+
+    def store(self, key: str, dataset: pd.DataFrame, train_features: list[str],
+              vep_processed: dict[str, list[str]], processed_features: dict[str, list[str]]):
+        """
+        Stores the processed training data of key.
+
+        Args:
+            dataset:
+                The processed dataset, containing (at least) the train features, label and
+                sample weight.
+            train_features:
+                The train features (in order).
+            vep_processed:
+                The VEP features and the features derived from them.
+            processed_features:
+                The categorical features and their categories.
+        """
+        self.store_chunks(key, dataset.shape[0], [dataset], train_features, vep_processed,
+                          processed_features)
+
+    def store_chunks(self, key: str, n_samples: int, datasets: Iterable[pd.DataFrame],
+                     train_features: list[str], vep_processed: dict[str, list[str]],
+                     processed_features: dict[str, list[str]]):
+        """
+        Stores the processed training data of key from the processed chunks datasets, of which
+        only a single chunk is kept in memory at a time. The arrays are written through memory
+        maps, into a temporary directory first, so that an interrupted or concurrent run never
+        leaves a partial entry.
+
+        Args:
+            n_samples:
+                The total amount of samples of datasets.
+            datasets:
+                The processed chunks, containing (at least) the train features, label and
+                sample weight.
+            train_features:
+                The train features (in order).
+            vep_processed:
+                The VEP features and the features derived from them.
+            processed_features:
+                The categorical features and their categories.
+        """
+        entry_path = self.get_entry_path(key)
+        temporary_path = tempfile.mkdtemp(dir=self.directory, prefix=f'.{key}.')
+        try:
+            self._write_arrays(temporary_path, n_samples, datasets, train_features,
+                               vep_processed, processed_features)
+            os.rename(temporary_path, entry_path)
+        except OSError:
+            # Stored by another run in the meantime.
+            if not os.path.isdir(entry_path):
+                raise
+        finally:
+            if os.path.isdir(temporary_path):
+                shutil.rmtree(temporary_path)
+        self.log.info('Stored processed training data in cache: %s', entry_path)
+
+    def _write_arrays(self, path: str, n_samples: int, datasets: Iterable[pd.DataFrame],
+                      train_features: list[str], vep_processed: dict[str, list[str]],
+                      processed_features: dict[str, list[str]]):
+        assembler = FeatureAssembler(train_features)
+        features = np.lib.format.open_memmap(
+            os.path.join(path, self.FEATURES_FILE), mode='w+', dtype=np.float32,
+            shape=(n_samples, len(train_features))
+        )
+        labels = self._open_column_memmap(path, self.LABELS_FILE, n_samples, self.LABELS_DTYPE)
+        sample_weights = self._open_column_memmap(path, self.SAMPLE_WEIGHTS_FILE, n_samples,
+                                                  self.SAMPLE_WEIGHTS_DTYPE)
+        dtypes: dict[str, object] = {}
+        offset = 0
+        for dataset in datasets:
+            if offset + dataset.shape[0] > n_samples:
+                error_message = 'Processed training data contains more than %d samples!'
+                self.log.critical(error_message, n_samples)
+                raise ValueError(error_message % n_samples)
+            rows = slice(offset, offset + dataset.shape[0])
+            assembler.assemble_matrix(dataset, out=features[rows])
+            labels[rows] = dataset[InputColumn.binarized_label.col_name].to_numpy()
+            sample_weights[rows] = dataset[InputColumn.sample_weight.col_name].to_numpy()
+            for feature in train_features:
+                dtypes[feature] = self._merge_dtypes(dtypes.get(feature), dataset[feature].dtype)
+            offset += dataset.shape[0]
+        if offset != n_samples:
+            error_message = 'Processed training data contains %d samples instead of %d!'
+            self.log.critical(error_message, offset, n_samples)
+            raise ValueError(error_message % (offset, n_samples))
+        features.flush()
+        del features, labels, sample_weights
+        with open(os.path.join(path, self.METADATA_FILE), 'wt') as metadata_file:
+            json.dump(
+                {
+                    'format_version': self.FORMAT_VERSION,
+                    'CAPICE_version': __version__,
+                    'train_features': train_features,
+                    'dtypes': {feature: str(dtype) for feature, dtype in dtypes.items()},
+                    'vep_processed': vep_processed,
+                    'processed_features': processed_features
+                },
+                metadata_file
+            )
+
+    @staticmethod
+    def _open_column_memmap(path: str, file_name: str, n_samples: int,
+                            dtype: type) -> np.ndarray:
+        return np.lib.format.open_memmap(
+            os.path.join(path, file_name), mode='w+', dtype=dtype, shape=(n_samples,)
+        )
+
+    @staticmethod
+    def _merge_dtypes(dtype, other):
+        """
+        Returns the dtype of a feature over all chunks, such as float64 for a feature of which
+        only some chunks contain missing values.
+        """
+        if dtype is None or dtype == other:
+            return other
+        if isinstance(dtype, np.dtype) and isinstance(other, np.dtype):
+            return np.result_type(dtype, other)
+        return np.dtype(np.float64)
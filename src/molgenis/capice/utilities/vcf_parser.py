@@ -0,0 +1,131 @@
+import io
+import re
+import gzip
+from itertools import islice
+from collections.abc import Iterator
+
+from molgenis.capice.core.logger import Logger
+
+
+class VCFParser:
+    """
+    Streaming reader of a VEP annotated VCF. Converts the VCF into the CAPICE input TSV format on
+    the fly, equal to the output of scripts/convert_vep_vcf_to_tsv_capice.sh
+    (bcftools +split-vep -d -A tab): a row per CSQ entry (transcript) with the columns CHROM, POS,
+    REF, ALT followed by the CSQ fields, in which empty values are "." .
+    """
+    EXTENSIONS = ('.vcf', '.vcf.gz')
+    _CSQ_HEADER = '##INFO=<ID=CSQ,'
+    _CSQ_FORMAT = re.compile(r'Format: ([^"]+)"')
+    # The amount of TSV rows converted at a time when filling the read buffer.
+    _BATCH_SIZE = 1024
+
+    def __init__(self):
+        self.log = Logger().logger
+
+    @classmethod
+    def is_vcf(cls, input_file_path: str) -> bool:
+        return str(input_file_path).endswith(cls.EXTENSIONS)
+
+    def open(self, input_file_path: str) -> io.BufferedReader:
+        """
+        Opens a VEP annotated VCF as a binary stream of the CAPICE input TSV format, so that it
+        can be supplied to any CSV reader in place of a TSV input file.
+
+        Args:
+            input_file_path:
+                Path to the (optionally gzipped) VEP annotated VCF.
+        Returns:
+            io.BufferedReader:
+                Readable binary stream of the converted TSV. Closing the stream closes the VCF.
+        Raises:
+            ValueError:
+                If the VCF header does not contain the VEP CSQ INFO field.
+        """
+        self.log.info('Converting VEP annotated VCF %s to rows per CSQ entry.', input_file_path)
+        vcf_file = self._open_vcf(input_file_path)
+        try:
+            csq_fields = self._parse_header(vcf_file)
+        except ValueError:
+            vcf_file.close()
+            raise
+        return io.BufferedReader(_TSVStream(self._convert(vcf_file, csq_fields)))
+
+    @staticmethod
+    def _open_vcf(input_file_path: str):
+        if str(input_file_path).endswith('.gz'):
+            return gzip.open(input_file_path, 'rt')
+        return open(input_file_path, 'rt')
+
+    def _parse_header(self, vcf_file) -> list[str]:
+        """
+        Reads the VCF meta-information and header lines, up to and including the #CHROM line.
+        Returns the CSQ fields as defined by the VEP CSQ INFO header.
+        """
+        csq_fields = None
+        for line in vcf_file:
+            if line.startswith(self._CSQ_HEADER):
+                csq_format = self._CSQ_FORMAT.search(line)
+                if csq_format is not None:
+                    csq_fields = csq_format.group(1).strip().split('|')
+            elif not line.startswith('##'):
+                break
+        if csq_fields is None:
+            error_message = 'VCF header does not contain the VEP CSQ INFO field!'
+            self.log.critical(error_message)
+            raise ValueError(error_message)
+        self.log.debug('Found CSQ fields: %s', ', '.join(csq_fields))
+        return csq_fields
+
+    @staticmethod
+    def _convert(vcf_file, csq_fields: list[str]) -> Iterator[str]:
+        """
+        Generator of the TSV rows (including header) of the VCF records after the header.
+        """
+        with vcf_file:
+            yield '\t'.join(['CHROM', 'POS', 'REF', 'ALT', *csq_fields]) + '\n'
+            missing_csq = ['.'] * len(csq_fields)
+            for record in vcf_file:
+                chrom, pos, _, ref, alt, _, _, info = record.rstrip('\r\n').split('\t', 8)[:8]
+                variant = f'{chrom}\t{pos}\t{ref}\t{alt}\t'
+                csq = None
+                for info_field in info.split(';'):
+                    if info_field.startswith('CSQ='):
+                        csq = info_field[4:]
+                        break
+                if csq is None:
+                    yield variant + '\t'.join(missing_csq) + '\n'
+                    continue
+                for csq_entry in csq.split(','):
+                    yield variant + '\t'.join(
+                        value if value else '.' for value in csq_entry.split('|')
+                    ) + '\n'
+
+
+class _TSVStream(io.RawIOBase):
+    """
+    Raw binary stream over an iterator of text rows, which are only encoded once read.
+    """
+
+    def __init__(self, rows: Iterator[str]):
+        self._rows = rows
+        self._buffer = bytearray()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        while len(self._buffer) < len(buffer):
+            rows = ''.join(islice(self._rows, VCFParser._BATCH_SIZE))
+            if not rows:
+                break
+            self._buffer += rows.encode()
+        n_bytes = min(len(buffer), len(self._buffer))
+        buffer[:n_bytes] = self._buffer[:n_bytes]
+        del self._buffer[:n_bytes]
+        return n_bytes
+
+    def close(self):
+        # Closes the generator, which closes the VCF file.
+        self._rows.close()
+        super().close()
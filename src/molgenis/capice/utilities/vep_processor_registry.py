@@ -0,0 +1,100 @@
+import os
+import inspect
+import pkgutil
+import importlib
+import threading
+from importlib import metadata
+
+from molgenis.capice import vep
+from molgenis.capice.core.logger import Logger
+from molgenis.capice.utilities.dynamic_loader import DynamicLoader
+
+
+class VEPProcessorRegistry:
+    """
+    Registry of the VEP processors, which is built once per process and shared by every
+    ManualVEPProcessor afterwards.
+
+    The processors are obtained from:
+    - The modules of the molgenis.capice.vep package.
+    - Plugins registered under the entry point group capice.vep_processors, of which each entry
+      point refers to either a processor class or a module containing processor classes.
+    - Plugin directories listed within the CAPICE_VEP_PLUGINS environment variable (separated
+      by os.pathsep), which are loaded through the DynamicLoader.
+
+    The package and entry point modules are imported through the regular import system, so a
+    module that is already imported is not executed again.
+    """
+    ENTRY_POINT_GROUP = 'capice.vep_processors'
+    PLUGIN_PATH_VARIABLE = 'CAPICE_VEP_PLUGINS'
+    REQUIRED_ATTRIBUTES = ['name', 'process']
+    _processors: tuple | None = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_processors(cls) -> tuple:
+        """
+        Returns:
+            tuple:
+                The usable VEP processor instances, loaded on the first call.
+        """
+        with cls._lock:
+            if cls._processors is None:
+                cls._processors = cls._load_processors()
+        return cls._processors
+
+    @classmethod
+    def clear(cls):
+        """
+        Clears the registry, so that the processors are loaded again on the next call of
+        get_processors() (for instance after installing a plugin).
+        """
+        with cls._lock:
+            cls._processors = None
+
+    @classmethod
+    def _load_processors(cls) -> tuple:
+        log = Logger().logger
+        processors = []
+        for module_info in sorted(pkgutil.iter_modules(vep.__path__), key=lambda m: m.name):
+            module = importlib.import_module(f'{vep.__name__}.{module_info.name}')
+            processors.extend(cls._get_module_processors(module))
+        for entry_point in metadata.entry_points(group=cls.ENTRY_POINT_GROUP):
+            log.debug('Loading VEP processor plugin %s from: %s', entry_point.name,
+                      entry_point.value)
+            loaded = entry_point.load()
+            if inspect.ismodule(loaded):
+                processors.extend(cls._get_module_processors(loaded))
+            else:
+                processors.extend(cls._instantiate_usable([loaded]))
+        plugin_paths = os.environ.get(cls.PLUGIN_PATH_VARIABLE, '')
+        for plugin_path in filter(None, plugin_paths.split(os.pathsep)):
+            log.debug('Loading VEP processor plugins at: %s', plugin_path)
+            loader = DynamicLoader(required_attributes=cls.REQUIRED_ATTRIBUTES, path=plugin_path)
+            processors.extend(loader.load_manual_annotators())
+        log.info('Successfully loaded %d VEP processors.', len(processors))
+        return tuple(processors)
+
+    @classmethod
+    def _get_module_processors(cls, module) -> list:
+        """
+        Returns the usable processors of the classes defined within module, excluding the
+        (abstract) templates.
+        """
+        return cls._instantiate_usable([
+            member for name, member in inspect.getmembers(module, inspect.isclass)
+            if member.__module__ == module.__name__ and not name.startswith('Template')
+            and not inspect.isabstract(member)
+        ])
+
+    @classmethod
+    def _instantiate_usable(cls, processor_classes: list) -> list:
+        processors = []
+        for processor_class in processor_classes:
+            processor = processor_class()
+            if (
+                    all(hasattr(processor, attribute) for attribute in cls.REQUIRED_ATTRIBUTES)
+                    and getattr(processor, 'usable', False) is True
+            ):
+                processors.append(processor)
+        return processors
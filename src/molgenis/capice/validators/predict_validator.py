@@ -1,14 +1,18 @@
+import typing
+
 import pandas as pd
-import xgboost as xgb
 
 from molgenis.capice.core.logger import Logger
 
+if typing.TYPE_CHECKING:
+    import xgboost as xgb
+
 
 class PredictValidator:
     def __init__(self):
         self.log = Logger().logger
 
-    def validate_data_predict_ready(self, dataset: pd.DataFrame, model: xgb.XGBClassifier) ->\
+    def validate_data_predict_ready(self, dataset: pd.DataFrame, model: 'xgb.XGBClassifier') ->\
             None:
         """
         Validates if dataset is predict ready according to the feature names in model
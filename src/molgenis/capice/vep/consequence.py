@@ -1,3 +1,5 @@
+import functools
+
 import numpy as np
 import pandas as pd
 
@@ -60,26 +62,41 @@ class Consequence(Template):
                 'is_splice_polypyrimidine_tract_variant'
                 ]
 
+    @property
+    def dtypes(self):
+        return {column: np.int8 for column in self.columns}
+
     @staticmethod
     def _fillna():
         return 0
 
-    def _process(self, dataframe: pd.DataFrame):
-        splitted_consequence = dataframe[self.name].str.split('&', expand=True)
-        raw_consequences = []
-        for consequence in self.columns:
-            current_consequence = consequence.split('is_')[1]
-            dataframe[consequence] = np.where(
-                np.isin(splitted_consequence, current_consequence).any(axis=1), 1, 0
-            )
-            raw_consequences.append(current_consequence)
+    @functools.cached_property
+    def _consequence_bits(self) -> dict[str, int]:
+        """
+        The bit (within the bitmask of a Consequence value) of each supported consequence.
+        """
+        return {column.split('is_')[1]: bit for bit, column in enumerate(self.columns)}
 
-        self._validate_consequences(splitted_consequence, raw_consequences)
+    def _process(self, dataframe: pd.DataFrame):
+        # Each distinct Consequence value is encoded once into the bitmask of its consequences,
+        # after which all rows obtain their bitmask through their factorized code.
+        codes, unique_consequences = pd.factorize(dataframe[self.name])
+        bitmasks = np.zeros(len(unique_consequences) + 1, dtype=np.int64)
+        unsupported_consequences = set()
+        for i, consequences in enumerate(unique_consequences):
+            for consequence in consequences.split('&'):
+                if consequence in self._consequence_bits:
+                    bitmasks[i] |= 1 << self._consequence_bits[consequence]
+                else:
+                    unsupported_consequences.add(consequence)
+        # Code -1 (missing value) indexes the last bitmask, which has no consequences.
+        row_bitmasks = bitmasks[codes]
+        for bit, column in enumerate(self.columns):
+            dataframe[column] = ((row_bitmasks >> bit) & 1).astype(np.int8)
+        self._validate_consequences(unsupported_consequences)
         return dataframe
 
-    def _validate_consequences(self, consequences: pd.DataFrame, supported_consequences: list):
-        unique_consequences = pd.Series(pd.unique(consequences.values.ravel('K'))).dropna()
-        for consequence in unique_consequences:
-            if consequence not in supported_consequences:
-                self.log.warning('Supplied VEP consequence: %s is not supported in the '
-                                 'Consequence processor!', consequence)
+    def _validate_consequences(self, unsupported_consequences: set[str]):
+        for consequence in sorted(unsupported_consequences):
+            self.log.warning('Supplied VEP consequence: %s is not supported in the '
+                             'Consequence processor!', consequence)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 from molgenis.capice.vep.template import Template
@@ -15,6 +16,10 @@ class Length(Template):
     def columns(self):
         return ['Length']
 
+    @property
+    def dtypes(self):
+        return {'Length': np.int32}
+
     def _process(self, dataframe: pd.DataFrame):
         dataframe = dataframe.join(
             pd.DataFrame(
@@ -24,6 +29,10 @@ class Length(Template):
         )
         return dataframe
 
+    @property
+    def input_columns(self):
+        return [Column.ref.value, Column.alt.value]
+
     @property
     def drop(self):
         return False
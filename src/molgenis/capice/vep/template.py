@@ -26,6 +26,21 @@ class Template(metaclass=ABCMeta):
     def columns(self):
         return []
 
+    @property
+    def input_columns(self):
+        """
+        The columns used by process(), by default only the column of name.
+        """
+        return [self.name]
+
+    @property
+    def dtypes(self) -> dict[str, object]:
+        """
+        The compact dtype of each numeric output column, which the ManualVEPProcessor casts the
+        column to after process(). Output columns not present keep the dtype of process().
+        """
+        return {}
+
     @property
     def usable(self):
         return self._usable
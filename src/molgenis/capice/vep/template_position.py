@@ -18,6 +18,12 @@ class TemplatePosition(Template):
     def columns(self):
         return [None, None]
 
+    @property
+    def dtypes(self):
+        # float32 instead of int32, since positions can be missing. Positions below 2^24 are
+        # represented exactly.
+        return {column: np.float32 for column in self.columns}
+
     @property
     def pos_col(self):
         return self.columns[0]
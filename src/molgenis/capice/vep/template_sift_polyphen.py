@@ -18,6 +18,10 @@ class TemplateSiftPolyPhen(Template):
     def columns(self):
         return [None, None]
 
+    @property
+    def dtypes(self):
+        return {self.columns[1]: np.float32}
+
     @abstractmethod
     def apply_label(self, dataframe: pd.DataFrame):
         return dataframe
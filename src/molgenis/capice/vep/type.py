@@ -54,6 +54,10 @@ class Type(Template):
                 (first_alt_nuc == ref_column) & ref_column_value_is_1].index, self.columns] = 'INS'
         return dataframe
 
+    @property
+    def input_columns(self):
+        return [Column.ref.value, Column.alt.value]
+
     @property
     def drop(self):
         return False
@@ -7,6 +7,7 @@ from argparse import ArgumentParser
 from molgenis.capice.cli.args_handler_parent import ArgsHandlerParent
 from tests.capice.test_templates import ResourceFile, _project_test_resources
 from molgenis.capice.cli.args_handler_predict import ArgsHandlerPredict
+from molgenis.capice.utilities.compiled_model import CompiledModel
 
 
 class TestArgsHandlerPredict(unittest.TestCase):
@@ -292,10 +293,174 @@ class TestArgsHandlerPredict(unittest.TestCase):
                       'prerelease version 1.0.0rc2 (should match for pre-releases)!',
                       stderr.getvalue())
 
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_chunk_size_invalid(self, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_chunk_size(0)
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('The chunk size has to be at least 1!', stderr.getvalue())
+
+    def test_chunk_size_valid(self):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        args_handler.validate_chunk_size(None)
+        args_handler.validate_chunk_size(1)
+
+    @patch('sys.stderr', new_callable=StringIO)
+    @patch('molgenis.capice.cli.args_handler_predict.find_spec', return_value=None)
+    def test_reader_pyarrow_not_installed(self, find_spec, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_reader('pyarrow', None)
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('The pyarrow reader requires pyarrow to be installed!', stderr.getvalue())
+
+    @patch('sys.stderr', new_callable=StringIO)
+    @patch('molgenis.capice.cli.args_handler_predict.find_spec')
+    def test_reader_pyarrow_chunk_size(self, find_spec, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_reader('pyarrow', 10)
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('The pyarrow reader does not support --chunk-size!', stderr.getvalue())
+
+    def test_reader_pandas_chunk_size(self):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        args_handler.validate_reader('pandas', 10)
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_workers_invalid(self, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_workers(0, 'pandas')
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('The amount of workers has to be at least 1!', stderr.getvalue())
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_workers_pyarrow(self, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_workers(2, 'pyarrow')
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('The pyarrow reader does not support --workers!', stderr.getvalue())
+
+    def test_workers_valid(self):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        args_handler.validate_workers(1, 'pyarrow')
+        args_handler.validate_workers(4, 'pandas')
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_queue_size_invalid(self, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_pipelined(True, 0, 'pandas')
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('The queue size has to be at least 1!', stderr.getvalue())
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_pipelined_pyarrow(self, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_pipelined(True, 2, 'pyarrow')
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('The pyarrow reader does not support --pipelined!', stderr.getvalue())
+
+    def test_pipelined_valid(self):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        args_handler.validate_pipelined(False, 2, 'pyarrow')
+        args_handler.validate_pipelined(True, 1, 'pandas')
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_threads_invalid(self, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_prediction(0, None)
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('The amount of threads has to be at least 1!', stderr.getvalue())
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_batch_size_invalid(self, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_prediction(None, 0)
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('The batch size has to be at least 1!', stderr.getvalue())
+
+    def test_prediction_valid(self):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        args_handler.validate_prediction(None, None)
+        args_handler.validate_prediction(2, 1000)
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_engine_xgboost_compiled_model(self, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_engine('xgboost', CompiledModel.compile(self.model))
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('A compiled model can only be used with --engine numpy!',
+                      stderr.getvalue())
+
+    def test_engine_numpy(self):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        self.assertIs(self.model, args_handler.validate_engine('xgboost', self.model))
+        self.assertIsInstance(args_handler.validate_engine('numpy', self.model), CompiledModel)
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_metrics_out_directory_not_existing(self, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_metrics_out(
+                os.path.join(_project_test_resources, 'non_existing_directory', 'metrics.json')
+            )
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('non_existing_directory does not exist!', stderr.getvalue())
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_metrics_out_existing(self, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_metrics_out(self.model_path)
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('already exists! Use -f to overwrite.', stderr.getvalue())
+        args_handler.force = True
+        args_handler.validate_metrics_out(self.model_path)
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_metrics_trace_allocations_without_metrics_out(self, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_metrics_out(None, trace_allocations=True)
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('--metrics-trace-allocations requires --metrics-out!', stderr.getvalue())
+
+    def test_metrics_out_valid(self):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        args_handler.validate_metrics_out(None)
+        args_handler.validate_metrics_out(os.path.join(_project_test_resources, 'metrics.json'))
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_prescored_not_existing(self, stderr):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_prescored(
+                os.path.join(_project_test_resources, 'non_existing_store.tsv.gz'), self.model
+            )
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('non_existing_store.tsv.gz does not exist!', stderr.getvalue())
+
+    def test_prescored_not_given(self):
+        args_handler = ArgsHandlerPredict(ArgumentParser())
+        self.assertIsNone(args_handler.validate_prescored(None, self.model))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_explain_plan(self, stdout):
+        ArgsHandlerPredict.explain_plan(self.model)
+        self.assertIn('VEP processing plan of 9 steps:', stdout.getvalue())
+
     def test_property_str_versions(self):
         args_handler = ArgsHandlerPredict(ArgumentParser())
-        self.assertEqual('.tsv, .tsv.gz', args_handler._extension_str())
-        self.assertEqual('.json, .ubj', args_handler._model_extension_str())
+        self.assertEqual('.tsv, .tsv.gz, .vcf, .vcf.gz', args_handler._extension_str())
+        self.assertEqual('.json, .ubj, .compiled', args_handler._model_extension_str())
         self.assertEqual('.tsv, .tsv.gz', args_handler._required_output_extensions_str())
 
 
@@ -0,0 +1,45 @@
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from argparse import ArgumentParser
+
+from tests.capice.test_templates import ResourceFile
+from molgenis.capice.cli.args_handler_serve import ArgsHandlerServe
+
+
+class TestArgsHandlerServe(unittest.TestCase):
+    def test_validate_models(self):
+        args_handler = ArgsHandlerServe(ArgumentParser())
+        models = args_handler.validate_models([ResourceFile.XGB_BOOSTER_POC_JSON.value])
+        self.assertListEqual(['xgb_booster_poc'], list(models.keys()))
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_validate_models_duplicate_name(self, stderr):
+        args_handler = ArgsHandlerServe(ArgumentParser())
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_models([ResourceFile.XGB_BOOSTER_POC_JSON.value,
+                                          ResourceFile.XGB_BOOSTER_POC_JSON.value])
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('Multiple models are named xgb_booster_poc!', stderr.getvalue())
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_validate_batching(self, stderr):
+        args_handler = ArgsHandlerServe(ArgumentParser())
+        args_handler.validate_batching(1, 0)
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_batching(0, 10)
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('The maximum batch size has to be at least 1!', stderr.getvalue())
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_validate_max_payload_size(self, stderr):
+        args_handler = ArgsHandlerServe(ArgumentParser())
+        args_handler.validate_max_payload_size(1)
+        with self.assertRaises(SystemExit) as cm:
+            args_handler.validate_max_payload_size(0)
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('The maximum payload size has to be at least 1!', stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import os
 import unittest
 from unittest.mock import patch
 from argparse import ArgumentParser
@@ -20,6 +21,44 @@ class TestArgsHandlerPredict(unittest.TestCase):
             self.aht.validate_n_threads(0)
         self.assertIn('The amount of threads has to be at least 1!', stderr.getvalue())
 
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_validate_threads_per_fit(self, stderr):
+        for threads_per_fit in [0, 3]:
+            with self.assertRaises(SystemExit):
+                self.aht.validate_threads_per_fit(threads_per_fit, 2)
+        self.assertIn('The threads per fit have to be at least 1 and at most the amount of '
+                      'threads!', stderr.getvalue())
+        self.aht.validate_threads_per_fit(None, 2)
+        self.aht.validate_threads_per_fit(2, 2)
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_validate_cache_dir(self, stderr):
+        with self.assertRaises(SystemExit):
+            self.aht.validate_cache_dir(__file__)
+        self.assertIn('is not a directory!', stderr.getvalue())
+        self.aht.validate_cache_dir(None)
+        self.aht.validate_cache_dir(os.path.dirname(__file__))
+        self.aht.validate_cache_dir(os.path.join(os.path.dirname(__file__), 'foo'))
+
+    @patch('sys.stderr', new_callable=StringIO)
+    def test_validate_out_of_core(self, stderr):
+        for out_of_core, chunk_size, sparse, message in [
+            (True, 0, False, 'The chunk size has to be at least 1!'),
+            (False, 100, False, '--chunk-size can only be used with --out-of-core!'),
+            (True, None, True, '--out-of-core can not be combined with --sparse!')
+        ]:
+            with self.assertRaises(SystemExit):
+                self.aht.validate_out_of_core(out_of_core, chunk_size, sparse)
+            self.assertIn(message, stderr.getvalue())
+        self.aht.validate_out_of_core(True, 100, False)
+        self.aht.validate_out_of_core(False, None, True)
+
+    def test_tree_methods(self):
+        from molgenis.capice.main_train import CapiceTrain
+
+        self.assertEqual(CapiceTrain.TREE_METHODS, self.aht.tree_methods)
+        self.assertEqual(CapiceTrain.SEARCHES, self.aht.searches)
+
     @patch('sys.stderr', new_callable=StringIO)
     def test_validate_test_split_0(self, stderr):
         with self.assertRaises(SystemExit):
@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+import subprocess
+
+from tests.capice.test_templates import ResourceFile
+
+# Runs capice within a new interpreter and prints the imported modules on exit.
+_RUN_CAPICE = """
+import sys
+import json
+import atexit
+
+from molgenis.capice.capice import main
+
+atexit.register(lambda: print(json.dumps(sorted(sys.modules))))
+sys.argv = ['capice'] + sys.argv[1:]
+main()
+"""
+
+
+class TestArgsHandler(unittest.TestCase):
+    @staticmethod
+    def get_imported_modules(*args):
+        result = subprocess.run(
+            [sys.executable, '-c', _RUN_CAPICE, *args], capture_output=True, text=True
+        )
+        return set(json.loads(result.stdout.splitlines()[-1]))
+
+    def test_predict_help_imports(self):
+        imported = self.get_imported_modules('predict', '--help')
+        for module in ['sklearn', 'scipy', 'xgboost', 'molgenis.capice.main_predict',
+                       'molgenis.capice.main_train', 'molgenis.capice.main_explain']:
+            self.assertNotIn(module, imported)
+
+    def test_predict_imports(self):
+        with tempfile.TemporaryDirectory() as output_directory:
+            imported = self.get_imported_modules(
+                'predict', '-i', ResourceFile.PREDICT_INPUT_TSV_GZ.value, '-m',
+                ResourceFile.XGB_BOOSTER_POC_JSON.value, '-o',
+                os.path.join(output_directory, 'output.tsv.gz')
+            )
+            self.assertTrue(os.path.isfile(os.path.join(output_directory, 'output.tsv.gz')))
+        self.assertIn('molgenis.capice.main_predict', imported)
+        # scikit-learn and scipy are imported by xgboost itself, but the modules of train and
+        # explain are not.
+        for module in ['molgenis.capice.main_train', 'molgenis.capice.main_explain',
+                       'molgenis.capice.main_serve']:
+            self.assertNotIn(module, imported)
+
+    def test_predict_compiled_model_imports(self):
+        with tempfile.TemporaryDirectory() as output_directory:
+            compiled_model = os.path.join(output_directory, 'model.compiled')
+            self.get_imported_modules(
+                'compile-model', '-m', ResourceFile.XGB_BOOSTER_POC_JSON.value, '-o',
+                compiled_model
+            )
+            imported = self.get_imported_modules(
+                'predict', '-i', ResourceFile.PREDICT_INPUT_TSV_GZ.value, '-m', compiled_model,
+                '-o', os.path.join(output_directory, 'output.tsv.gz'), '--engine', 'numpy'
+            )
+            self.assertTrue(os.path.isfile(os.path.join(output_directory, 'output.tsv.gz')))
+        self.assertIn('molgenis.capice.utilities.compiled_model', imported)
+        for module in ['xgboost', 'sklearn', 'scipy']:
+            self.assertNotIn(module, imported)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,7 @@ import unittest
 import numpy as np
 import pandas as pd
 
-from molgenis.capice.utilities.enums import Column
+from molgenis.capice.utilities.enums import Column, PreservedColumn
 from molgenis.capice.core.capice_exporter import CapiceExporter
 from tests.capice.test_templates import set_up_manager_and_out, teardown
 
@@ -15,12 +15,10 @@ class TestCapiceExporter(unittest.TestCase):
         print('Setting up.')
         cls.prediction_output_dataframe = pd.DataFrame(
             {
-                Column.chr_pos_ref_alt.value: [
-                    '1_VeryUniqueCAPICESeparator_100'
-                    '_VeryUniqueCAPICESeparator_A_VeryUniqueCAPICESeparator_C',
-                    '2_VeryUniqueCAPICESeparator_200'
-                    '_VeryUniqueCAPICESeparator_T_VeryUniqueCAPICESeparator_G'
-                ],
+                PreservedColumn.chr.col_name: ['1', '2'],
+                PreservedColumn.pos.col_name: [100, 200],
+                PreservedColumn.ref.col_name: ['A', 'T'],
+                PreservedColumn.alt.col_name: ['C', 'G'],
                 Column.gene_name.value: ['foo', 'bar'],
                 Column.gene_id.value: [1000, 2000],
                 Column.id_source.value: ['foo', 'bar'],
@@ -0,0 +1,107 @@
+import os
+import json
+import tempfile
+import unittest
+import tracemalloc
+
+import pandas as pd
+
+from molgenis.capice.core.metrics_recorder import MetricsRecorder, StageMetrics
+
+
+class TestMetricsRecorder(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        print('Setting up.')
+        cls.dataset = pd.DataFrame({'foo': [1, 2, 3]})
+
+    def setUp(self):
+        self.recorder = MetricsRecorder()
+        self.recorder.enable()
+
+    def tearDown(self):
+        self.recorder.disable()
+
+    def record(self, name, dataset):
+        with self.recorder.stage(name, dataset) as run:
+            output = dataset.assign(bar=dataset['foo'] * 2)
+            run.set_output(output.iloc[:2])
+
+    def test_stage(self):
+        self.record('Foo', self.dataset)
+        self.record('Foo', self.dataset)
+        stages = self.recorder.pop_stages()
+        self.assertEqual(1, len(stages))
+        self.assertEqual('Foo', stages[0].name)
+        self.assertEqual(2, stages[0].calls)
+        self.assertEqual(6, stages[0].rows_in)
+        self.assertEqual(4, stages[0].rows_out)
+        self.assertEqual(['bar'], stages[0].columns_added)
+        self.assertGreater(stages[0].wall_time, 0)
+        # Allocations are only traced if enabled separately.
+        self.assertIsNone(stages[0].tracemalloc_peak)
+        self.assertEqual([], self.recorder.pop_stages())
+
+    def test_stage_trace_allocations(self):
+        self.recorder.enable(trace_allocations=True)
+        self.assertTrue(tracemalloc.is_tracing())
+        self.record('Foo', self.dataset)
+        stages = self.recorder.pop_stages()
+        self.assertGreater(stages[0].tracemalloc_peak, 0)
+        self.assertIsNotNone(stages[0].tracemalloc_delta)
+        self.assertTrue(self.recorder.get_report()['traced_allocations'])
+        self.recorder.disable()
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_stage_disabled(self):
+        self.recorder.disable()
+        self.record('Foo', self.dataset)
+        self.assertEqual([], self.recorder.pop_stages())
+
+    def test_stage_error(self):
+        with self.assertRaises(ValueError):
+            with self.recorder.stage('Foo', self.dataset):
+                raise ValueError('foo')
+        self.assertEqual([], self.recorder.pop_stages())
+
+    def test_record_iteration(self):
+        chunks = [self.dataset, self.dataset.iloc[:1]]
+        observed = list(self.recorder.record_iteration('Reader', chunks))
+        self.assertEqual(2, len(observed))
+        stages = self.recorder.pop_stages()
+        self.assertEqual(2, stages[0].calls)
+        self.assertIsNone(stages[0].rows_in)
+        self.assertEqual(4, stages[0].rows_out)
+
+    def test_merge(self):
+        self.record('Foo', self.dataset)
+        stage = StageMetrics('Foo')
+        stage.calls = 3
+        stage.rows_out = 10
+        stage.columns_added = ['bar', 'baz']
+        self.recorder.merge([stage, StageMetrics('Bar')])
+        stages = {stage.name: stage for stage in self.recorder.pop_stages()}
+        self.assertEqual(4, stages['Foo'].calls)
+        self.assertEqual(12, stages['Foo'].rows_out)
+        self.assertEqual(['bar', 'baz'], stages['Foo'].columns_added)
+        self.assertIn('Bar', stages)
+
+    def test_write(self):
+        self.record(MetricsRecorder.VEP_PROCESSOR_PREFIX + 'Foo', self.dataset)
+        self.record('Bar', self.dataset)
+        with tempfile.TemporaryDirectory() as output_directory:
+            path = os.path.join(output_directory, 'metrics.json')
+            self.recorder.write(path)
+            with open(path) as report_file:
+                report = json.load(report_file)
+        self.assertEqual('Foo', report['slowest_vep_processor'])
+        self.assertEqual(
+            [MetricsRecorder.VEP_PROCESSOR_PREFIX + 'Foo', 'Bar'],
+            [stage['name'] for stage in report['stages']]
+        )
+        self.assertGreater(report['wall_time'], 0)
+        self.assertFalse(report['traced_allocations'])
+
+
+if __name__ == '__main__':
+    unittest.main()
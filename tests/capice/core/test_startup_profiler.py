@@ -0,0 +1,29 @@
+import sys
+import unittest
+import importlib
+from io import StringIO
+
+from molgenis.capice.core.startup_profiler import StartupProfiler
+
+
+class TestStartupProfiler(unittest.TestCase):
+    def test_records_imports(self):
+        sys.modules.pop('colorsys', None)
+        profiler = StartupProfiler()
+        sys.meta_path.insert(0, profiler)
+        try:
+            module = importlib.import_module('colorsys')
+        finally:
+            profiler.stop()
+        self.assertNotIn(profiler, sys.meta_path)
+        self.assertListEqual(['colorsys'], [timing[0] for timing in profiler.timings])
+        # The module keeps its original loader.
+        self.assertEqual('SourceFileLoader', type(module.__loader__).__name__)
+        report = StringIO()
+        profiler.report(file=report)
+        self.assertIn('Import time of 1 modules', report.getvalue())
+        self.assertIn('colorsys', report.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
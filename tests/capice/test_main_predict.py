@@ -1,9 +1,16 @@
 import os
+import gzip
 import unittest
+from unittest.mock import patch
 
 import pandas as pd
 
-from molgenis.capice.main_predict import CapicePredict
+from molgenis.capice.main_predict import CapicePredict, _process_and_predict_chunk
+from molgenis.capice.main_prescore import CapicePrescore
+from molgenis.capice.core.capice_manager import CapiceManager
+from molgenis.capice.core.metrics_recorder import MetricsRecorder
+from molgenis.capice.utilities.prescored_store import PrescoredStore
+from molgenis.capice.utilities.manual_vep_processor import ManualVEPProcessor
 from tests.capice.test_templates import set_up_manager_and_out, teardown, _project_root_directory, \
     ResourceFile, load_model
 
@@ -41,6 +48,166 @@ class TestMainNonTrain(unittest.TestCase):
             ]
         )
 
+    def test_integration_main_nontrain_chunked(self):
+        print('Main no-train chunked (integration)')
+        infile = os.path.join(_project_root_directory, 'resources', 'predict_input.tsv.gz')
+        manager = CapiceManager()
+        manager.output_filename = 'test_output_unchunked.tsv'
+        CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                      output_given=True, force=False).run()
+        with open(os.path.join(self.output_dir, manager.output_filename), 'rt') as fh:
+            expected = fh.read()
+        for chunk_size in [1, 3, 10]:
+            manager.output_filename = f'test_output_chunk_{chunk_size}.tsv.gz'
+            CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                          output_given=True, force=False, chunk_size=chunk_size).run()
+            with gzip.open(os.path.join(self.output_dir, manager.output_filename), 'rt') as fh:
+                self.assertEqual(expected, fh.read())
+        manager.output_filename = os.path.join(self.output_dir, 'test_output.tsv')
+
+    def test_integration_main_nontrain_workers(self):
+        print('Main no-train workers (integration)')
+        infile = os.path.join(_project_root_directory, 'resources', 'predict_input.tsv.gz')
+        manager = CapiceManager()
+        manager.output_filename = 'test_output_single_worker.tsv'
+        CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                      output_given=True, force=False).run()
+        with open(os.path.join(self.output_dir, manager.output_filename), 'rt') as fh:
+            expected = fh.read()
+        for chunk_size in [None, 3]:
+            manager.output_filename = f'test_output_workers_chunk_{chunk_size}.tsv'
+            CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                          output_given=True, force=False, chunk_size=chunk_size,
+                          workers=2).run()
+            with open(os.path.join(self.output_dir, manager.output_filename), 'rt') as fh:
+                self.assertEqual(expected, fh.read())
+        manager.output_filename = os.path.join(self.output_dir, 'test_output.tsv')
+
+    def test_process_and_predict_chunk_not_initialized(self):
+        with self.assertRaises(RuntimeError) as e:
+            _process_and_predict_chunk(pd.DataFrame())
+        self.assertEqual('Worker process is not initialized by _init_worker()!',
+                         str(e.exception))
+
+    def test_integration_main_nontrain_pipelined(self):
+        print('Main no-train pipelined (integration)')
+        infile = os.path.join(_project_root_directory, 'resources', 'predict_input.tsv.gz')
+        manager = CapiceManager()
+        manager.output_filename = 'test_output_not_pipelined.tsv'
+        CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                      output_given=True, force=False).run()
+        with open(os.path.join(self.output_dir, manager.output_filename), 'rt') as fh:
+            expected = fh.read()
+        manager.output_filename = 'test_output_pipelined.tsv.gz'
+        CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                      output_given=True, force=False, chunk_size=1, pipelined=True,
+                      queue_size=1).run()
+        with gzip.open(os.path.join(self.output_dir, manager.output_filename), 'rt') as fh:
+            self.assertEqual(expected, fh.read())
+        manager.output_filename = os.path.join(self.output_dir, 'test_output.tsv')
+
+    def test_integration_main_nontrain_compact_dtypes(self):
+        print('Main no-train compact versus 64-bit dtypes (integration)')
+        infile = os.path.join(_project_root_directory, 'resources', 'predict_input.tsv.gz')
+        manager = CapiceManager()
+        manager.output_filename = 'test_output_compact.tsv'
+        CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                      output_given=True, force=False).run()
+        manager.output_filename = 'test_output_not_compact.tsv'
+        with patch.object(ManualVEPProcessor, '_apply_dtypes'):
+            CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                          output_given=True, force=False).run()
+        # Scores are equal, since XGBoost predicts over float32 values regardless.
+        with open(os.path.join(self.output_dir, 'test_output_compact.tsv'), 'rt') as fh:
+            compact = fh.read()
+        with open(os.path.join(self.output_dir, 'test_output_not_compact.tsv'), 'rt') as fh:
+            self.assertEqual(compact, fh.read())
+        manager.output_filename = os.path.join(self.output_dir, 'test_output.tsv')
+
+    def test_required_input_columns(self):
+        infile = os.path.join(_project_root_directory, 'resources', 'predict_input.tsv.gz')
+        predict = CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                                output_given=True, force=False)
+        required_columns = predict._get_required_input_columns()
+        for column in ['CHROM', 'POS', 'SYMBOL', 'Gene', 'Consequence', 'phyloP', 'REF', 'ALT']:
+            self.assertIn(column, required_columns)
+        projected = predict._load_file(usecols=required_columns,
+                                       dtype=predict._get_input_dtypes())
+        unprojected = predict._load_file()
+        self.assertLess(projected.shape[1], unprojected.shape[1])
+        self.assertNotIn('HGVSc', projected.columns)
+        self.assertNotIn('Existing_variation', projected.columns)
+
+    def test_integration_main_nontrain_projection(self):
+        print('Main no-train projected versus unprojected (integration)')
+        infile = os.path.join(_project_root_directory, 'resources', 'predict_input.tsv.gz')
+        manager = CapiceManager()
+        manager.output_filename = 'test_output_projected.tsv'
+        CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                      output_given=True, force=False).run()
+        manager.output_filename = 'test_output_unprojected.tsv'
+        with patch.object(CapicePredict, '_get_required_input_columns', return_value=None), \
+                patch.object(CapicePredict, '_get_input_dtypes', return_value=None):
+            CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                          output_given=True, force=False).run()
+        with open(os.path.join(self.output_dir, 'test_output_projected.tsv'), 'rt') as fh:
+            projected = fh.read()
+        with open(os.path.join(self.output_dir, 'test_output_unprojected.tsv'), 'rt') as fh:
+            self.assertEqual(projected, fh.read())
+        manager.output_filename = os.path.join(self.output_dir, 'test_output.tsv')
+
+    def test_integration_main_nontrain_prescored(self):
+        print('Main no-train prescored versus not prescored (integration)')
+        infile = os.path.join(_project_root_directory, 'resources', 'predict_input.tsv.gz')
+        manager = CapiceManager()
+        manager.output_filename = 'test_output_not_prescored.tsv'
+        CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                      output_given=True, force=False).run()
+        manager.output_filename = 'test_prescored_store.tsv.gz'
+        CapicePrescore(input_path=infile, model=self.model, output_path=self.output_dir,
+                       output_given=True, force=False, chunk_size=3).run()
+        store = PrescoredStore(os.path.join(self.output_dir, manager.output_filename))
+        manager.output_filename = 'test_output_prescored.tsv'
+        predict = CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                                output_given=True, force=False, prescored=store)
+        with patch.object(predict, '_process_and_predict') as process_and_predict:
+            predict.run()
+            # All samples are within the store, so none have to be processed.
+            process_and_predict.assert_not_called()
+        with open(os.path.join(self.output_dir, 'test_output_not_prescored.tsv'), 'rt') as fh:
+            expected = fh.read()
+        with open(os.path.join(self.output_dir, 'test_output_prescored.tsv'), 'rt') as fh:
+            self.assertEqual(expected, fh.read())
+        manager.output_filename = os.path.join(self.output_dir, 'test_output.tsv')
+
+    def test_integration_main_nontrain_metrics(self):
+        print('Main no-train metrics (integration)')
+        infile = os.path.join(_project_root_directory, 'resources', 'predict_input.tsv.gz')
+        manager = CapiceManager()
+        recorder = MetricsRecorder()
+        for chunk_size, workers in [(None, 1), (3, 2)]:
+            manager.output_filename = f'test_output_metrics_{workers}.tsv'
+            # Tracing allocations is passed on to the worker processes.
+            recorder.enable(trace_allocations=workers > 1)
+            try:
+                CapicePredict(input_path=infile, model=self.model, output_path=self.output_dir,
+                              output_given=True, force=False, chunk_size=chunk_size,
+                              workers=workers).run()
+                report = recorder.get_report()
+            finally:
+                recorder.disable()
+            stages = {stage['name']: stage for stage in report['stages']}
+            for name in ['InputParser.parse', 'LoadFilePostProcessor',
+                         'VEPProcessor.Consequence', 'CategoricalProcessor', 'Predictor',
+                         'ClassSuggestor', 'CapiceExporter']:
+                self.assertIn(name, stages)
+                self.assertEqual(4, stages[name]['rows_out'])
+            self.assertEqual(1 if chunk_size is None else 2, stages['Predictor']['calls'])
+            self.assertEqual(['score'], stages['Predictor']['columns_added'])
+            self.assertEqual(workers > 1, stages['Predictor']['tracemalloc_peak'] is not None)
+            self.assertIsNotNone(report['slowest_vep_processor'])
+        manager.output_filename = os.path.join(self.output_dir, 'test_output.tsv')
+
 
 if __name__ == '__main__':
     unittest.main()
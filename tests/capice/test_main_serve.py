@@ -0,0 +1,113 @@
+import os
+import json
+import unittest
+import threading
+import http.client
+import urllib.request
+from unittest.mock import patch
+from urllib.error import HTTPError
+from concurrent.futures import ThreadPoolExecutor
+
+from molgenis.capice.main_serve import CapiceServe
+from molgenis.capice.main_predict import CapicePredict
+from tests.capice.test_templates import set_up_manager_and_out, teardown, load_model, \
+    ResourceFile
+
+
+class TestMainServe(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        print('Setting up.')
+        manager, cls.output_dir = set_up_manager_and_out()
+        cls.model = load_model(ResourceFile.XGB_BOOSTER_POC_JSON.value)
+        manager.output_filename = 'test_output_predict.tsv'
+        CapicePredict(input_path=ResourceFile.PREDICT_INPUT_TSV_GZ.value, model=cls.model,
+                      output_path=cls.output_dir, output_given=True, force=False).run()
+        with open(os.path.join(cls.output_dir, manager.output_filename), 'rt') as fh:
+            cls.expected = fh.read()
+        with open(ResourceFile.PREDICT_INPUT_TSV_GZ.value, 'rb') as fh:
+            cls.payload = fh.read()
+        cls.serve = CapiceServe({'poc': cls.model}, port=0, batch_wait=0.2)
+        cls.server = cls.serve.create_server()
+        cls.url = 'http://%s:%d' % cls.server.server_address[:2]
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        print('Performing teardown.')
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.serve.close()
+        teardown()
+
+    def setUp(self):
+        print('Performing test:')
+
+    def post(self, path, payload):
+        request = urllib.request.Request(self.url + path, data=payload, method='POST')
+        with urllib.request.urlopen(request) as response:
+            return response.read().decode()
+
+    def test_models(self):
+        with urllib.request.urlopen(self.url + '/models') as response:
+            self.assertDictEqual({'poc': '5.0.0'}, json.load(response))
+
+    def test_predict(self):
+        self.assertEqual(self.expected, self.post('/predict/poc', self.payload))
+        # The model can be omitted when a single model is served.
+        self.assertEqual(self.expected, self.post('/predict', self.payload))
+
+    def test_predict_concurrent(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            responses = list(executor.map(lambda _: self.post('/predict/poc', self.payload),
+                                          range(4)))
+        for response in responses:
+            self.assertEqual(self.expected, response)
+
+    def test_predict_unknown_model(self):
+        with self.assertRaises(HTTPError) as e:
+            self.post('/predict/unknown', self.payload)
+        self.assertEqual(404, e.exception.code)
+
+    def test_predict_invalid_payload(self):
+        with self.assertRaises(HTTPError) as e:
+            self.post('/predict/poc', b'CHROM\tPOS\n')
+        self.assertEqual(400, e.exception.code)
+        with self.assertRaises(HTTPError) as e:
+            self.post('/predict/poc', b'\x1f\x8bfoo')
+        self.assertEqual(400, e.exception.code)
+        self.assertIn('Payload is not a valid gzip file', e.exception.read().decode())
+
+    def post_raw(self, content_length):
+        host, port = self.server.server_address[:2]
+        connection = http.client.HTTPConnection(host, port)
+        try:
+            connection.putrequest('POST', '/predict/poc')
+            if content_length is not None:
+                connection.putheader('Content-Length', content_length)
+            connection.endheaders()
+            response = connection.getresponse()
+            return response.status, response.read().decode()
+        finally:
+            connection.close()
+
+    def test_predict_content_length(self):
+        self.assertEqual(411, self.post_raw(None)[0])
+        self.assertEqual((400, 'Invalid Content-Length: foo\n'), self.post_raw('foo'))
+        self.assertEqual(400, self.post_raw('-1')[0])
+
+    def test_predict_payload_too_large(self):
+        with patch.object(self.serve, 'max_payload_size', len(self.payload) - 1):
+            with self.assertRaises(HTTPError) as e:
+                self.post('/predict/poc', self.payload)
+            self.assertEqual(413, e.exception.code)
+        # The size of the decompressed payload is limited as well.
+        with patch.object(self.serve, 'max_payload_size', len(self.payload)):
+            with self.assertRaises(HTTPError) as e:
+                self.post('/predict/poc', self.payload)
+            self.assertEqual(400, e.exception.code)
+            self.assertIn('Decompressed payload exceeds the maximum', e.exception.read().decode())
+
+
+if __name__ == '__main__':
+    unittest.main()
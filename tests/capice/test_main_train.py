@@ -1,8 +1,13 @@
-import json
 import os
+import json
+import shutil
+import tempfile
 import unittest
+from unittest.mock import patch
 
+import numpy as np
 import pandas as pd
+from sklearn.model_selection import RandomizedSearchCV
 
 from molgenis.capice.main_train import CapiceTrain
 from tests.capice.test_templates import set_up_manager_and_out, teardown, _project_root_directory, \
@@ -122,6 +127,119 @@ class TestMainTrain(unittest.TestCase):
         best_model = str(model.__class__).split("'")[1]
         self.assertEqual('xgboost.sklearn.XGBClassifier', best_model)
 
+    def test_integration_training_sparse(self):
+        print('Training sparse (integration)')
+        self.main.sparse = True
+        self.main.run()
+        model = load_model(os.path.join(self.output_dir, self.output_filename))
+        self.assertListEqual(self.main.train_features, model.get_booster().feature_names)
+        self.assertListEqual(self.main.sparse_features, model.sparse_features)
+        self.assertIn('is_missense_variant', model.sparse_features)
+        self.assertNotIn('phyloP', model.sparse_features)
+
+    def test_integration_training_hist(self):
+        print('Training hist (integration)')
+        self.main.tree_method = 'hist'
+        self.main.threads_per_fit = 2
+        self.main.run()
+        model = load_model(os.path.join(self.output_dir, self.output_filename))
+        self.assertEqual('hist', model.get_params()['tree_method'])
+        # The training threads are not exported with the model.
+        self.assertIsNone(model.get_params()['n_jobs'])
+
+    def test_integration_training_halving(self):
+        print('Training successive halving (integration)')
+        self.main.search = 'halving'
+        self.main.n_iterations = 4
+        with self.assertLogs(level='INFO') as logs:
+            self.main.run()
+        model = load_model(os.path.join(self.output_dir, self.output_filename))
+        self.assertEqual('xgboost.sklearn.XGBClassifier', str(model.__class__).split("'")[1])
+        # 4 and 2 candidates on a third and (nearly) all samples, instead of 4 candidates on all
+        # samples.
+        self.assertRegex('\n'.join(logs.output),
+                         r'Successive halving ran 12 fits over 2 iterations, equivalent to '
+                         r'[0-9.]+ fits on all training samples instead of the 8 fits of a '
+                         r'randomized search \(saved [0-9.]+ fits\)\.')
+
+    def test_integration_training_cache(self):
+        print('Training cached (integration)')
+        self.main.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.main.cache_dir)
+        output_path = os.path.join(self.output_dir, self.output_filename)
+        boosters = []
+        for _ in range(2):
+            # Both searches try the same parameters.
+            np.random.seed(0)
+            self.main.run()
+            boosters.append(load_model(output_path).get_booster().save_raw(raw_format='json'))
+            os.remove(output_path)
+        self.assertEqual(1, len(os.listdir(self.main.cache_dir)))
+        with patch.object(CapiceTrain, '_load_file') as load_file:
+            np.random.seed(0)
+            self.main.run()
+        load_file.assert_not_called()
+        self.assertEqual(
+            boosters[0], load_model(output_path).get_booster().save_raw(raw_format='json')
+        )
+        # The cached run trains the same model as processing the input file.
+        self.assertEqual(boosters[0], boosters[1])
+
+    def test_integration_training_out_of_core(self):
+        print('Training out-of-core (integration)')
+        output_path = os.path.join(self.output_dir, self.output_filename)
+        boosters = []
+        for out_of_core, cache_dir in [(False, None), (True, None), (True, tempfile.mkdtemp()),
+                                       (False, 'cached')]:
+            if cache_dir == 'cached':
+                # The out-of-core cache entry also serves training in memory.
+                cache_dir = self.main.cache_dir
+            elif cache_dir is not None:
+                self.addCleanup(shutil.rmtree, cache_dir)
+            self.main.out_of_core = out_of_core
+            self.main.cache_dir = cache_dir
+            self.main.chunk_size = 250
+            np.random.seed(0)
+            with patch.object(CapiceTrain, '_load_file', wraps=self.main._load_file) as load_file:
+                self.main.run()
+            # Only loaded entirely when training in memory without cache entry.
+            self.assertEqual(0 if out_of_core or cache_dir is not None else 1,
+                             load_file.call_count)
+            boosters.append(load_model(output_path).get_booster().save_raw(raw_format='json'))
+            os.remove(output_path)
+        self.assertEqual(1, len(os.listdir(self.main.cache_dir)))
+        # The temporary directory within the output directory has been removed.
+        self.assertListEqual([], [path for path in os.listdir(self.output_dir)
+                                  if path.startswith('.capice_train_')])
+        for booster in boosters[1:]:
+            self.assertEqual(boosters[0], booster)
+
+    def test_integration_training_shared_memory(self):
+        print('Training shared memory (integration)')
+        output_path = os.path.join(self.output_dir, self.output_filename)
+        # 2 concurrent fits.
+        self.main.threads_per_fit = 1
+        boosters = []
+        for shared_memory in [True, False]:
+            self.main.shared_memory = shared_memory
+            np.random.seed(0)
+            with patch.object(RandomizedSearchCV, 'fit', autospec=True,
+                              side_effect=RandomizedSearchCV.fit) as fit:
+                self.main.run()
+            search_features = fit.call_args.args[1]
+            self.assertEqual(shared_memory, isinstance(search_features, np.memmap))
+            if shared_memory:
+                self.assertListEqual([len(self.main.train_features)],
+                                     list(search_features.shape[1:]))
+                self.assertIsInstance(fit.call_args.kwargs['sample_weight'], np.memmap)
+                self.assertIsInstance(fit.call_args.kwargs['eval_set'][0][0], np.memmap)
+            boosters.append(load_model(output_path).get_booster().save_raw(raw_format='json'))
+            os.remove(output_path)
+        # The memory-mapped files have been removed.
+        self.assertListEqual([], [path for path in os.listdir(self.output_dir)
+                                  if path.startswith('.capice_train_')])
+        self.assertEqual(boosters[0], boosters[1])
+
     def test_params(self):
         """
         Test to see if the >1.6.2 XGBoost parameter settings are applied correctly to the model
@@ -92,9 +92,7 @@ class TestCategoricalProcessor(unittest.TestCase):
                 'foo_a': [1, 0, 0, 0, 0, 0],
                 'foo_b': [0, 1, 0, 0, 0, 0],
                 'foo_c': [0, 0, 1, 0, 0, 0],
-                self.creat_other_column('foo'): [0, 0, 0, 1, 1, 1],
                 'bar_a': [1, 0, 0, 0, 0, 0],
-                self.creat_other_column('bar'): [0, 1, 1, 1, 1, 1],
                 'baz_a': [1, 0, 0, 0, 0, 0],
                 'baz_b': [0, 1, 0, 0, 0, 0],
                 'baz_c': [0, 0, 1, 0, 0, 0],
@@ -107,20 +105,10 @@ class TestCategoricalProcessor(unittest.TestCase):
                 'feature_excluded': [1, 2, 3, 4, np.nan, np.nan],
                 'chr': [1, 2, 3, 4, 5, 6],
                 'pos': [100, 200, 300, 400, 500, 600],
-                'chr_pos_ref_alt': [
-                    '1_VeryUniqueCAPICESeparator_100_VeryUniqueCAPICESeparator_'
-                    'A_VeryUniqueCAPICESeparator_G',
-                    '2_VeryUniqueCAPICESeparator_200_VeryUniqueCAPICESeparator_'
-                    'T_VeryUniqueCAPICESeparator_C',
-                    '3_VeryUniqueCAPICESeparator_300_VeryUniqueCAPICESeparator_'
-                    'A_VeryUniqueCAPICESeparator_G',
-                    '4_VeryUniqueCAPICESeparator_400_VeryUniqueCAPICESeparator_'
-                    'T_VeryUniqueCAPICESeparator_C',
-                    '5_VeryUniqueCAPICESeparator_500_VeryUniqueCAPICESeparator_'
-                    'A_VeryUniqueCAPICESeparator_G',
-                    '6_VeryUniqueCAPICESeparator_600_VeryUniqueCAPICESeparator_'
-                    'T_VeryUniqueCAPICESeparator_C',
-                ]
+                'preserved_chr': [1, 2, 3, 4, 5, 6],
+                'preserved_pos': [100, 200, 300, 400, 500, 600],
+                'preserved_REF': ['A', 'T', 'A', 'T', 'A', 'T'],
+                'preserved_ALT': ['G', 'C', 'G', 'C', 'G', 'C']
             }
         )
         pd.testing.assert_frame_equal(
@@ -196,26 +184,46 @@ class TestCategoricalProcessor(unittest.TestCase):
             observed_df.columns
         )
 
-    def test__create_preservation_col(self):
+    def test_create_preservation_cols(self):
         input_data_frame = pd.DataFrame(
             {'chr': [1, 2, 4], 'pos': [123, 456, 789], 'REF': ['A', 'T', 'C'],
              'ALT': ['G', 'A', 'T']})
         expected_output = pd.DataFrame(
             {'chr': [1, 2, 4], 'pos': [123, 456, 789], 'REF': ['A', 'T', 'C'],
-             'ALT': ['G', 'A', 'T'],
-             'chr_pos_ref_alt':
-                 ['1_VeryUniqueCAPICESeparator_123_VeryUniqueCAPICESeparator_'
-                  'A_VeryUniqueCAPICESeparator_G',
-                  '2_VeryUniqueCAPICESeparator_456_VeryUniqueCAPICESeparator_'
-                  'T_VeryUniqueCAPICESeparator_A',
-                  '4_VeryUniqueCAPICESeparator_789_VeryUniqueCAPICESeparator_'
-                  'C_VeryUniqueCAPICESeparator_T']
-             }
-        )
-        self.preprocessor._create_preservation_col(input_data_frame)
+             'ALT': ['G', 'A', 'T'], 'preserved_chr': [1, 2, 4],
+             'preserved_pos': [123, 456, 789], 'preserved_REF': ['A', 'T', 'C'],
+             'preserved_ALT': ['G', 'A', 'T']}
+        )
+        self.preprocessor.create_preservation_cols(input_data_frame)
 
         pd.testing.assert_frame_equal(expected_output, input_data_frame)
 
+    def test__get_dummies_codebook(self):
+        dataset = pd.DataFrame(
+            {
+                'foo': pd.Series(['a', 'b', 'c', np.nan], dtype='category'),
+                'bar': ['a', 'b', 'c', np.nan],
+                'feature_1': [1.0, 2.0, 3.0, 4.0]
+            }
+        )
+        observed = self.preprocessor._get_dummies(
+            dataset, {'foo': ['b', 'a', Column.other.value], 'bar': ['a', 'd']}
+        )
+        expected = pd.DataFrame(
+            {
+                'feature_1': [1.0, 2.0, 3.0, 4.0],
+                'foo_b': [0, 1, 0, 0],
+                'foo_a': [1, 0, 0, 0],
+                self.creat_other_column('foo'): [0, 0, 1, 1],
+                'bar_a': [1, 0, 0, 0],
+                'bar_d': [0, 0, 0, 0]
+            },
+            dtype=np.uint8
+        ).astype({'feature_1': float})
+        pd.testing.assert_frame_equal(expected, observed)
+        # The categorical features are not dropped from the supplied dataset.
+        self.assertListEqual(['foo', 'bar', 'feature_1'], dataset.columns.tolist())
+
     def test__get_categorical_columns(self):
         preprocessor = CategoricalProcessor()
         input_data_frame = pd.DataFrame(
@@ -226,6 +234,29 @@ class TestCategoricalProcessor(unittest.TestCase):
         self.assertIn('REF', features.keys())
         self.assertIn('ALT', features.keys())
 
+    def test_get_categories_chunks(self):
+        preprocessor = CategoricalProcessor()
+        input_data_frame = pd.DataFrame(
+            {
+                'REF': ['A', 'T', 'C', 'G', 'T', 'AT', 'C', 'G', 'TA', 'C', 'CG'],
+                'ALT': [np.nan, np.nan, np.nan, 'A', 'A', 'C', 'C', 'G', 'G', 'T', 'T'],
+                'feature': np.arange(11)
+            }
+        )
+        expected = preprocessor._get_categorical_columns(
+            input_data_frame, processable_features=['REF', 'ALT', 'feature']
+        )
+        counts = {}
+        for start in range(0, input_data_frame.shape[0], 3):
+            chunk = input_data_frame.iloc[start:start + 3]
+            counts = CategoricalProcessor.merge_category_counts(
+                counts,
+                CategoricalProcessor.count_categories(chunk, ['REF', 'ALT', 'feature'])
+            )
+        observed = preprocessor.get_categories(counts, input_data_frame.columns)
+        self.assertDictEqual(expected, observed)
+        self.assertListEqual(['REF', 'ALT'], list(observed.keys()))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,123 @@
+import os
+import unittest
+
+import numpy as np
+import xgboost as xgb
+
+from molgenis.capice.utilities.predictor import Predictor
+from molgenis.capice.utilities.compiled_model import CompiledModel
+from tests.capice.test_templates import set_up_impute_preprocess, set_up_manager_and_out, \
+    teardown, load_model, _project_test_resources
+
+
+class TestCompiledModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        print('Setting up.')
+        main, model = set_up_impute_preprocess()
+        cls.output_directory = set_up_manager_and_out()[1]
+        cls.main = main
+        cls.model = model
+        cls.dataset = cls.process(model)
+
+    @classmethod
+    def tearDownClass(cls):
+        print('Tearing down.')
+        teardown()
+
+    @classmethod
+    def process(cls, model):
+        return cls.main.categorical_process(
+            cls.main.process(
+                cls.main._load_file(), process_features=model.vep_features.keys()
+            )[0], processing_features=model.processable_features
+        )[0]
+
+    @staticmethod
+    def train_model(objective='binary:logistic', missing=np.nan):
+        generator = np.random.default_rng(5)
+        data = generator.normal(size=(500, 5)).astype(np.float32)
+        data[generator.random(data.shape) < 0.2] = np.nan
+        labels = (np.nan_to_num(data[:, 0]) + np.nan_to_num(data[:, 1]) > 0).astype(int)
+        model = xgb.XGBClassifier(n_estimators=20, max_depth=4, objective=objective,
+                                  missing=missing, random_state=5)
+        model.fit(data, labels)
+        model.CAPICE_version = '1.0.0'
+        model.vep_features = {}
+        model.processable_features = []
+        return model, data
+
+    def test_predict_proba_poc(self):
+        for file_name in ['xgb_booster_poc.json', 'xgb_booster_poc.ubj']:
+            model = load_model(os.path.join(_project_test_resources, file_name))
+            model_input = self.process(model)[model.get_booster().feature_names]
+            expected = model.predict_proba(model_input)
+            observed = CompiledModel.compile(model).predict_proba(model_input)
+            np.testing.assert_allclose(observed, expected, rtol=0, atol=1e-6)
+
+    def test_predict_proba_missing_values(self):
+        # Trained on data with missing values, using all trees (no best iteration).
+        model, data = self.train_model()
+        compiled_model = CompiledModel.compile(model)
+        self.assertEqual(len(compiled_model.roots), 20)
+        np.testing.assert_allclose(
+            compiled_model.predict_proba(data), model.predict_proba(data), rtol=0, atol=1e-6
+        )
+
+    def test_predict_proba_missing_value(self):
+        model, data = self.train_model(missing=0.0)
+        data = np.nan_to_num(data)
+        np.testing.assert_allclose(
+            CompiledModel.compile(model).predict_proba(data), model.predict_proba(data), rtol=0,
+            atol=1e-6
+        )
+
+    def test_save_load(self):
+        compiled_model = CompiledModel.compile(self.model)
+        path = os.path.join(self.output_directory, 'model.compiled')
+        compiled_model.save(path)
+        loaded_model = CompiledModel.load(path)
+        self.assertIsInstance(loaded_model.nodes, np.memmap)
+        self.assertEqual(self.model.CAPICE_version, loaded_model.CAPICE_version)
+        self.assertEqual(self.model.vep_features, loaded_model.vep_features)
+        self.assertEqual(self.model.get_booster().feature_names, loaded_model.feature_names)
+        model_input = self.dataset[self.model.get_booster().feature_names]
+        np.testing.assert_array_equal(
+            compiled_model.predict_proba(model_input), loaded_model.predict_proba(model_input)
+        )
+        del loaded_model
+
+    def test_predictor(self):
+        expected = Predictor(self.model).predict(self.dataset.copy())['score']
+        observed = Predictor(CompiledModel.compile(self.model), batch_size=3).predict(
+            self.dataset.copy()
+        )['score']
+        np.testing.assert_allclose(observed, expected, rtol=0, atol=1e-6)
+
+    def test_predictor_sparse(self):
+        expected = Predictor(self.model).predict(self.dataset.copy())['score']
+        self.model.sparse_features = []
+        try:
+            compiled_model = CompiledModel.compile(self.model)
+        finally:
+            del self.model.sparse_features
+        observed = Predictor(compiled_model).predict(self.dataset.copy())['score']
+        np.testing.assert_allclose(observed, expected, rtol=0, atol=1e-6)
+
+    def test_compile_unsupported_objective(self):
+        model = self.train_model(objective='binary:logitraw')[0]
+        with self.assertRaises(ValueError) as e:
+            CompiledModel.compile(model)
+        self.assertEqual(
+            'Unable to compile model with booster gbtree and objective binary:logitraw, only '
+            'gbtree with binary:logistic is supported!', str(e.exception)
+        )
+
+    def test_load_not_compiled(self):
+        with self.assertRaises(ValueError) as e:
+            CompiledModel.load(os.path.join(_project_test_resources, 'xgb_booster_poc.ubj'))
+        self.assertIn('is not a compiled CAPICE model!', str(e.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
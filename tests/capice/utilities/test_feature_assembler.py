@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from molgenis.capice.utilities.feature_assembler import FeatureAssembler
+
+
+class TestFeatureAssembler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        print('Setting up.')
+        cls.dataset = pd.DataFrame(
+            {
+                'is_foo': [1, 0, 0, 1],
+                'bar_a': np.array([0, 1, 0, 0], dtype=np.uint8),
+                'baz': [0.0, np.nan, 2.5, 0.0],
+                'excluded': ['a', 'b', 'c', 'd']
+            }
+        )
+        cls.features = ['baz', 'is_foo', 'bar_a']
+
+    def test_get_sparse_features(self):
+        self.assertListEqual(
+            ['is_foo', 'bar_a'],
+            FeatureAssembler.get_sparse_features(self.dataset, self.features)
+        )
+
+    def test_assemble_dense(self):
+        observed = FeatureAssembler(self.features).assemble(self.dataset)
+        pd.testing.assert_frame_equal(self.dataset[self.features], observed)
+
+    def test_assemble_matrix(self):
+        observed = FeatureAssembler(self.features).assemble_matrix(self.dataset)
+        self.assertEqual(np.float32, observed.dtype)
+        self.assertTrue(observed.flags['C_CONTIGUOUS'])
+        np.testing.assert_array_equal(
+            self.dataset[self.features].to_numpy(dtype=np.float32), observed
+        )
+
+    def test_assemble_matrix_out(self):
+        out = np.zeros((self.dataset.shape[0] + 1, len(self.features)), dtype=np.float32)
+        observed = FeatureAssembler(self.features).assemble_matrix(self.dataset, out=out[1:])
+        self.assertTrue(np.shares_memory(out, observed))
+        np.testing.assert_array_equal(
+            self.dataset[self.features].to_numpy(dtype=np.float32), out[1:]
+        )
+
+    def test_deduplicate(self):
+        matrix = np.array(
+            [[1, np.nan, 1], [1, np.nan, 1], [0, 2.5, np.nan], [1, 0, 1], [1, np.nan, 1]],
+            dtype=np.float32
+        )
+        unique_rows, inverse = FeatureAssembler(self.features).deduplicate(matrix)
+        np.testing.assert_array_equal([0, 2, 3], unique_rows)
+        np.testing.assert_array_equal([0, 0, 1, 2, 0], inverse)
+
+    @patch.object(FeatureAssembler, '_get_hash_multipliers',
+                  side_effect=lambda n_features: np.zeros(n_features, dtype=np.uint64))
+    def test_deduplicate_hash_collision(self, get_hash_multipliers):
+        matrix = FeatureAssembler(self.features).assemble_matrix(self.dataset)
+        unique_rows, inverse = FeatureAssembler(self.features).deduplicate(matrix)
+        np.testing.assert_array_equal(np.arange(4), unique_rows)
+        np.testing.assert_array_equal(np.arange(4), inverse)
+
+    def test_deduplicate_sparse(self):
+        dataset = pd.DataFrame(
+            {
+                'baz': [0.0, np.nan, 0.0, 2.5, np.nan],
+                'is_foo': [1, 1, 1, 0, 1],
+                'bar_a': [0, 0, 0, 1, 0]
+            }
+        )
+        assembler = FeatureAssembler(self.features, sparse_features=['is_foo', 'bar_a'])
+        unique_rows, inverse = assembler.deduplicate(assembler.assemble(dataset))
+        # A stored 0 (row 0) differs from a missing value (row 1).
+        np.testing.assert_array_equal([0, 1, 3], unique_rows)
+        np.testing.assert_array_equal([0, 1, 0, 2, 1], inverse)
+
+    @patch.object(FeatureAssembler, '_get_hash_multipliers',
+                  side_effect=lambda n_features: np.zeros(n_features, dtype=np.uint64))
+    def test_deduplicate_sparse_hash_collision(self, get_hash_multipliers):
+        assembler = FeatureAssembler(self.features, sparse_features=['is_foo', 'bar_a'])
+        unique_rows, inverse = assembler.deduplicate(assembler.assemble(self.dataset))
+        np.testing.assert_array_equal(np.arange(4), unique_rows)
+        np.testing.assert_array_equal(np.arange(4), inverse)
+
+    def test_assemble_sparse(self):
+        observed = FeatureAssembler(
+            self.features, sparse_features=['is_foo', 'bar_a']
+        ).assemble(self.dataset)
+        self.assertIsInstance(observed, sparse.csr_matrix)
+        self.assertEqual(np.float32, observed.dtype)
+        # Missing values and the 0 values of sparse features are not stored, other 0 values are.
+        self.assertEqual(6, observed.nnz)
+        stored = observed.tocoo()
+        self.assertListEqual(
+            [(0, 0), (0, 1), (1, 2), (2, 0), (3, 0), (3, 1)],
+            sorted(zip(stored.row.tolist(), stored.col.tolist()))
+        )
+        np.testing.assert_array_equal(
+            np.array([[0.0, 1, 0], [0, 0, 1], [2.5, 0, 0], [0, 1, 0]], dtype=np.float32),
+            observed.toarray()
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,11 @@
 import os
 import unittest
+from importlib.util import find_spec
 
 import pandas as pd
 
 from molgenis.capice.utilities.input_parser import InputParser
+from molgenis.capice.utilities.input_schema import InputSchema
 from tests.capice.test_templates import _project_root_directory
 
 
@@ -12,6 +14,8 @@ class TestInputParser(unittest.TestCase):
     def setUpClass(cls):
         print('Setting up.')
         cls.parser = InputParser()
+        cls.predict_input = os.path.join(_project_root_directory, 'resources',
+                                         'predict_input.tsv.gz')
 
     def test_parse(self):
         self.parser.set_separator(',')
@@ -34,5 +38,37 @@ class TestInputParser(unittest.TestCase):
         )
         pd.testing.assert_frame_equal(input_file, expected_df)
 
-        if __name__ == '__main__':
-            unittest.main()
+    def test_parse_chunks(self):
+        input_path = os.path.join(_project_root_directory, 'resources', 'predict_input.tsv.gz')
+        self.parser.set_separator('\t')
+        expected = self.parser.parse(input_path)
+        chunks = list(self.parser.parse_chunks(input_path, chunk_size=3))
+        self.assertListEqual([3, 1], [chunk.shape[0] for chunk in chunks])
+        pd.testing.assert_frame_equal(expected, pd.concat(chunks))
+
+    def test_unknown_reader(self):
+        with self.assertRaises(ValueError) as e:
+            InputParser(reader='foo')
+        self.assertEqual('Unknown reader foo, supported readers: pandas, pyarrow',
+                         str(e.exception))
+
+    def test_parse_chunks_unsupported_reader(self):
+        with self.assertRaises(ValueError):
+            next(InputParser(reader='pyarrow').parse_chunks(self.predict_input, chunk_size=2))
+
+    @unittest.skipIf(find_spec('pyarrow') is None, 'pyarrow is not installed')
+    def test_parse_pyarrow(self):
+        usecols = ['CHROM', 'POS', 'REF', 'ALT', 'Consequence', 'SIFT', 'Gene', 'phyloP',
+                   'not_present']
+        dtype = InputSchema().get_dtypes()
+        expected = InputParser().parse(self.predict_input, usecols=usecols, dtype=dtype)
+        observed = InputParser(reader='pyarrow').parse(self.predict_input, usecols=usecols,
+                                                       dtype=dtype)
+        self.assertEqual('category', observed['Consequence'].dtype)
+        self.assertEqual('float32', observed['SIFT'].dtype)
+        self.assertEqual('Int32', observed['POS'].dtype)
+        pd.testing.assert_frame_equal(expected, observed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from molgenis.capice.utilities.input_schema import InputSchema
+
+
+class TestInputSchema(unittest.TestCase):
+    def test_get_dtypes(self):
+        dtypes = InputSchema().get_dtypes()
+        self.assertEqual(str, dtypes['CHROM'])
+        self.assertEqual('Int32', dtypes['POS'])
+        self.assertEqual('category', dtypes['Consequence'])
+        self.assertEqual('category', dtypes['Amino_acids'])
+        self.assertEqual('category', dtypes['Feature_type'])
+        self.assertEqual('category', dtypes['SYMBOL_SOURCE'])
+        self.assertEqual('float32', dtypes['SIFT'])
+        self.assertEqual('float32', dtypes['PolyPhen'])
+
+    def test_get_dtypes_limited(self):
+        dtypes = InputSchema().get_dtypes(columns=['SIFT', 'foo'])
+        self.assertDictEqual({'SIFT': 'float32'}, dtypes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -144,9 +144,9 @@ class TestAnnotator(unittest.TestCase):
                 'REF': ['A', 'GCC'],
                 'ALT': ['C', 'C'],
                 'SIFTcat': [np.nan, np.nan],
-                'SIFTval': [np.nan, np.nan],
+                'SIFTval': np.array([np.nan, np.nan], dtype=np.float32),
                 'PolyPhenCat': [np.nan, np.nan],
-                'PolyPhenVal': [np.nan, np.nan]
+                'PolyPhenVal': np.array([np.nan, np.nan], dtype=np.float32)
             }
         )
         annotator = ManualVEPProcessor()
@@ -154,6 +154,20 @@ class TestAnnotator(unittest.TestCase):
         # Testing for expected dataframe columns, since it processes more.
         pd.testing.assert_frame_equal(expected_dataframe, out_dataframe[expected_dataframe.columns])
 
+    def test_compact_dtypes(self):
+        print('Compact dtypes')
+        annotator = ManualVEPProcessor()
+        out_dataframe = annotator.process(self.dataset.copy(deep=True), self.user_input_features)
+        self.assertEqual(np.int8, out_dataframe['is_missense_variant'].dtype)
+        self.assertEqual(np.int32, out_dataframe['Length'].dtype)
+        for column in ['cDNApos', 'relcDNApos', 'CDSpos', 'protPos', 'SIFTval', 'PolyPhenVal']:
+            self.assertEqual(np.float32, out_dataframe[column].dtype)
+        # 39 int8 Consequence indicators over 2 rows, compared to int64.
+        self.assertEqual(39 * 2 * 7, annotator.memory_saved['Consequence'])
+        # int32 Length over 2 rows, kept apart from Type (which shares the name REF).
+        self.assertEqual(2 * 4, annotator.memory_saved['Length'])
+        self.assertNotIn('REF', annotator.memory_saved)
+
     @staticmethod
     def prepare_getter_tests():
         data = pd.DataFrame(
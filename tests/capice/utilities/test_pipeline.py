@@ -0,0 +1,87 @@
+import time
+import unittest
+import threading
+
+from molgenis.capice.utilities.pipeline import Pipeline
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        print('Performing test:')
+        self.exported = []
+
+    def export(self, items):
+        for item in items:
+            self.exported.append(item)
+
+    @staticmethod
+    def double(items):
+        for item in items:
+            yield item * 2
+
+    def test_run(self):
+        pipeline = Pipeline(queue_size=1)
+        pipeline.run(('load', range(10)), ('double', self.double), ('export', self.export))
+        self.assertListEqual([i * 2 for i in range(10)], self.exported)
+        self.assertListEqual(['load', 'double', 'export'],
+                             [stage.name for stage in pipeline.stages])
+        for stage in pipeline.stages:
+            self.assertEqual(10, stage.items)
+
+    def test_run_timings(self):
+        def slow_double(items):
+            for item in items:
+                time.sleep(0.05)
+                yield item * 2
+
+        pipeline = Pipeline(queue_size=1)
+        pipeline.run(('load', range(4)), ('double', slow_double), ('export', self.export))
+        load, double, export = pipeline.stages
+        # The slow stage is busy, while the other stages wait on it.
+        self.assertGreaterEqual(double.busy, 0.2)
+        self.assertGreater(load.output_wait, 0.05)
+        self.assertGreater(export.input_wait, 0.15)
+        self.assertLess(export.busy, double.busy)
+
+    def test_run_error(self):
+        def failing(items):
+            for item in items:
+                if item == 3:
+                    raise ValueError('Failing item!')
+                yield item
+
+        with self.assertRaises(ValueError):
+            Pipeline(queue_size=1).run(
+                ('load', range(100)), ('failing', failing), ('export', self.export)
+            )
+        self.assertListEqual([0, 1, 2], self.exported[:3])
+        self.assertLess(len(self.exported), 4)
+
+    def test_run_last_stage_returns_early(self):
+        closed = []
+
+        def load():
+            try:
+                yield from range(100)
+            finally:
+                closed.append(True)
+
+        def export_two(items):
+            for item in items:
+                self.exported.append(item)
+                if len(self.exported) == 2:
+                    return
+
+        thread = threading.Thread(target=Pipeline(queue_size=1).run, daemon=True, args=(
+            ('load', load()), ('double', self.double), ('export', export_two)
+        ))
+        thread.start()
+        thread.join(timeout=10)
+        # The previous stages stop instead of waiting for the queue forever.
+        self.assertFalse(thread.is_alive())
+        self.assertListEqual([0, 2], self.exported)
+        self.assertListEqual([True], closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import MagicMock
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from molgenis.capice.utilities.predict_batcher import PredictBatcher
+
+
+class TestPredictBatcher(unittest.TestCase):
+    def setUp(self):
+        print('Performing test:')
+        self.predict = MagicMock()
+        # Reverses the order of the samples, so the samples have to be returned by index.
+        self.predict.process_and_predict.side_effect = self.process_and_predict
+        self.datasets = [
+            pd.DataFrame({'value': [1, 2, 3]}, index=[5, 6, 7]),
+            pd.DataFrame({'value': [4]}, index=[0]),
+            pd.DataFrame({'value': [5, 6]})
+        ]
+
+    @staticmethod
+    def process_and_predict(dataset):
+        if (dataset['value'] < 0).any():
+            raise ValueError('Negative value!')
+        return dataset.assign(score=dataset['value'] * 2).iloc[::-1]
+
+    def submit_concurrently(self, batcher, datasets):
+        with ThreadPoolExecutor(max_workers=len(datasets)) as executor:
+            futures = [executor.submit(batcher.submit, dataset) for dataset in datasets]
+        batcher.close()
+        return futures
+
+    def test_submit_batched(self):
+        batcher = PredictBatcher(self.predict, max_batch_size=100, max_wait=0.5)
+        futures = self.submit_concurrently(batcher, self.datasets)
+        self.predict.process_and_predict.assert_called_once()
+        for dataset, future in zip(self.datasets, futures):
+            pd.testing.assert_frame_equal(self.process_and_predict(dataset), future.result())
+
+    def test_submit_max_batch_size(self):
+        batcher = PredictBatcher(self.predict, max_batch_size=1, max_wait=0.5)
+        futures = self.submit_concurrently(batcher, self.datasets)
+        self.assertEqual(3, self.predict.process_and_predict.call_count)
+        for dataset, future in zip(self.datasets, futures):
+            pd.testing.assert_frame_equal(self.process_and_predict(dataset), future.result())
+
+    def test_submit_error(self):
+        datasets = self.datasets + [pd.DataFrame({'value': [-1]})]
+        batcher = PredictBatcher(self.predict, max_batch_size=100, max_wait=0.5)
+        futures = self.submit_concurrently(batcher, datasets)
+        # Only the failing dataset obtains the error.
+        with self.assertRaises(ValueError):
+            futures[-1].result()
+        for dataset, future in zip(self.datasets, futures):
+            pd.testing.assert_frame_equal(self.process_and_predict(dataset), future.result())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
 import unittest
 
+import numpy as np
+import pandas as pd
+
 from molgenis.capice.utilities.predictor import Predictor
 from tests.capice.test_templates import set_up_impute_preprocess
 
@@ -9,6 +12,7 @@ class TestPredictor(unittest.TestCase):
     def setUpClass(cls):
         print('Setting up.')
         main, model = set_up_impute_preprocess()
+        cls.model = model
         cls.predictor = Predictor(model)
         cls.dataset = main.categorical_process(
             main.process(
@@ -21,6 +25,46 @@ class TestPredictor(unittest.TestCase):
         self.assertGreater(observed['score'].sum(), 0)
         self.assertFalse(observed['score'].hasnans)
 
+    def test_predict_equals_predict_proba(self):
+        model_input = self.dataset[self.model.get_booster().feature_names]
+        expected = self.model.predict_proba(model_input)[:, 1]
+        observed = self.predictor.predict(self.dataset.copy())['score']
+        np.testing.assert_array_equal(expected, observed.to_numpy())
+
+    def test_predict_batched(self):
+        expected = self.predictor.predict(self.dataset.copy())['score']
+        for batch_size in [1, 3, 1000]:
+            observed = Predictor(self.model, n_threads=1, batch_size=batch_size).predict(
+                self.dataset.copy()
+            )['score']
+            pd.testing.assert_series_equal(expected, observed)
+
+    def test_predict_deduplicated(self):
+        dataset = pd.concat([self.dataset] * 3, ignore_index=True)
+        expected = Predictor(self.model, deduplicate=False).predict(dataset.copy())['score']
+        with self.assertLogs(level='INFO') as logs:
+            observed = Predictor(self.model, batch_size=6).predict(dataset.copy())['score']
+        pd.testing.assert_series_equal(expected, observed)
+        self.assertIn(
+            f'Predicted {self.dataset.shape[0] * 2} unique feature vectors for '
+            f'{dataset.shape[0]} samples (deduplication ratio: 1.50).', '\n'.join(logs.output)
+        )
+
+    def test_predict_sparse(self):
+        # Without sparse features all values (except missing) are stored in the sparse matrix,
+        # which has to result in the same scores as the dense feature matrix.
+        dataset = pd.concat([self.dataset] * 2, ignore_index=True)
+        expected = self.predictor.predict(dataset.copy())['score']
+        self.model.sparse_features = []
+        try:
+            for deduplicate in [True, False]:
+                observed = Predictor(self.model, deduplicate=deduplicate).predict(
+                    dataset.copy()
+                )['score']
+                pd.testing.assert_series_equal(expected, observed)
+        finally:
+            del self.model.sparse_features
+
 
 if __name__ == '__main__':
     unittest.main()
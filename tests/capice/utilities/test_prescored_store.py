@@ -0,0 +1,136 @@
+import os
+import gzip
+import json
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from molgenis.capice.utilities.prescored_store import PrescoredStore
+from tests.capice.test_templates import set_up_manager_and_out, teardown, load_model, \
+    ResourceFile
+
+
+class TestPrescoredStore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        print('Setting up.')
+        _, cls.output_dir = set_up_manager_and_out()
+        cls.model = load_model(ResourceFile.XGB_BOOSTER_POC_JSON.value)
+        cls.store_path = os.path.join(cls.output_dir, 'store.tsv.gz')
+        cls.scores = pd.DataFrame(
+            {
+                'chr': ['2', '1', '1', '1', '1', '1'],
+                'pos': [5, 30, 10, 10, 20, 40],
+                'ref': ['A', 'G', 'C', 'C', 'T', 'A'],
+                'alt': ['T', 'A', 'T', 'G', 'C', 'AT'],
+                'feature': ['NM_3', 'NM_1', 'NM_1', np.nan, 'NM_2', 'NM_1'],
+                'score': [0.5, 0.25, 0.125, 0.75, 0.375, 0.875]
+            }
+        )
+        PrescoredStore.write(cls.store_path, [cls.scores.iloc[:3], cls.scores.iloc[3:]],
+                             cls.model, block_size=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        print('Performing teardown.')
+        teardown()
+
+    def setUp(self):
+        print('Performing test:')
+
+    def test_write(self):
+        store = PrescoredStore(self.store_path)
+        # The 2 samples of chr1 position 10 are kept within a single block.
+        self.assertEqual(4, store.blocks['1'].shape[0])
+        self.assertEqual(1, store.blocks['2'].shape[0])
+        np.testing.assert_array_equal([10, 20, 30, 40], store.blocks['1'][:, 0])
+        # Still readable as a regular gzipped TSV.
+        with gzip.open(self.store_path, 'rt') as store_file:
+            written = pd.read_csv(store_file, sep='\t', dtype={'chr': str})
+        self.assertEqual(6, written.shape[0])
+        self.assertListEqual(PrescoredStore.COLUMNS, written.columns.tolist())
+
+    @patch.object(PrescoredStore, 'MERGE_WIDTH', 2)
+    @patch.object(PrescoredStore, 'MERGE_READ_SIZE', 2)
+    def test_write_merge_runs(self):
+        rng = np.random.default_rng(0)
+        scores = pd.DataFrame(
+            {
+                'chr': rng.choice(['1', '2', '10'], 200),
+                'pos': rng.integers(1, 40, 200),
+                'ref': rng.choice(['A', 'C'], 200),
+                'alt': 'T',
+                'feature': rng.choice(['NM_1', np.nan], 200),
+                'score': rng.random(200)
+            }
+        )
+        expected_path = os.path.join(self.output_dir, 'merge_expected.tsv.gz')
+        observed_path = os.path.join(self.output_dir, 'merge_observed.tsv.gz')
+        # A single run equals the store sorted in memory, of which the first sample of a key is
+        # stored.
+        expected_samples = PrescoredStore.write(expected_path, [scores], self.model,
+                                                block_size=5)
+        # Runs of 20 samples, merged in multiple passes.
+        observed_samples = PrescoredStore.write(
+            observed_path, (scores.iloc[start:start + 20] for start in range(0, 200, 20)),
+            self.model, block_size=5
+        )
+        self.assertEqual(scores.drop_duplicates(subset=PrescoredStore.KEY).shape[0],
+                         expected_samples)
+        self.assertEqual(expected_samples, observed_samples)
+        self.assertEqual(self.read_store(expected_path), self.read_store(observed_path))
+        # The temporary runs are removed.
+        self.assertFalse(any(name.startswith('.capice_prescore_')
+                             for name in os.listdir(self.output_dir)))
+
+    @staticmethod
+    def read_store(path):
+        with gzip.open(path, 'rt') as store_file:
+            content = store_file.read()
+        with open(PrescoredStore.index_path(path)) as index_file:
+            return content, json.load(index_file)['blocks']
+
+    def test_lookup(self):
+        dataset = pd.DataFrame(
+            {
+                'chr': ['1', '1', '2', '1', '3', '1', '1'],
+                'pos': [10, 20, 5, 10, 5, 25, 20],
+                'REF': ['C', 'T', 'A', 'C', 'A', 'T', 'T'],
+                'ALT': ['G', 'C', 'T', 'T', 'T', 'C', 'G'],
+                'feature': [np.nan, 'NM_2', 'NM_3', 'NM_1', 'NM_3', 'NM_2', 'NM_2']
+            },
+            index=[6, 5, 4, 3, 2, 1, 0]
+        )
+        observed = PrescoredStore(self.store_path).lookup(dataset)
+        expected = pd.Series(
+            [0.75, 0.375, 0.5, 0.125, np.nan, np.nan, np.nan],
+            index=dataset.index,
+            dtype=np.float32
+        )
+        pd.testing.assert_series_equal(expected, observed)
+
+    def test_validate_model(self):
+        store = PrescoredStore(self.store_path)
+        store.validate_model(self.model)
+        other_model = load_model(ResourceFile.XGB_BOOSTER_POC_JSON.value)
+        other_model.CAPICE_version = '1.0.0'
+        with self.assertRaises(ValueError) as e:
+            store.validate_model(other_model)
+        self.assertIn('was created with a different model', str(e.exception))
+
+    def test_missing_index(self):
+        path = os.path.join(self.output_dir, 'no_index.tsv.gz')
+        with open(path, 'wb') as store_file:
+            store_file.write(gzip.compress(b''))
+        with self.assertRaises(FileNotFoundError) as e:
+            PrescoredStore(path)
+        self.assertEqual(
+            f'Prescored store file {PrescoredStore.index_path(path)} does not exist!',
+            str(e.exception)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from molgenis.capice.utilities.processing_plan import ProcessingPlan
+from molgenis.capice.utilities.vep_processor_registry import VEPProcessorRegistry
+from tests.capice.test_templates import set_up_manager_and_out, teardown
+
+
+class FakeProcessor:
+    def __init__(self, name, input_columns, drop=True, usable=True):
+        self.name = name
+        self.input_columns = input_columns
+        self.columns = [f'{name}_out']
+        self.drop = drop
+        self.usable = usable
+
+
+class TestProcessingPlan(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        print('Setting up.')
+        set_up_manager_and_out()
+
+    @classmethod
+    def tearDownClass(cls):
+        print('Performing teardown.')
+        teardown()
+
+    def setUp(self):
+        print('Performing test:')
+
+    def test_plan(self):
+        processors = VEPProcessorRegistry.get_processors()
+        plan = ProcessingPlan(processors, ['REF', 'Consequence', 'phyloP'])
+        self.assertListEqual(
+            ['Consequence', 'Length', 'Type'],
+            [type(step.processor).__name__ for step in plan.steps]
+        )
+        self.assertEqual(len(processors) - 3, len(plan.skipped_processors))
+        self.assertListEqual(['Consequence', 'REF', 'ALT'], plan.input_columns)
+        # REF is not dropped, since Length and Type keep it.
+        self.assertListEqual([['Consequence'], [], []],
+                             [step.drop_columns for step in plan.steps])
+
+    def test_plan_drops_after_last_consumer(self):
+        processors = (
+            FakeProcessor('A', ['A']),
+            FakeProcessor('B', ['B', 'A']),
+            FakeProcessor('C', ['C', 'A'], drop=False),
+            FakeProcessor('D', ['D'], usable=False)
+        )
+        plan = ProcessingPlan(processors, ['A', 'B', 'C', 'D'])
+        self.assertListEqual(['A', 'B', 'C'], [step.processor.name for step in plan.steps])
+        self.assertListEqual([[], ['B'], ['A']], [step.drop_columns for step in plan.steps])
+        self.assertListEqual(['D'], [processor.name for processor in plan.skipped_processors])
+
+    def test_create_cached(self):
+        processors = VEPProcessorRegistry.get_processors()
+        self.assertIs(
+            ProcessingPlan.create(processors, ('Consequence', 'REF')),
+            ProcessingPlan.create(processors, ('Consequence', 'REF'))
+        )
+
+    def test_explain(self):
+        plan = ProcessingPlan(VEPProcessorRegistry.get_processors(), ['SIFT'])
+        explained = plan.explain()
+        self.assertIn('VEP processing plan of 1 steps:', explained)
+        self.assertIn('1. SIFT (SIFT)\n   input:  SIFT\n   output: SIFTcat, SIFTval\n'
+                      '   drops:  SIFT', explained)
+        self.assertIn('Skipped processors (not required): ', explained)
+
+
+if __name__ == '__main__':
+    unittest.main()
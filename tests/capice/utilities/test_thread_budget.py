@@ -0,0 +1,30 @@
+import unittest
+
+from molgenis.capice.utilities.thread_budget import ThreadBudget
+
+
+class TestThreadBudget(unittest.TestCase):
+    def test_concurrent_fits(self):
+        budget = ThreadBudget(8, 100)
+        self.assertEqual(8, budget.n_jobs)
+        self.assertEqual(1, budget.threads_per_fit)
+
+    def test_threads_exceeding_fits(self):
+        budget = ThreadBudget(32, 10)
+        self.assertEqual(10, budget.n_jobs)
+        self.assertEqual(3, budget.threads_per_fit)
+
+    def test_threads_per_fit(self):
+        budget = ThreadBudget(16, 100, threads_per_fit=4)
+        self.assertEqual(4, budget.n_jobs)
+        self.assertEqual(4, budget.threads_per_fit)
+        self.assertEqual('4 concurrent fits using 4 threads each', str(budget))
+
+    def test_threads_per_fit_exceeding_threads(self):
+        budget = ThreadBudget(2, 100, threads_per_fit=8)
+        self.assertEqual(1, budget.n_jobs)
+        self.assertEqual(2, budget.threads_per_fit)
+
+
+if __name__ == '__main__':
+    unittest.main()
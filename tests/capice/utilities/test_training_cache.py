@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from molgenis.capice.utilities.training_cache import TrainingCache
+from tests.capice.test_templates import set_up_manager_and_out, teardown, \
+    _project_root_directory
+
+
+class TestTrainingCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        print('Setting up.')
+        set_up_manager_and_out()
+        cls.input_path = os.path.join(_project_root_directory, 'resources', 'train_test.tsv.gz')
+        cls.features_path = os.path.join(_project_root_directory, 'resources',
+                                         'train_features.json')
+
+    @classmethod
+    def tearDownClass(cls):
+        print('Tearing down.')
+        teardown()
+
+    def setUp(self):
+        self.cache = TrainingCache(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.cache.directory)
+
+    def test_get_key(self):
+        key = TrainingCache.get_key(self.input_path, self.features_path)
+        self.assertEqual(64, len(key))
+        self.assertEqual(key, TrainingCache.get_key(self.input_path, self.features_path))
+        self.assertNotEqual(key, TrainingCache.get_key(self.features_path, self.input_path))
+        self.assertNotEqual(key, TrainingCache.get_key(self.input_path, self.input_path))
+
+    def test_load_not_cached(self):
+        self.assertIsNone(self.cache.load('foo'))
+
+    def test_store_load(self):
+        dataset = pd.DataFrame(
+            {
+                'feat1': pd.Series([1, 0, 1], dtype=np.uint8),
+                'feat2': [0.5, np.nan, 2.5],
+                'other': ['foo', 'bar', 'baz'],
+                'binarized_label': [0, 1, 0],
+                'sample_weight': [1.0, 0.8, 1.0]
+            }
+        )
+        vep_processed = {'REF': ['feat1']}
+        processed_features = {'feat2': ['foo']}
+        self.cache.store('bar', dataset, ['feat2', 'feat1'], vep_processed, processed_features)
+        # Storing an existing entry keeps the existing entry.
+        self.cache.store('bar', dataset, ['feat2', 'feat1'], vep_processed, processed_features)
+        self.assertListEqual(['bar'], os.listdir(self.cache.directory))
+        observed, train_features, observed_vep_processed, observed_processed_features = \
+            self.cache.load('bar')
+        self.assertListEqual(['feat2', 'feat1'], train_features)
+        self.assertDictEqual(vep_processed, observed_vep_processed)
+        self.assertDictEqual(processed_features, observed_processed_features)
+        pd.testing.assert_frame_equal(
+            dataset[['feat2', 'feat1', 'binarized_label', 'sample_weight']], observed
+        )
+
+    def test_store_chunks_load_arrays(self):
+        dataset = pd.DataFrame(
+            {
+                'feat1': pd.Series([1, 0, 1, 4], dtype=np.int64),
+                'binarized_label': [0, 1, 0, 1],
+                'sample_weight': [1.0, 0.8, 1.0, 1.0]
+            }
+        )
+        chunks = [dataset.iloc[:2], dataset.iloc[2:].astype({'feat1': np.float64})]
+        self.cache.store_chunks('foo', 4, iter(chunks), ['feat1'], {}, {})
+        features, labels, sample_weights, metadata = self.cache.load_arrays('foo', mmap=True)
+        self.assertIsInstance(features, np.memmap)
+        np.testing.assert_array_equal(np.array([[1], [0], [1], [4]], dtype=np.float32),
+                                      features)
+        np.testing.assert_array_equal(dataset['binarized_label'], labels)
+        np.testing.assert_array_equal(dataset['sample_weight'], sample_weights)
+        # The dtype of all chunks.
+        self.assertDictEqual({'feat1': 'float64'}, metadata['dtypes'])
+        del features, labels, sample_weights
+
+    def test_store_chunks_n_samples(self):
+        dataset = pd.DataFrame({'feat1': [1, 0], 'binarized_label': [0, 1],
+                                'sample_weight': [1.0, 0.8]})
+        for n_samples in [1, 3]:
+            with self.assertRaises(ValueError):
+                self.cache.store_chunks('foo', n_samples, [dataset], ['feat1'], {}, {})
+        # No partial entry is left behind.
+        self.assertListEqual([], os.listdir(self.cache.directory))
+
+    def test_store_chunks_integer_first_chunk(self):
+        chunks = [
+            pd.DataFrame({'feat1': [1.0, 0.0], 'binarized_label': [0.0, 1.0],
+                          'sample_weight': [1, 1]}),
+            pd.DataFrame({'feat1': [1.0, 4.0], 'binarized_label': [0.0, 1.0],
+                          'sample_weight': [0.8, 0.9]})
+        ]
+        self.cache.store_chunks('foo', 4, iter(chunks), ['feat1'], {}, {})
+        _, labels, sample_weights, _ = self.cache.load_arrays('foo')
+        # The sample weights of later chunks are not truncated to the dtype of the first chunk.
+        np.testing.assert_array_equal(np.array([1.0, 1.0, 0.8, 0.9]), sample_weights)
+        self.assertEqual(np.float64, sample_weights.dtype)
+        np.testing.assert_array_equal(np.array([0, 1, 0, 1]), labels)
+        self.assertEqual(np.int64, labels.dtype)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import shutil
+import unittest
+import tempfile
+
+import pandas as pd
+
+from molgenis.capice.utilities.vcf_parser import VCFParser
+from molgenis.capice.utilities.input_parser import InputParser
+from tests.capice.test_templates import _project_root_directory
+
+
+class TestVCFParser(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        print('Setting up.')
+        cls.vcf_input = os.path.join(_project_root_directory, 'tests', 'resources',
+                                     'predict_input_vep.vcf.gz')
+        cls.output_dir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        print('Tearing down.')
+        shutil.rmtree(cls.output_dir)
+
+    def _write_vcf(self, filename, lines):
+        path = os.path.join(self.output_dir, filename)
+        with open(path, 'wt') as fh:
+            fh.write(''.join(lines))
+        return path
+
+    def test_is_vcf(self):
+        self.assertTrue(VCFParser.is_vcf('input.vcf'))
+        self.assertTrue(VCFParser.is_vcf('input.vcf.gz'))
+        self.assertFalse(VCFParser.is_vcf('input.tsv.gz'))
+
+    def test_parse_equals_tsv(self):
+        # The VCF is an annotated version of both TSV inputs, which contain the additional ID
+        # column of the bcftools conversion in train mode.
+        expected = pd.concat(
+            [
+                InputParser().parse(os.path.join(_project_root_directory, 'resources',
+                                                 'predict_input.tsv.gz')),
+                InputParser().parse(os.path.join(_project_root_directory, 'tests', 'resources',
+                                                 'symbolic_alleles_vep.tsv.gz'))
+            ],
+            ignore_index=True
+        ).drop(columns='ID')
+        observed = InputParser().parse(self.vcf_input)
+        pd.testing.assert_frame_equal(expected, observed)
+
+    def test_parse_chunks(self):
+        parser = InputParser()
+        expected = parser.parse(self.vcf_input)
+        chunks = list(parser.parse_chunks(self.vcf_input, chunk_size=10))
+        self.assertListEqual([10, 10, 10, 7], [chunk.shape[0] for chunk in chunks])
+        pd.testing.assert_frame_equal(
+            expected.astype(str), pd.concat(chunks, ignore_index=True).astype(str)
+        )
+
+    def test_open(self):
+        path = self._write_vcf('open.vcf', [
+            '##fileformat=VCFv4.2\n',
+            '##INFO=<ID=CSQ,Number=.,Type=String,Description="Consequence annotations from '
+            'Ensembl VEP. Format: Allele|Consequence|SYMBOL">\n',
+            '#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tsample\n',
+            '1\t10\t.\tA\tG\t.\tPASS\tDP=5;CSQ=G|missense_variant|FOO,G|intron_variant|\t'
+            'GT\t0/1\n',
+            '1\t20\t.\tC\tT\t.\tPASS\tDP=5\tGT\t0/1\n'
+        ])
+        with VCFParser().open(path) as stream:
+            observed = stream.read().decode()
+        self.assertEqual(
+            'CHROM\tPOS\tREF\tALT\tAllele\tConsequence\tSYMBOL\n'
+            '1\t10\tA\tG\tG\tmissense_variant\tFOO\n'
+            '1\t10\tA\tG\tG\tintron_variant\t.\n'
+            '1\t20\tC\tT\t.\t.\t.\n',
+            observed
+        )
+
+    def test_open_no_csq(self):
+        path = self._write_vcf('no_csq.vcf', [
+            '##fileformat=VCFv4.2\n',
+            '#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n',
+            '1\t10\t.\tA\tG\t.\tPASS\t.\n'
+        ])
+        with self.assertRaises(ValueError) as e:
+            VCFParser().open(path)
+        self.assertEqual('VCF header does not contain the VEP CSQ INFO field!', str(e.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from importlib import metadata
+from unittest.mock import patch
+
+from molgenis.capice.vep.template import Template
+from molgenis.capice.utilities.vep_processor_registry import VEPProcessorRegistry
+from tests.capice.test_templates import set_up_manager_and_out, teardown
+
+
+class PluginProcessor(Template):
+    def __init__(self):
+        super(PluginProcessor, self).__init__(name='Plugin', usable=True)
+
+    @property
+    def columns(self):
+        return ['PluginColumn']
+
+    def _process(self, dataframe):
+        dataframe[self.columns[0]] = 1
+        return dataframe
+
+
+class TestVEPProcessorRegistry(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        print('Setting up.')
+        set_up_manager_and_out()
+
+    @classmethod
+    def tearDownClass(cls):
+        print('Performing teardown.')
+        VEPProcessorRegistry.clear()
+        teardown()
+
+    def setUp(self):
+        print('Performing test:')
+        VEPProcessorRegistry.clear()
+
+    def test_get_processors(self):
+        processors = VEPProcessorRegistry.get_processors()
+        self.assertListEqual(
+            ['Amino_acids', 'CDS_position', 'Consequence', 'PolyPhen', 'Protein_position', 'REF',
+             'REF', 'SIFT', 'cDNA_position'],
+            sorted(processor.name for processor in processors)
+        )
+        # Loaded once, after which the same instances are returned.
+        self.assertIs(processors, VEPProcessorRegistry.get_processors())
+
+    def test_entry_point_plugin(self):
+        entry_point = metadata.EntryPoint(
+            name='plugin',
+            value=f'{__name__}:PluginProcessor',
+            group=VEPProcessorRegistry.ENTRY_POINT_GROUP
+        )
+        with patch('molgenis.capice.utilities.vep_processor_registry.metadata.entry_points',
+                   return_value=[entry_point]) as entry_points:
+            processors = VEPProcessorRegistry.get_processors()
+        entry_points.assert_called_once_with(group=VEPProcessorRegistry.ENTRY_POINT_GROUP)
+        self.assertIn('Plugin', [processor.name for processor in processors])
+
+    def test_plugin_path(self):
+        with tempfile.TemporaryDirectory() as plugin_path:
+            with open(os.path.join(plugin_path, 'plugin.py'), 'wt') as plugin_file:
+                plugin_file.write(
+                    'class PathPlugin:\n'
+                    '    name = "PathPlugin"\n'
+                    '    usable = True\n\n'
+                    '    def process(self, dataframe):\n'
+                    '        return dataframe\n'
+                )
+            with patch.dict(os.environ, {VEPProcessorRegistry.PLUGIN_PATH_VARIABLE: plugin_path}):
+                processors = VEPProcessorRegistry.get_processors()
+        self.assertIn('PathPlugin', [processor.name for processor in processors])
+
+
+if __name__ == '__main__':
+    unittest.main()
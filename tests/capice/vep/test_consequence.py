@@ -117,6 +117,18 @@ class TestConsequence(unittest.TestCase):
         self.assertEqual('Supplied VEP consequence: fake_consequence is not supported in the '
                          'Consequence processor!', captured.records[0].getMessage())
 
+    def test_consequence_warning_once(self):
+        dataframe = pd.DataFrame(
+            {
+                'Consequence': ['fake_consequence&start_lost', 'fake_consequence', np.nan,
+                                'fake_consequence&start_lost']
+            }
+        )
+        with self.assertLogs() as captured:
+            observed = Consequence().process(dataframe)
+        self.assertEqual(1, len(captured.records))
+        self.assertListEqual([1, 0, 0, 1], observed['is_start_lost'].tolist())
+
 
 if __name__ == '__main__':
     unittest.main()